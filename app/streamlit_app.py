@@ -2,8 +2,15 @@ import altair as alt
 import numpy as np
 import pandas as pd
 import streamlit as st
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # project root, for src.*
+from src.viz.downsample import visible_budget, downsample, downsample_curve
+from src.backtest.backtest import positions_array, backtest_arrays
+from src.data.bars import infer_interval, periods_per_year
+from src.viz.analytics import ANALYTICS_DIR, WINDOWS, build_bundle
+
 st.set_page_config(page_title="Macro Multimodal AI", layout="wide")
 
 st.markdown(
@@ -123,15 +130,115 @@ st.markdown(
 )
 
 
-@st.cache_data
-def load_artifacts():
-    p = Path("data/processed")
-    data = {}
-    for name in ["wf_time_only", "wf_fused", "wf_fused_cal", "curve_time_only", "curve_fused"]:
-        f = p / f"{name}.parquet"
+ARTIFACT_DIR = Path("data/processed")
+# columns each artifact contributes to the panels below (missing ones are skipped); the
+# curves are only read when the analytics bundle (written by train/calibrate) is missing
+ARTIFACT_COLUMNS = {
+    "wf_time_only": ["date", "y", "p", "signal", "pos"],
+    "wf_fused": ["date", "y", "p", "signal", "pos"],
+    "wf_fused_cal": ["date", "y", "p", "p_cal", "signal", "pos"],
+    "curve_time_only": ["date", "equity", "drawdown"],
+    "curve_fused": ["date", "equity", "drawdown"],
+}
+MARKET_CSV = ARTIFACT_DIR / "market.csv"
+# what-if panel: first available walk-forward output and the probability it sizes from
+WHATIF_SOURCES = [("wf_fused_cal", "p_cal"), ("wf_fused", "p"), ("wf_time_only", "p")]
+STRATEGY_LABELS = {"time_only": "Time-only", "fused": "Fused / Calibrated"}
+BUNDLE_PARTS = ["rolling", "curve", "monthly"]
+
+
+def artifact_files() -> dict:
+    files = {name: ARTIFACT_DIR / f"{name}.parquet" for name in ARTIFACT_COLUMNS}
+    for s in STRATEGY_LABELS:
+        files.update({f"{s}_{part}": ANALYTICS_DIR / f"{s}_{part}.parquet" for part in BUNDLE_PARTS})
+    files["kpis"] = ANALYTICS_DIR / "kpis.json"
+    return files
+
+
+def artifact_signature() -> dict:
+    """(mtime_ns, size) per existing artifact; a changed entry means that file was rewritten."""
+    sig = {}
+    for name, f in artifact_files().items():
         if f.exists():
-            data[name] = pd.read_parquet(f)
-    return data
+            st_ = f.stat()
+            sig[name] = (st_.st_mtime_ns, st_.st_size)
+    return sig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def read_artifact(path: str, columns: tuple | None, mtime_ns: int, size: int) -> pd.DataFrame:
+    # mtime_ns/size are part of the cache key only: a rewritten file misses the cache
+    import pyarrow.parquet as pq
+    have = set(pq.read_schema(path).names)
+    cols = None if columns is None else [c for c in columns if c in have]
+    return pd.read_parquet(path, columns=cols)  # attrs (stats) come along
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def read_kpis(path: str, mtime_ns: int, size: int) -> dict:
+    import json
+    return json.loads(Path(path).read_text())
+
+
+def load_artifacts(sig: dict) -> dict:
+    """Walk-forward outputs plus the per-strategy analytics tables ("time_only_curve", ...)."""
+    files = artifact_files()
+    return {name: read_artifact(str(files[name]), tuple(ARTIFACT_COLUMNS[name]) if name in ARTIFACT_COLUMNS else None,
+                                *sig[name])
+            for name in sig if name != "kpis" and not name.startswith("curve_")}
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def fallback_bundle(sig: dict, interval: str | None = None) -> dict:
+    # artifacts from before the analytics bundle existed: build it here once per version;
+    # the bar interval comes from kpis.json when there is one, else from the dates
+    files = artifact_files()
+    out = {}
+    for s, wf_key, curve_key in [("time_only", "wf_time_only", "curve_time_only"), ("fused", "wf_fused", "curve_fused")]:
+        if wf_key == "wf_fused" and "wf_fused_cal" in sig:
+            wf_key = "wf_fused_cal"
+        if wf_key not in sig or curve_key not in sig:
+            continue
+        wf = read_artifact(str(files[wf_key]), tuple(ARTIFACT_COLUMNS[wf_key]), *sig[wf_key])
+        curve = read_artifact(str(files[curve_key]), tuple(ARTIFACT_COLUMNS[curve_key]), *sig[curve_key])
+        out[s] = build_bundle(wf, curve, "p_cal" if "p_cal" in wf.columns else "p",
+                              interval=interval or infer_interval(wf["date"]))
+    return out
+
+
+def load_bundle(sig: dict, data: dict) -> tuple[dict, dict]:
+    """({strategy: {rolling, curve, monthly}}, {"stats": ...}) from the bundle; strategies
+    missing from it are built from the raw artifacts."""
+    tables = {s: {part: data[f"{s}_{part}"] for part in BUNDLE_PARTS}
+              for s in STRATEGY_LABELS if all(f"{s}_{part}" in data for part in BUNDLE_PARTS)}
+    kpis = read_kpis(str(artifact_files()["kpis"]), *sig["kpis"]) if "kpis" in sig else {}
+    stats = {s: v for s, v in kpis.get("stats", {}).items() if s in tables}
+    if len(tables) < len(STRATEGY_LABELS):
+        for s, b in fallback_bundle(sig, kpis.get("interval")).items():
+            if s not in tables:
+                tables[s] = b
+                stats[s] = b["stats"]
+    return tables, dict(kpis, stats=stats)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def whatif_inputs(wf_path: str, prob_col: str, wf_stat: tuple, market_path: str, market_stat: tuple) -> dict:
+    """Arrays the what-if backtest reruns on: dates, probabilities, close-to-close returns.
+
+    Built once per (artifact, market.csv) version; every slider move afterwards only
+    touches NumPy arrays, never the files or pnl_curve's merges.
+    """
+    wf = pd.read_parquet(wf_path, columns=["date", prob_col]).sort_values("date").reset_index(drop=True)
+    mkt = pd.read_csv(market_path, parse_dates=["date"], usecols=["date", "close"])
+    close = wf[["date"]].merge(mkt, on="date", how="left")["close"]
+    dates = wf["date"]
+    years = (dates.iloc[-1] - dates.iloc[0]).days / 365.25 if len(dates) else 0.0
+    return {
+        "date": dates.to_numpy(),
+        "p": wf[prob_col].to_numpy(dtype=np.float64),
+        "ret1": close.pct_change().to_numpy(dtype=np.float64),
+        "years": years,
+    }
 
 
 def fmt_pct(x):
@@ -142,54 +249,75 @@ def fmt_num(x, nd=2):
     return "n/a" if x is None or pd.isna(x) else f"{x:.{nd}f}"
 
 
-def delta_text(fused, baseline, percent=False, higher_is_better=True):
+def delta_text(fused, baseline, percent=False, higher_is_better=True, vs="Time-only"):
     if fused is None or baseline is None or pd.isna(fused) or pd.isna(baseline):
         return "n/a", "neutral"
     diff = float(fused) - float(baseline)
     better = diff >= 0 if higher_is_better else diff <= 0
     direction = "higher" if diff >= 0 else "lower"
     if percent:
-        text = f"{abs(diff):.2%} {direction} vs Time-only"
+        text = f"{abs(diff):.2%} {direction} vs {vs}"
     else:
-        text = f"{abs(diff):.2f} {direction} vs Time-only"
+        text = f"{abs(diff):.2f} {direction} vs {vs}"
     return text, ("positive" if better else "negative")
 
 
-def drawdown_delta_text(fused_dd, base_dd):
+def drawdown_delta_text(fused_dd, base_dd, vs="Time-only"):
     if fused_dd is None or base_dd is None or pd.isna(fused_dd) or pd.isna(base_dd):
         return "n/a", "neutral"
     improvement = abs(float(base_dd)) - abs(float(fused_dd))
     if improvement > 0:
-        return f"{improvement:.2%} lower drawdown vs Time-only", "positive"
+        return f"{improvement:.2%} lower drawdown vs {vs}", "positive"
     if improvement < 0:
-        return f"{abs(improvement):.2%} higher drawdown vs Time-only", "negative"
-    return "Same drawdown as Time-only", "neutral"
+        return f"{abs(improvement):.2%} higher drawdown vs {vs}", "negative"
+    return f"Same drawdown as {vs}", "neutral"
 
 
-def trade_delta_text(fused_trades, base_trades):
+def trade_delta_text(fused_trades, base_trades, vs="Time-only"):
     if fused_trades is None or base_trades is None or pd.isna(fused_trades) or pd.isna(base_trades):
         return "n/a", "neutral"
     fewer = int(round(float(base_trades) - float(fused_trades)))
     if fewer > 0:
-        return f"{fewer} fewer trades vs Time-only", "positive"
+        return f"{fewer} fewer trades vs {vs}", "positive"
     if fewer < 0:
-        return f"{abs(fewer)} more trades vs Time-only", "negative"
-    return "Same trades as Time-only", "neutral"
+        return f"{abs(fewer)} more trades vs {vs}", "negative"
+    return f"Same trades as {vs}", "neutral"
 
 
-def rolling_hit_rate(df: pd.DataFrame, prob_col: str, window: int = 63) -> pd.DataFrame:
-    out = df[["date", "y", prob_col]].copy().sort_values("date")
-    out["pred"] = (out[prob_col] > 0.5).astype(int)
-    out["hit"] = (out["pred"] == out["y"]).astype(float)
-    out["rolling_hit_rate"] = out["hit"].rolling(window, min_periods=window // 2).mean()
-    return out[["date", "rolling_hit_rate"]]
+def chart_range(frames) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    dates = [f["date"] for f in frames if f is not None and not f.empty]
+    if not dates:
+        return None
+    return min(d.min() for d in dates), max(d.max() for d in dates)
 
 
-def drawdown_frame(df: pd.DataFrame, col: str = "drawdown") -> pd.DataFrame:
-    out = df.copy()
-    if col not in out.columns and "equity" in out.columns:
-        out[col] = out["equity"] / out["equity"].cummax() - 1.0
-    return out
+def in_range(df: pd.DataFrame, rng) -> pd.DataFrame:
+    if rng is None:
+        return df
+    return df[(df["date"] >= rng[0]) & (df["date"] <= rng[1])].sort_values("date")
+
+
+def curve_points(df: pd.DataFrame, label: str, col: str, rng, max_points: int) -> pd.DataFrame:
+    """Visible part of one curve, downsampled with its drawdown peaks/troughs kept exactly.
+
+    Bundle curve tables carry the full-history sample per budget (pts_<n>) and the
+    keypoints (key), so the default full view is a plain row filter.
+    """
+    full = rng is None or (df.empty or (rng[0] <= df["date"].iloc[0] and rng[1] >= df["date"].iloc[-1]))
+    if full and f"pts_{max_points}" in df.columns:
+        d = df[df[f"pts_{max_points}"].to_numpy()]
+    else:
+        d = in_range(df, rng).reset_index(drop=True)
+        keep = np.flatnonzero(d["key"].to_numpy()) if "key" in d.columns else None
+        d = downsample_curve(d, visible_budget(len(d), max_points), keep=keep)
+    return d[["date", col]].rename(columns={col: label})
+
+
+def merge_series(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    out = frames[0]
+    for nxt in frames[1:]:
+        out = out.merge(nxt, on="date", how="outer")
+    return out.sort_values("date")
 
 
 def render_kpi_card(column, title, value, delta, delta_kind="neutral", primary=True, featured=False, note=None):
@@ -269,14 +397,17 @@ def apply_chart_style(chart):
     )
 
 
-def equity_chart(curves_df: pd.DataFrame):
+STRATEGIES = ("Time-only", "Fused / Calibrated")
+
+
+def equity_chart(curves_df: pd.DataFrame, domain=STRATEGIES, title="Equity Curve (Net of Costs)", height=430):
     long_df = curves_df.melt("date", var_name="Strategy", value_name="Equity").dropna()
     base = alt.Chart(long_df).encode(
         x=alt.X("date:T", title="Date"),
         y=alt.Y("Equity:Q", title="Growth of $1"),
         color=alt.Color(
             "Strategy:N",
-            scale=alt.Scale(domain=["Time-only", "Fused / Calibrated"], range=["#95a3b8", "#25c7e8"]),
+            scale=alt.Scale(domain=list(domain), range=["#95a3b8", "#25c7e8"]),
             legend=alt.Legend(title=None),
         ),
         tooltip=[
@@ -286,21 +417,21 @@ def equity_chart(curves_df: pd.DataFrame):
         ],
     )
     lines = base.mark_line().encode(
-        size=alt.condition(alt.datum.Strategy == "Fused / Calibrated", alt.value(3.9), alt.value(2.2)),
-        opacity=alt.condition(alt.datum.Strategy == "Fused / Calibrated", alt.value(1.0), alt.value(0.72)),
+        size=alt.condition(alt.datum.Strategy == domain[-1], alt.value(3.9), alt.value(2.2)),
+        opacity=alt.condition(alt.datum.Strategy == domain[-1], alt.value(1.0), alt.value(0.72)),
     )
-    chart = lines.properties(height=430, title="Equity Curve (Net of Costs)").interactive()
+    chart = lines.properties(height=height, title=title).interactive()
     return apply_chart_style(chart)
 
 
-def drawdown_chart(dd_df: pd.DataFrame):
+def drawdown_chart(dd_df: pd.DataFrame, domain=STRATEGIES, title="Drawdown Through Time", height=335):
     long_df = dd_df.melt("date", var_name="Strategy", value_name="Drawdown").dropna()
     base = alt.Chart(long_df).encode(
         x=alt.X("date:T", title="Date"),
         y=alt.Y("Drawdown:Q", title="Drawdown", axis=alt.Axis(format=".0%")),
         color=alt.Color(
             "Strategy:N",
-            scale=alt.Scale(domain=["Time-only", "Fused / Calibrated"], range=["#95a3b8", "#25c7e8"]),
+            scale=alt.Scale(domain=list(domain), range=["#95a3b8", "#25c7e8"]),
             legend=alt.Legend(title=None),
         ),
         tooltip=[
@@ -310,15 +441,29 @@ def drawdown_chart(dd_df: pd.DataFrame):
         ],
     )
     lines = base.mark_line().encode(
-        size=alt.condition(alt.datum.Strategy == "Fused / Calibrated", alt.value(3.5), alt.value(2.0)),
-        opacity=alt.condition(alt.datum.Strategy == "Fused / Calibrated", alt.value(1.0), alt.value(0.72)),
+        size=alt.condition(alt.datum.Strategy == domain[-1], alt.value(3.5), alt.value(2.0)),
+        opacity=alt.condition(alt.datum.Strategy == domain[-1], alt.value(1.0), alt.value(0.72)),
     )
     zero = alt.Chart(pd.DataFrame({"y": [0.0]})).mark_rule(color="#4f637f", strokeDash=[4, 4]).encode(y="y:Q")
-    chart = (zero + lines).properties(height=335, title="Drawdown Through Time").interactive()
+    chart = (zero + lines).properties(height=height, title=title).interactive()
     return apply_chart_style(chart)
 
 
-def rolling_acc_chart(df: pd.DataFrame):
+def monthly_table(df: pd.DataFrame):
+    def tint(v):
+        if pd.isna(v):
+            return ""
+        return "color: #9ae6b4;" if v > 0 else ("color: #f4a3a3;" if v < 0 else "")
+
+    return (
+        df.set_index("year").style
+        .format("{:.2%}", na_rep="")
+        .map(tint)
+        .set_properties(**{"color": "#e5e7eb"}, subset=["Year"])
+    )
+
+
+def rolling_acc_chart(df: pd.DataFrame, window: int = 63):
     long_df = df.melt("date", var_name="Strategy", value_name="Rolling Hit Rate").dropna()
     base = alt.Chart(long_df).encode(
         x=alt.X("date:T", title="Date"),
@@ -350,13 +495,63 @@ def rolling_acc_chart(df: pd.DataFrame):
         ),
     )
     mid = alt.Chart(pd.DataFrame({"y": [0.5]})).mark_rule(color="#4f637f", strokeDash=[4, 4]).encode(y="y:Q")
-    chart = (mid + lines).properties(height=320, title="Rolling Directional Accuracy (63D)").interactive()
+    chart = (mid + lines).properties(height=320, title=f"Rolling Directional Accuracy ({window}D)").interactive()
     return apply_chart_style(chart)
 
 
-data = load_artifacts()
-time_stats = data.get("curve_time_only", pd.DataFrame()).attrs.get("stats", {})
-fused_stats = data.get("curve_fused", pd.DataFrame()).attrs.get("stats", {})
+@st.fragment
+def whatif_panel(inputs: dict, reference: pd.DataFrame | None, ref_stats: dict, ref_label: str, view, max_points: int,
+                 interval: str = "1d"):
+    # a fragment: moving a control reruns only this panel, on the cached arrays
+    c = st.columns(5)
+    sizing = c[0].radio("Sizing", ["prob", "binary"], horizontal=True, key="wi_sizing")
+    threshold = c[1].slider("Threshold", 0.50, 0.70, 0.55, 0.005, key="wi_threshold", disabled=sizing != "binary")
+    band = c[2].slider("Band", 0.00, 0.10, 0.00, 0.005, key="wi_band", disabled=sizing != "binary")
+    prob_scale = c[3].slider("Prob scale", 0.02, 0.30, 0.06, 0.01, key="wi_prob_scale", disabled=sizing != "prob")
+    cost_bps = c[4].slider("Cost (bps)", 0.0, 20.0, 1.0, 0.5, key="wi_cost_bps")
+
+    pos = positions_array(inputs["p"], sizing, threshold, band, prob_scale)
+    res = backtest_arrays(pos, inputs["ret1"], inputs["years"], cost_bps=cost_bps,
+                          periods_per_year=periods_per_year(interval))
+    stats = res["stats"]
+    ref = ref_stats or {}
+
+    ret_txt, ret_kind = delta_text(stats["Total Return (net)"], ref.get("Total Return (net)"), percent=True,
+                                   vs=ref_label)
+    sh_txt, sh_kind = delta_text(stats["Sharpe (net)"], ref.get("Sharpe (net)"), vs=ref_label)
+    dd_txt, dd_kind = drawdown_delta_text(stats["Max Drawdown"], ref.get("Max Drawdown"), vs=ref_label)
+    tr_txt, tr_kind = trade_delta_text(stats["Trades"], ref.get("Trades"), vs=ref_label)
+    cards = st.columns(4)
+    render_kpi_card(cards[0], "What-if Net Return", fmt_pct(stats["Total Return (net)"]), ret_txt, ret_kind,
+                    primary=False, featured=True)
+    render_kpi_card(cards[1], "What-if Sharpe", fmt_num(stats["Sharpe (net)"], 2), sh_txt, sh_kind, primary=False)
+    render_kpi_card(cards[2], "What-if Max Drawdown", fmt_pct(stats["Max Drawdown"]), dd_txt, dd_kind, primary=False)
+    render_kpi_card(cards[3], "What-if Trades", f"{stats['Trades']}", tr_txt, tr_kind, primary=False)
+
+    curve = pd.DataFrame({"date": inputs["date"], "equity": res["equity"], "drawdown": res["drawdown"]})
+    domain = ("What-if",) if reference is None else (ref_label, "What-if")
+    frames = [] if reference is None else [reference]
+    eq = merge_series([curve_points(f, lbl, "equity", view, max_points) for f, lbl in zip(frames + [curve], domain)])
+    dd = merge_series([curve_points(f, lbl, "drawdown", view, max_points) for f, lbl in zip(frames + [curve], domain)])
+    st.altair_chart(equity_chart(eq, domain=domain, title="What-if Equity (Net of Costs)", height=360),
+                    use_container_width=True)
+    st.altair_chart(drawdown_chart(dd, domain=domain, title="What-if Drawdown", height=260),
+                    use_container_width=True)
+
+
+@st.fragment(run_every=5)
+def watch_artifacts(sig: dict):
+    # poll file stats only; rerun the page as soon as training/calibration rewrites an artifact
+    if artifact_signature() != sig:
+        st.rerun()
+
+
+artifact_sig = artifact_signature()
+data = load_artifacts(artifact_sig)
+bundle, kpis = load_bundle(artifact_sig, data)
+time_stats = kpis.get("stats", {}).get("time_only", {})
+fused_stats = kpis.get("stats", {}).get("fused", {})
+curves = {s: b["curve"] for s, b in bundle.items()}
 
 signal_df = None
 for key in ["wf_fused_cal", "wf_fused", "wf_time_only"]:
@@ -364,6 +559,18 @@ for key in ["wf_fused_cal", "wf_fused", "wf_time_only"]:
         signal_df = data[key]
         break
 
+view = chart_range(list(curves.values()))
+max_points = 1000
+hit_window = 63
+if view is not None:
+    st.sidebar.header("Charts")
+    lo, hi = view[0].to_pydatetime(), view[1].to_pydatetime()
+    picked = st.sidebar.slider("Visible dates", min_value=lo, max_value=hi, value=(lo, hi), format="YYYY-MM-DD")
+    view = (pd.Timestamp(picked[0]), pd.Timestamp(picked[1]))
+    max_points = st.sidebar.select_slider("Max points per series", options=[250, 500, 1000, 2000, 5000], value=1000,
+                                          help="Longer ranges are downsampled (per-bucket min/max; drawdown peaks and troughs kept)")
+    hit_window = st.sidebar.select_slider("Rolling hit-rate window", options=list(WINDOWS), value=63)
+
 latest_date = None
 latest_pos = None
 if signal_df is not None and not signal_df.empty:
@@ -371,6 +578,7 @@ if signal_df is not None and not signal_df.empty:
     latest_date = signal_df["date"].iloc[-1]
     latest_pos = float(signal_df["pos"].iloc[-1]) if "pos" in signal_df.columns else float(signal_df["signal"].iloc[-1])
 
+watch_artifacts(artifact_sig)
 st.title("Macro Multimodal Hedge AI")
 st.caption("Institutional research dashboard: time-only baseline vs fused/calibrated strategy")
 st.markdown(
@@ -465,78 +673,68 @@ render_kpi_card(
 
 st.markdown("<div class='section-gap'></div>", unsafe_allow_html=True)
 st.header("Performance")
-if "curve_time_only" in data and "curve_fused" in data:
-    curves = (
-        data["curve_time_only"][["date", "equity"]]
-        .rename(columns={"equity": "Time-only"})
-        .merge(
-            data["curve_fused"][["date", "equity"]].rename(columns={"equity": "Fused / Calibrated"}),
-            on="date",
-            how="outer",
-        )
-        .sort_values("date")
-    )
+if "time_only" in curves and "fused" in curves:
+    eq_df = merge_series([
+        curve_points(curves["time_only"], "Time-only", "equity", view, max_points),
+        curve_points(curves["fused"], "Fused / Calibrated", "equity", view, max_points),
+    ])
     st.markdown("<div class='chart-wrap'>", unsafe_allow_html=True)
-    st.altair_chart(equity_chart(curves), use_container_width=True)
+    st.altair_chart(equity_chart(eq_df), use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
-elif "curve_time_only" in data:
-    st.line_chart(data["curve_time_only"].set_index("date")[["equity"]], height=430)
+elif "time_only" in curves:
+    c_time = curve_points(curves["time_only"], "equity", "equity", view, max_points)
+    st.line_chart(c_time.set_index("date")[["equity"]], height=430)
 else:
     st.info("Run training first to generate performance curves.")
 
 st.markdown("<div class='section-gap'></div>", unsafe_allow_html=True)
 st.header("Drawdown")
-if "curve_time_only" in data and "curve_fused" in data:
-    c_time = drawdown_frame(data["curve_time_only"])
-    c_fused = drawdown_frame(data["curve_fused"])
-    dd = (
-        c_time[["date", "drawdown"]]
-        .rename(columns={"drawdown": "Time-only"})
-        .merge(
-            c_fused[["date", "drawdown"]].rename(columns={"drawdown": "Fused / Calibrated"}),
-            on="date",
-            how="outer",
-        )
-        .sort_values("date")
-    )
+if "time_only" in curves and "fused" in curves:
+    dd = merge_series([
+        curve_points(curves["time_only"], "Time-only", "drawdown", view, max_points),
+        curve_points(curves["fused"], "Fused / Calibrated", "drawdown", view, max_points),
+    ])
     st.markdown("<div class='chart-wrap'>", unsafe_allow_html=True)
     st.altair_chart(drawdown_chart(dd), use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
-elif "curve_time_only" in data:
-    c_time = drawdown_frame(data["curve_time_only"])
+elif "time_only" in curves:
+    c_time = curve_points(curves["time_only"], "drawdown", "drawdown", view, max_points)
     st.line_chart(c_time.set_index("date")[["drawdown"]], height=335)
 else:
     st.info("No drawdown series found.")
 
 st.markdown("<div class='section-gap'></div>", unsafe_allow_html=True)
 st.header("Rolling Directional Accuracy")
-rh_cols = []
-if "wf_time_only" in data:
-    r1 = rolling_hit_rate(data["wf_time_only"], "p").rename(columns={"rolling_hit_rate": "Time-only"})
-    rh_cols.append(r1)
-if "wf_fused_cal" in data:
-    r2 = rolling_hit_rate(data["wf_fused_cal"], "p_cal").rename(columns={"rolling_hit_rate": "Fused / Calibrated"})
-    rh_cols.append(r2)
-elif "wf_fused" in data:
-    r2 = rolling_hit_rate(data["wf_fused"], "p").rename(columns={"rolling_hit_rate": "Fused"})
-    rh_cols.append(r2)
-
-if rh_cols:
-    rolling_df = rh_cols[0]
-    for nxt in rh_cols[1:]:
-        rolling_df = rolling_df.merge(nxt, on="date", how="outer")
+shown = []
+for s_name, label in STRATEGY_LABELS.items():
+    if s_name in bundle:
+        r = in_range(bundle[s_name]["rolling"][["date", f"hit_{hit_window}"]], view)
+        r = r.rename(columns={f"hit_{hit_window}": label})
+        shown.append(downsample(r, label, visible_budget(int(r[label].notna().sum()), max_points)))
+
+if shown:
+    rolling_df = merge_series(shown)
     st.markdown("<div class='chart-wrap'>", unsafe_allow_html=True)
-    st.altair_chart(rolling_acc_chart(rolling_df.sort_values("date")), use_container_width=True)
+    st.altair_chart(rolling_acc_chart(rolling_df, hit_window), use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
 else:
     st.info("Walk-forward outputs not found for rolling accuracy view.")
 
+st.markdown("<div class='section-gap'></div>", unsafe_allow_html=True)
+st.header("Monthly Returns")
+if bundle:
+    tabs = st.tabs([STRATEGY_LABELS[s_name] for s_name in bundle])
+    for tab, s_name in zip(tabs, bundle):
+        tab.dataframe(monthly_table(bundle[s_name]["monthly"]), use_container_width=True)
+else:
+    st.info("No monthly returns yet.")
+
 st.markdown("<div class='section-gap'></div>", unsafe_allow_html=True)
 st.header("Key Metrics")
 rows = []
-for k, label in [("curve_time_only", "Time-only"), ("curve_fused", "Fused / Calibrated")]:
-    if k in data:
-        stats = data[k].attrs.get("stats", {})
+for s_name, label in STRATEGY_LABELS.items():
+    if s_name in kpis.get("stats", {}):
+        stats = kpis["stats"][s_name]
         rows.append(
             {
                 "Strategy": label,
@@ -555,6 +753,23 @@ if rows:
 else:
     st.info("No metrics found yet.")
 
+st.markdown("<div class='section-gap'></div>", unsafe_allow_html=True)
+st.header("What-if Sizing")
+whatif_src = next(((k, col) for k, col in WHATIF_SOURCES if k in artifact_sig), None)
+if whatif_src is not None and MARKET_CSV.exists():
+    wf_key, prob_col = whatif_src
+    m_stat = MARKET_CSV.stat()
+    inputs = whatif_inputs(str(ARTIFACT_DIR / f"{wf_key}.parquet"), prob_col, artifact_sig[wf_key],
+                           str(MARKET_CSV), (m_stat.st_mtime_ns, m_stat.st_size))
+    st.caption(f"Re-sizes the saved `{wf_key}` probabilities (`{prob_col}`) and re-runs the backtest; "
+               "deltas compare against the saved curve.")
+    ref_key = "fused" if wf_key != "wf_time_only" else "time_only"
+    ref_label = STRATEGY_LABELS[ref_key]
+    whatif_panel(inputs, curves.get(ref_key), kpis.get("stats", {}).get(ref_key), ref_label, view, max_points,
+                 kpis.get("interval", "1d"))
+else:
+    st.info("Needs walk-forward outputs and data/processed/market.csv.")
+
 st.markdown("<div class='section-gap'></div>", unsafe_allow_html=True)
 st.header("How It Works")
 st.markdown(
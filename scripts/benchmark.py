@@ -0,0 +1,58 @@
+import argparse
+import platform
+import time
+from src.bench.cases import CASES, GRIDS, case_id
+from src.bench.harness import measure_isolated, load_results, save_results, compare, format_table
+
+def main():
+    ap = argparse.ArgumentParser("Benchmark the pipeline's hot paths on deterministic synthetic inputs.")
+    ap.add_argument("--grid", choices=sorted(GRIDS), default="quick", help="Input sizes to run")
+    ap.add_argument("--cases", default="", help=f"Comma-separated subset of: {','.join(CASES)}")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per case (median is reported)")
+    ap.add_argument("--baseline", default="data/bench/baseline.json")
+    ap.add_argument("--out", default="data/bench/last.json")
+    ap.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=0.2, help="Flag cases slower/bigger than baseline by this fraction")
+    args = ap.parse_args()
+
+    names = [c for c in args.cases.split(",") if c] or list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise SystemExit(f"Unknown cases: {sorted(unknown)}")
+
+    baseline = load_results(args.baseline)
+    results = {}
+    for name in names:
+        for size in GRIDS[args.grid].get(name, []):
+            cid = case_id(name, size)
+            # walk_forward refits XGBoost hundreds of times; one timed run is enough
+            repeat = 1 if name == "walk_forward" else args.repeat
+            t0 = time.perf_counter()
+            results[cid] = measure_isolated(name, size, repeat=repeat)
+            print(f"[bench] {cid}: {results[cid]['seconds']:.3f}s "
+                  f"(peak {results[cid]['peak_mb']:.1f} MB, total {time.perf_counter() - t0:.1f}s)")
+
+    meta = {"grid": args.grid, "python": platform.python_version(), "machine": platform.machine(),
+            "node": platform.node(), "when": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    save_results(args.out, results, meta)
+    print("\n" + format_table(results, baseline))
+
+    if args.save_baseline:
+        merged = {**baseline, **results}
+        save_results(args.baseline, merged, meta)
+        print(f"\nBaseline updated -> {args.baseline} ({len(results)} cases)")
+        return
+
+    regressions = compare(results, baseline, threshold=args.threshold)
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+    elif regressions:
+        print(f"\nREGRESSIONS (> {args.threshold:.0%} over baseline):")
+        for r in regressions:
+            print(f"  {r['case']:44s} {r['metric']:8s} {r['baseline']:.3f} -> {r['current']:.3f} ({r['change']:+.0%})")
+        raise SystemExit(1)
+    else:
+        print(f"\nNo regressions above {args.threshold:.0%}.")
+
+if __name__ == "__main__":
+    main()
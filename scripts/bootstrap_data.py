@@ -3,11 +3,22 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 from pandas.tseries.offsets import BDay
+from src.data.bars import BAR_MINUTES, bars_per_day, intraday_start, is_intraday, session_stamps
 from src.data.fetch_market import merge_market
+from src.data.market_store import MarketStore
+from src.data.feature_store import FeatureStore
+from src.features import registry, ts_features
 from src.features.ts_features import add_time_features
+from src.features.registry import compute_features
+from src.tracing import traced
 
-def make_offline_stub(start="2010-01-01"):
+# intraday bars per feature-engine chunk (bounds working memory, values are unchanged)
+FEATURE_CHUNK_ROWS = 250_000
+
+def make_offline_stub(start="2010-01-01", interval="1d"):
     dates = pd.date_range(start, pd.Timestamp.today().normalize(), freq=BDay())
+    if is_intraday(interval):
+        return _offline_intraday_stub(dates, interval)
     rng = np.random.RandomState(42)
     # geometric random walk with mild drift
     ret = rng.normal(0.0004, 0.01, len(dates))
@@ -34,10 +45,48 @@ def make_offline_stub(start="2010-01-01"):
     })
     return df
 
+def _offline_intraday_stub(days: pd.DatetimeIndex, interval: str) -> pd.DataFrame:
+    """Same random-walk model on session bars; macro columns are constant within a day."""
+    k = bars_per_day(interval)
+    stamps = session_stamps(days, interval)
+    rng = np.random.RandomState(42)
+    n = len(stamps)
+    ret = rng.normal(0.0004 / k, 0.01 / np.sqrt(k), n)
+    close = 100 * np.cumprod(1 + ret)
+    openp = np.r_[close[0], close[:-1]]
+    high = np.maximum(openp, close) * (1 + 0.005 / np.sqrt(k) * rng.rand(n))
+    low = np.minimum(openp, close) * (1 - 0.005 / np.sqrt(k) * rng.rand(n))
+    vol = (1e7 + 2e6 * rng.rand(n)) / k
+    dgs10 = 2.0 + 0.5 * rng.randn(len(days))
+    term_spread = 1.0 + 0.5 * rng.randn(len(days))
+    f32 = np.float32
+    return pd.DataFrame({
+        "date": stamps,
+        "open": openp.astype(f32),
+        "high": high.astype(f32),
+        "low": low.astype(f32),
+        "close": close.astype(f32),
+        "adj close": close.astype(f32),
+        "volume": vol.astype(np.int64),
+        "vix": np.repeat(20 + 5 * rng.randn(len(days)), k).astype(f32),
+        "DGS10": np.repeat(dgs10, k).astype(f32),
+        "DGS3MO": np.repeat(dgs10 - term_spread, k).astype(f32),
+    })
+
+@traced()
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--offline", action="store_true", help="force offline synthetic data")
     parser.add_argument("--start", default="2010-01-01")
+    parser.add_argument("--interval", default="1d", choices=sorted(BAR_MINUTES),
+                        help="Bar size; intraday SPY bars come from yfinance (recent history only, no synthetic "
+                             "fallback), macro stays daily")
+    parser.add_argument("--store", default="data/store/market", help="Local market-data store (delta fetches)")
+    parser.add_argument("--no-store", action="store_true", help="Download full history without the local store")
+    parser.add_argument("--registry-features", action="store_true",
+                        help="Also add every feature in src.features.registry (extra windows, z-scores, EWM/Parkinson vol, skew; windows in bars)")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute features even if inputs are unchanged")
+    parser.add_argument("--from-store", action="store_true", help="Use only the local store (no network)")
     args = parser.parse_args()
 
     OUT = Path("data/processed")
@@ -45,21 +94,47 @@ def main():
 
     if args.offline:
         print("Using offline synthetic data…")
-        market = make_offline_stub(args.start)
+        market = make_offline_stub(args.start, args.interval)
+    elif is_intraday(args.interval):
+        # never train on synthetic bars in place of requested intraday data
+        earliest = intraday_start(args.start, args.interval)
+        if pd.Timestamp(earliest) > pd.Timestamp(args.start):
+            print(f"Intraday {args.interval} history is only available from {earliest}; fetching from there "
+                  f"(older bars already in the store are kept).")
+        store = None if args.no_store else MarketStore(args.store)
+        market = merge_market(start=args.start, store=store, offline=args.from_store, interval=args.interval)
+        if market is None or market.empty:
+            raise SystemExit(f"No {args.interval} SPY bars since {earliest}; use --offline for synthetic bars.")
     else:
         try:
             print("Fetching market data (SPY, VIX, 10Y, 3M)…")
-            market = merge_market(start=args.start)
+            store = None if args.no_store else MarketStore(args.store)
+            market = merge_market(start=args.start, store=store, offline=args.from_store, interval=args.interval)
             if market is None or market.empty:
                 print("Remote sources returned empty; switching to offline synthetic data.")
-                market = make_offline_stub(args.start)
+                market = make_offline_stub(args.start, args.interval)
         except Exception as e:
             print(f"Remote fetch failed: {e}\nSwitching to offline synthetic data.")
-            market = make_offline_stub(args.start)
+            market = make_offline_stub(args.start, args.interval)
 
     market.columns = [c.lower() for c in market.columns]
     (OUT / "market_raw.csv").write_text(market.to_csv(index=False))
-    feat = add_time_features(market.rename(columns={"adj close": "adj_close"}))
+
+    intraday = is_intraday(args.interval)
+
+    def features():
+        # intraday: chunked engine passes and float32 feature columns
+        feat = add_time_features(market.rename(columns={"adj close": "adj_close"}),
+                                 chunk_rows=FEATURE_CHUNK_ROWS if intraday else None,
+                                 dtype=np.float32 if intraday else None)
+        if args.registry_features:
+            extra = compute_features(feat)
+            feat = feat.join(extra[[c for c in extra.columns if c not in feat.columns]])
+        return feat
+
+    feat = FeatureStore(enabled=not args.no_cache).materialize(
+        "time_features", features, inputs=[market], code=[ts_features, registry],
+        params={"registry_features": args.registry_features, "interval": args.interval})
     (OUT / "market.csv").write_text(feat.to_csv(index=False))
     (OUT / "market_head.csv").write_text(feat.head(100).to_csv(index=False))
     print(f"Saved processed to {OUT/'market.csv'} with {len(feat):,} rows\nDone.")
@@ -1,19 +1,54 @@
 
 from pathlib import Path
 import argparse
+from src.data import bars, build_dataset, embedding_store
+from src.data.bars import BAR_MINUTES, is_intraday
 from src.data.build_dataset import load_market, load_text_features, build_fusion, save_fusion
+from src.data.feature_store import FeatureStore
+from src.data.embedding_store import EmbeddingStore, save_calendar_embeddings
+from src.tracing import traced
 
+@traced()
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--market", default="data/processed/market.csv")
     ap.add_argument("--text", default="data/processed/text_features.parquet")
     ap.add_argument("--out-prefix", default="data/processed/fusion_dataset")
+    ap.add_argument("--embeddings", default="data/processed/text_embeddings",
+                    help="Embedding store prefix (optional); re-indexed to the fusion rows as <out-prefix>_emb")
+    ap.add_argument("--csv", action="store_true", help="Also export <out-prefix>.csv (full precision)")
+    ap.add_argument("--no-cache", action="store_true", help="Rebuild even if inputs are unchanged")
+    ap.add_argument("--interval", default="1d", choices=sorted(BAR_MINUTES), help="Bar size of market.csv")
     args = ap.parse_args()
 
-    m = load_market(args.market)
-    t = load_text_features(args.text)
-    X = build_fusion(m, t, fill_neutral=True)
-    save_fusion(X, args.out_prefix)
+    has_emb = EmbeddingStore.exists(args.embeddings)
+    emb_out = f"{args.out_prefix}_emb" if has_emb else None
+    inputs = [args.market, args.text] + ([f"{args.embeddings}.npy", f"{args.embeddings}_dates.npy"] if has_emb else [])
+    fs = FeatureStore(enabled=not args.no_cache)
+    key = fs.key("fusion", inputs=inputs, code=[build_dataset, bars, embedding_store],
+                 params={"interval": args.interval, "embeddings": emb_out})
+    outputs = [f"{args.out_prefix}.parquet/_meta.json"] + ([f"{args.out_prefix}.csv"] if args.csv else [])
+    if has_emb:
+        outputs += [f"{emb_out}.npy", f"{emb_out}_dates.npy"]
+    if fs.up_to_date(outputs, key):
+        print(f"Fusion dataset {args.out_prefix}.parquet is up to date (inputs unchanged); nothing to do.")
+        return
+
+    X = fs.load("fusion", key)
+    if X is None:
+        m = load_market(args.market)
+        t = load_text_features(args.text)
+        X = build_fusion(m, t, fill_neutral=True, interval=args.interval)
+        fs.save("fusion", key, X)
+    if has_emb:
+        # one row per fusion row, so training aligns it as a slice instead of gathering text days
+        store = EmbeddingStore(args.embeddings)
+        save_calendar_embeddings(store, X["date"], emb_out, before=is_intraday(args.interval))
+        covered = int(store.dates.isin(X["date"].dt.normalize()).sum())
+        print(f"Embeddings: {store.matrix.shape} float32 from {args.embeddings}.npy ({covered} days overlap) "
+              f"re-indexed to {len(X)} fusion rows at {emb_out}.npy")
+    save_fusion(X, args.out_prefix, csv=args.csv, embeddings=emb_out)
+    fs.stamp(outputs, key)
 
     print(f"Fusion dataset saved to {args.out_prefix}.parquet with shape {X.shape}")
     cols = [c for c in X.columns if c.startswith("finbert_")] + [c for c in X.columns if c.startswith("emb_")][:5]
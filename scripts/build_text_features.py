@@ -2,25 +2,64 @@
 import argparse
 import pandas as pd
 from pathlib import Path
-from src.nlp.finbert_features import build_finbert_features
+from src.data.feature_store import FeatureStore
+from src.nlp import finbert_features
+from src.nlp.finbert_features import build_finbert_features, build_headline_features
+from src.tracing import traced
 
+@traced()
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--input", default="data/raw/headlines.csv", help="CSV with columns: date,headline")
     p.add_argument("--use-embeddings", action="store_true", help="Also compute FinBERT pooled embeddings (slower)")
+    p.add_argument("--emb-out", default="data/processed/text_embeddings",
+                   help="Prefix for the float32 embedding matrix (<prefix>.npy + <prefix>_dates.npy)")
+    p.add_argument("--mode", choices=["day","headline"], default="day",
+                   help="day: score concatenated daily text; headline: score each headline, then aggregate")
+    p.add_argument("--max-per-day", type=int, default=50, help="Headline mode: max headlines scored per day")
+    p.add_argument("--batch-size", type=int, default=64, help="Headline mode: inference batch size")
+    p.add_argument("--no-cache", action="store_true", help="Re-run FinBERT even if the input is unchanged")
     args = p.parse_args()
 
     IN = Path(args.input)
     OUT = Path("data/processed")
     OUT.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(IN, parse_dates=["date"])
-    df = df.rename(columns={"headline": "corpus_text"})
-    feats = build_finbert_features(df, date_col="date", text_col="corpus_text", use_embeddings=args.use_embeddings)
+    fs = FeatureStore(enabled=not args.no_cache)
+    params = {k: getattr(args, k) for k in ["mode", "max_per_day", "batch_size", "use_embeddings"]}
+    key = fs.key("text_features", inputs=[IN], code=[finbert_features], params=params)
+    outputs = [OUT / "text_features.parquet", OUT / "text_features.csv"]
+    if args.use_embeddings and args.mode == "day":
+        outputs += [Path(f"{args.emb_out}.npy"), Path(f"{args.emb_out}_dates.npy")]
+    if fs.up_to_date(outputs, key):
+        print(f"Text features are up to date for {IN} (inputs unchanged); skipping FinBERT.")
+        return
+
+    # the embedding matrix is written as a side effect, so only the plain frame is reused from cache
+    feats = None if (args.use_embeddings and args.mode == "day") else fs.load("text_features", key)
+    if feats is None:
+        feats = _build(args, IN)
+        fs.save("text_features", key, feats)
 
     feats.to_parquet(OUT / "text_features.parquet", index=False)
     feats.to_csv(OUT / "text_features.csv", index=False)
+    fs.stamp(outputs, key)
     print(f"Saved {len(feats)} daily text feature rows to {OUT/'text_features.parquet'}")
 
+def _build(args, IN: Path) -> pd.DataFrame:
+    df = pd.read_csv(IN, parse_dates=["date"])
+    df = df.rename(columns={"headline": "corpus_text"})
+    if args.mode == "headline":
+        if args.use_embeddings:
+            print("[warn] --use-embeddings is ignored in headline mode")
+        feats = build_headline_features(df, date_col="date", text_col="corpus_text",
+                                        max_per_day=args.max_per_day, batch_size=args.batch_size)
+    else:
+        feats = build_finbert_features(df, date_col="date", text_col="corpus_text", use_embeddings=args.use_embeddings,
+                                       emb_out=args.emb_out)
+        if args.use_embeddings:
+            print(f"Saved daily embeddings to {args.emb_out}.npy (+ {args.emb_out}_dates.npy)")
+    return feats
+
 if __name__ == "__main__":
     main()
@@ -3,6 +3,9 @@ from pathlib import Path
 import pandas as pd
 from sklearn.isotonic import IsotonicRegression
 from src.backtest.backtest import pnl_curve
+from src.data.bars import BAR_MINUTES
+from src.viz.analytics import write_bundle
+from src.tracing import traced
 
 def build_positions(df, sizing, threshold, band, prob_scale):
     out = df.copy()
@@ -15,6 +18,7 @@ def build_positions(df, sizing, threshold, band, prob_scale):
         out["pos"] = out["signal"].astype(float)
     return out
 
+@traced()
 def main():
     ap = argparse.ArgumentParser(
         description="Leakage-safe (anchored split) probability calibration + sizing."
@@ -27,12 +31,13 @@ def main():
     ap.add_argument("--threshold", type=float, default=0.55)
     ap.add_argument("--band", type=float, default=0.00)
     ap.add_argument("--cost-bps", type=float, default=1.0)
+    ap.add_argument("--interval", default="1d", choices=sorted(BAR_MINUTES), help="Bar size of market.csv")
     ap.add_argument("--out-wf", default="data/processed/wf_fused_cal.parquet")
     ap.add_argument("--out-curve", default="data/processed/curve_fused.parquet")
     args = ap.parse_args()
 
     wf = pd.read_parquet(args.wf).sort_values("date")
-    mkt = pd.read_csv(args.market, parse_dates=["date"])
+    mkt = pd.read_csv(args.market, parse_dates=["date"], usecols=["date","close"])
 
     cut = pd.to_datetime(args.cut)
     cal = wf[wf["date"] < cut]
@@ -55,8 +60,9 @@ def main():
     live[cols].to_parquet(args.out_wf, index=False)
 
     # Build and save curve for dashboard
-    curve = pnl_curve(live, mkt, cost_bps=args.cost_bps)
+    curve = pnl_curve(live, mkt, cost_bps=args.cost_bps, interval=args.interval)
     curve.to_parquet(args.out_curve, index=False)
+    write_bundle("fused", live, curve, prob_col="p_cal", interval=args.interval)
     print("\n=== Calibrated Stats ===")
     print(curve.attrs.get("stats", {}))
 
@@ -1,8 +1,14 @@
-import argparse
+import argparse, hashlib, json, os, threading, time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
+from urllib.parse import urlsplit
 import requests, feedparser, dateparser, pandas as pd
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.tracing import traced
 
 HEADERS = {"User-Agent": "macro-multimodal-ai/1.0 (+https://example.local)"}
 FEEDS = {
@@ -13,13 +19,123 @@ FEEDS = {
     "bea_news": "https://apps.bea.gov/rss/rss.xml",  # filtered to Personal Income & Outlays (PCE)
 }
 
-def _fetch(url: str, timeout: int = 20) -> Optional[str]:
-    try:
-        r = requests.get(url, timeout=timeout, headers=HEADERS)
-        r.raise_for_status()
+class ResponseCache:
+    """On-disk cache keyed by URL: <sha1>.json holds, for feeds, the validators
+    (ETag/Last-Modified) and body and, for article pages, only the parsed first paragraph."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    def load(self, url: str) -> Optional[dict]:
+        try:
+            return json.loads(self._path(url).read_text())
+        except Exception:
+            return None
+
+    def store(self, url: str, entry: dict):
+        path = self._path(url)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(dict(entry, url=url, stored_at=time.time())))
+        os.replace(tmp, path)
+
+class Fetcher:
+    """Thread-safe GET client: pooled keep-alive connections, retry with backoff, per-host concurrency cap,
+    plus an optional persistent response cache."""
+
+    def __init__(self, per_host: int = 4, timeout: int = 20, retries: int = 3, backoff: float = 0.5,
+                 cache_dir: Optional[str] = None):
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.stats = defaultdict(int)
+        self.timeout = timeout
+        self.per_host = per_host
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(per_host, 1) * 2, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._hosts = defaultdict(lambda: threading.Semaphore(self.per_host))
+
+    def _count(self, key: str):
+        with self._stats_lock:  # get_many workers update stats concurrently
+            self.stats[key] += 1
+
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        with self._lock:
+            return self._hosts[urlsplit(url).netloc]
+
+    @traced("fetch_official_text.get")
+    def get(self, url: str, immutable: bool = False, cache_body: bool = True) -> Optional[str]:
+        """GET `url`. Cached feeds are revalidated (If-None-Match / If-Modified-Since);
+        `immutable` entries (published article pages) are served from cache without a request.
+        With `cache_body=False` the response is not written to the cache."""
+        cached = self.cache.load(url) if self.cache else None
+        if cached is not None and cached.get("body") is not None and immutable:
+            self._count("cache_hit")
+            return cached["body"]
+        headers = {}
+        if cached is not None and cached.get("body") is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        try:
+            with self._host_slot(url):
+                r = self.session.get(url, timeout=self.timeout, headers=headers)
+            if r.status_code == 304 and cached is not None:
+                self._count("not_modified")
+                return cached["body"]
+            r.raise_for_status()
+        except Exception:
+            return None
+        self._count("downloaded")
+        if self.cache and cache_body:
+            self.cache.store(url, {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"),
+                                   "body": r.text})
         return r.text
-    except Exception:
-        return None
+
+    def first_paragraph(self, url: str) -> Optional[str]:
+        """First paragraph of an article page; parsed once, then served from the cache
+        (which keeps only the paragraph, not the page)."""
+        cached = self.cache.load(url) if self.cache else None
+        if cached is not None and "paragraph" in cached:
+            self._count("parse_skipped")
+            return cached["paragraph"]
+        html = self.get(url, immutable=True, cache_body=False)
+        if not html:
+            return None
+        txt = _extract_first_paragraph(html)
+        if self.cache:
+            self.cache.store(url, {"paragraph": txt})
+        return txt
+
+    def _map(self, fn, urls: list[str], max_workers: int) -> list:
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as ex:
+            return list(ex.map(fn, urls))
+
+    def get_many(self, urls: list[str], max_workers: int = 16) -> list[Optional[str]]:
+        """Fetch concurrently; results are returned in the order of `urls`."""
+        return self._map(self.get, urls, max_workers)
+
+    def first_paragraphs(self, urls: list[str], max_workers: int = 16) -> list[Optional[str]]:
+        return self._map(self.first_paragraph, urls, max_workers)
+
+_default_fetcher = None
+
+def _fetch(url: str, timeout: int = 20) -> Optional[str]:
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = Fetcher(timeout=timeout)
+    return _default_fetcher.get(url)
 
 def _extract_first_paragraph(html: str) -> Optional[str]:
     try:
@@ -57,27 +173,33 @@ def _dedupe(df: pd.DataFrame) -> pd.DataFrame:
           .reset_index(drop=True)
     )
 
-def fetch_feed(name: str, url: str, since: Optional[pd.Timestamp], fetch_pages: bool) -> pd.DataFrame:
-    # Fetch XML via requests (custom headers), then parse
-    xml = _fetch(url)
+@traced()
+def fetch_feed(name: str, url: str, since: Optional[pd.Timestamp], fetch_pages: bool,
+               fetcher: Optional[Fetcher] = None) -> pd.DataFrame:
+    fetcher = fetcher or Fetcher()
+    # Fetch XML via a pooled session (custom headers), then parse
+    xml = fetcher.get(url)
     if not xml:
         print(f"[warn] could not fetch feed {url}")
         return pd.DataFrame(columns=["date","headline","title","link"])
 
     parsed = feedparser.parse(xml)
-    rows = []
+    entries = []
     for e in parsed.entries:
         dt = _parse_date(e.get("published") or e.get("updated") or e.get("dc_date") or e.get("date"))
         if since and dt is not None and dt < since:
             continue
-        title = (e.get("title") or "").strip()
-        link = e.get("link")
+        entries.append((dt, (e.get("title") or "").strip(), e.get("link")))
+
+    # article pages are fetched concurrently but rows keep the feed's entry order
+    links = [link for _, _, link in entries if fetch_pages and link]
+    paragraphs = dict(zip(links, fetcher.first_paragraphs(links)))
+    rows = []
+    for dt, title, link in entries:
         headline = title
-        if fetch_pages and link:
-            html = _fetch(link)
-            txt = _extract_first_paragraph(html) if html else None
-            if txt and len(txt) > 40:
-                headline = txt
+        txt = paragraphs.get(link) if (fetch_pages and link) else None
+        if txt and len(txt) > 40:
+            headline = txt
         rows.append({"date": dt, "headline": headline, "title": title, "link": link})
 
     out = pd.DataFrame(rows, columns=["date","headline","title","link"])
@@ -109,11 +231,17 @@ def save_csv(df: pd.DataFrame, path: Path):
         out = pd.DataFrame(columns=["date","headline"])
     out.to_csv(path, index=False)
 
+@traced()
 def main():
     ap = argparse.ArgumentParser("Fetch official macro text (RSS) and write CSVs (date,headline).")
     ap.add_argument("--since", default="2018-01-01", help="ISO date (e.g., 2018-01-01)")
     ap.add_argument("--outdir", default="mytexts", help="Output directory")
     ap.add_argument("--no-fetch-pages", action="store_true", help="Skip fetching article pages (use RSS titles)")
+    ap.add_argument("--per-host", type=int, default=4, help="Max concurrent requests per host")
+    ap.add_argument("--timeout", type=int, default=20, help="Per-request timeout (seconds)")
+    ap.add_argument("--retries", type=int, default=3, help="Retries (with exponential backoff) per request")
+    ap.add_argument("--cache-dir", default="data/cache/http", help="Persistent HTTP response cache")
+    ap.add_argument("--no-cache", action="store_true", help="Disable the response cache")
     args = ap.parse_args()
 
     since = pd.to_datetime(args.since).normalize() if args.since else None
@@ -126,16 +254,26 @@ def main():
         "bea_news": outdir / "bea_pce.csv",
     }
 
-    counts = {}
+    fetcher = Fetcher(per_host=args.per_host, timeout=args.timeout, retries=args.retries,
+                      cache_dir=None if args.no_cache else args.cache_dir)
     for key, url in FEEDS.items():
         print(f"[fetch] {key} -> {url}")
-        df = fetch_feed(key, url, since, fetch_pages=not args.no_fetch_pages)
+    with ThreadPoolExecutor(max_workers=len(FEEDS)) as ex:
+        futures = {key: ex.submit(fetch_feed, key, url, since, not args.no_fetch_pages, fetcher)
+                   for key, url in FEEDS.items()}
+    counts = {}
+    for key, fut in futures.items():
+        df = fut.result()
         save_csv(df, outs[key])
         counts[key] = 0 if df is None else len(df)
 
     print("\nWrote:")
     for k, p in outs.items():
         print(f"  {k:18s} -> {p} ({counts.get(k,0)} rows)")
+    if fetcher.cache:
+        st = fetcher.stats
+        print(f"HTTP: {st['downloaded']} downloaded, {st['not_modified']} not modified, "
+              f"{st['cache_hit']} cache hits, {st['parse_skipped']} page parses skipped")
 
     # Combined preview
     combined = []
@@ -1,22 +1,47 @@
-import argparse, sys, json, glob
+import argparse, sys, json, glob, gzip, os, tempfile
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from pathlib import Path
 from src.nlp.clean_text import clean_text
+from src.nlp.near_dup import near_duplicate_mask
+from src.tracing import traced
 
 DATE_CANDIDATES = ["date","datetime","published","published_at","time","timestamp"]
 TEXT_CANDIDATES = ["headline","title","text","content","body"]
+SPILL_COLS = ["file_idx","row_idx","date","headline"]
 
-def _read_any(path: Path) -> pd.DataFrame:
-    ext = path.suffix.lower()
-    if ext == ".csv":
-        return pd.read_csv(path)
-    if ext in [".jsonl",".jsonl.txt"]:
-        rows = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
-        return pd.DataFrame(rows)
-    if ext == ".json":
-        obj = json.loads(path.read_text())
-        return pd.DataFrame(obj if isinstance(obj, list) else [obj])
-    raise ValueError(f"Unsupported file type: {ext} ({path})")
+def _kind(path: Path) -> tuple[str, bool]:
+    """(format, gzipped) from the file name, e.g. news.jsonl.gz -> ("jsonl", True)."""
+    suffixes = [x.lower() for x in path.suffixes]
+    gz = bool(suffixes) and suffixes[-1] == ".gz"
+    if gz:
+        suffixes = suffixes[:-1]
+    if suffixes[-2:] == [".jsonl", ".txt"]:
+        return "jsonl", gz
+    ext = suffixes[-1] if suffixes else ""
+    if ext in [".csv", ".jsonl", ".json"]:
+        return ext[1:], gz
+    raise ValueError(f"Unsupported file type: {''.join(path.suffixes)} ({path})")
+
+def _iter_chunks(path: Path, chunksize: int = 50_000):
+    """Yield DataFrames of at most `chunksize` rows; CSV/JSONL (optionally gzipped) are streamed."""
+    kind, gz = _kind(path)
+    if kind == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize, compression="gzip" if gz else None)
+    elif kind == "jsonl":
+        with (gzip.open(path, "rt") if gz else open(path)) as fh:
+            rows = []
+            for line in fh:
+                if line.strip():
+                    rows.append(json.loads(line))
+                if len(rows) >= chunksize:
+                    yield pd.DataFrame(rows); rows = []
+            if rows:
+                yield pd.DataFrame(rows)
+    else:  # a single JSON document cannot be streamed; these are small metadata files in practice
+        with (gzip.open(path, "rt") if gz else open(path)) as fh:
+            obj = json.load(fh)
+        yield pd.DataFrame(obj if isinstance(obj, list) else [obj])
 
 def _auto_cols(df: pd.DataFrame, date_col: str|None, text_col: str|None):
     mapping = {c.lower(): c for c in df.columns}
@@ -26,14 +51,57 @@ def _auto_cols(df: pd.DataFrame, date_col: str|None, text_col: str|None):
         raise ValueError(f"Could not infer date/text columns. Columns: {list(df.columns)}")
     return dcol, tcol
 
+
+def _spill_file(job: tuple) -> int:
+    """Clean one input file chunk by chunk and append rows to date-range partitions under the spill dir."""
+    file_idx, path, spill_dir, date_col, text_col, min_chars, partition_days, chunksize = job
+    n, row0, cols = 0, 0, None
+    for df in _iter_chunks(Path(path), chunksize=chunksize):
+        if cols is None:
+            cols = _auto_cols(df, date_col, text_col)
+        dcol, tcol = cols
+        tmp = df[[dcol, tcol]].rename(columns={dcol:"date", tcol:"headline"})
+        tmp.insert(0, "row_idx", range(row0, row0 + len(tmp)))
+        tmp.insert(0, "file_idx", file_idx)
+        row0 += len(df)
+        tmp["date"] = pd.to_datetime(tmp["date"], errors="coerce")
+        if tmp["date"].dt.tz is not None:
+            tmp["date"] = tmp["date"].dt.tz_localize(None)
+        tmp["date"] = tmp["date"].dt.normalize()
+        tmp["headline"] = tmp["headline"].map(clean_text)
+        tmp = tmp.dropna(subset=["date"])
+        tmp = tmp[tmp["headline"].str.len() >= min_chars]
+        if tmp.empty:
+            continue
+        part = tmp["date"].to_numpy().astype("datetime64[D]").astype("int64") // partition_days
+        for key, g in tmp.groupby(part, sort=False):
+            g.to_csv(Path(spill_dir) / f"part_{int(key):06d}_{file_idx:05d}.csv",
+                     mode="a", header=False, index=False, date_format="%Y-%m-%d")
+        n += len(tmp)
+    return n
+
+def _read_partition(spill_dir: Path, key: int) -> pd.DataFrame:
+    parts = [pd.read_csv(f, names=SPILL_COLS, parse_dates=["date"], keep_default_na=False)
+             for f in sorted(spill_dir.glob(f"part_{key:06d}_*.csv"))]
+    return pd.concat(parts, ignore_index=True).sort_values(["date","file_idx","row_idx"], kind="stable")
+
+@traced()
 def main():
-    ap = argparse.ArgumentParser(description="Merge CSV/JSON/JSONL into data/raw/headlines.csv (date,headline).")
+    ap = argparse.ArgumentParser(description="Merge CSV/JSON/JSONL (optionally .gz) into data/raw/headlines.csv (date,headline).")
     ap.add_argument("inputs", nargs="+", help="Input files or globs")
     ap.add_argument("--out", default="data/raw/headlines.csv")
     ap.add_argument("--date-col", default=None)
     ap.add_argument("--text-col", default=None)
     ap.add_argument("--min-chars", type=int, default=20)
     ap.add_argument("--max-per-day", type=int, default=50)
+    ap.add_argument("--near-dup-threshold", type=float, default=0.8,
+                    help="MinHash Jaccard threshold for near-duplicate removal (0 disables)")
+    ap.add_argument("--near-dup-days", type=int, default=1, help="Compare headlines up to this many days apart")
+    ap.add_argument("--chunksize", type=int, default=50_000, help="Rows parsed per chunk")
+    ap.add_argument("--partition-days", type=int, default=7,
+                    help="Days per on-disk spill partition; peak memory is about one partition")
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Files parsed in parallel")
+    ap.add_argument("--spill-dir", default=None, help="Directory for temporary spill files (default: system temp)")
     args = ap.parse_args()
 
     paths = []
@@ -42,26 +110,46 @@ def main():
     if not paths:
         print("No inputs matched.", file=sys.stderr); sys.exit(1)
 
-    rows = []
-    for p in paths:
-        df = _read_any(p)
-        dcol, tcol = _auto_cols(df, args.date_col, args.text_col)
-        tmp = df[[dcol, tcol]].rename(columns={dcol:"date", tcol:"headline"}).copy()
-        tmp["date"] = pd.to_datetime(tmp["date"], errors="coerce").dt.normalize()
-        tmp["headline"] = tmp["headline"].map(clean_text)
-        tmp = tmp.dropna(subset=["date"])
-        tmp = tmp[tmp["headline"].str.len() >= args.min_chars]
-        rows.append(tmp)
-
-    data = pd.concat(rows, ignore_index=True)
-    data = data.drop_duplicates(subset=["date","headline"])  # exact dedupe
-    data = data.sort_values("date").groupby("date").head(args.max_per_day).reset_index(drop=True)
+    with tempfile.TemporaryDirectory(prefix="ingest_spill_", dir=args.spill_dir) as tmpdir:
+        spill = Path(tmpdir)
+        jobs = [(i, str(p), tmpdir, args.date_col, args.text_col, args.min_chars, args.partition_days, args.chunksize)
+                for i, p in enumerate(paths)]
+        if args.workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                parsed = sum(ex.map(_spill_file, jobs))
+        else:
+            parsed = sum(_spill_file(j) for j in jobs)
 
-    out = Path(args.out); out.parent.mkdir(parents=True, exist_ok=True)
-    data.to_csv(out, index=False)
+        out = Path(args.out); out.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(columns=["date","headline"]).to_csv(out, index=False)
+        keys = sorted({int(f.name.split("_")[1]) for f in spill.glob("part_*.csv")})
+        carry = None  # kept rows within --near-dup-days of the latest date seen
+        near_removed, written, cov = 0, 0, []
+        # partitions are disjoint date ranges, processed in date order: exact dedupe and the
+        # per-day cap are local; near-dup sees every kept row inside its window as context,
+        # however many earlier partitions that spans
+        for key in keys:
+            data = _read_partition(spill, key).drop_duplicates(subset=["date","headline"])  # exact dedupe
+            if args.near_dup_threshold > 0:
+                both = data if carry is None else pd.concat([carry, data], ignore_index=True)
+                ctx = 0 if carry is None else len(carry)
+                keep = near_duplicate_mask(both["date"], both["headline"], threshold=args.near_dup_threshold,
+                                           window_days=args.near_dup_days)[ctx:]
+                near_removed += int((~keep).sum())
+                data = data[keep]
+                kept = data if carry is None else pd.concat([carry, data], ignore_index=True)
+                if not kept.empty:
+                    carry = kept[kept["date"] >= kept["date"].max() - pd.Timedelta(days=args.near_dup_days)]
+            data = data.groupby("date").head(args.max_per_day)
+            data[["date","headline"]].to_csv(out, mode="a", header=False, index=False, date_format="%Y-%m-%d")
+            written += len(data)
+            cov.append(data.groupby("date").size())
 
-    cov = data.groupby("date").size().rename("rows").reset_index()
-    print(f"Wrote {len(data)} rows to {out}. Unique days: {len(cov)}")
+    if args.near_dup_threshold > 0:
+        print(f"Near-duplicate stage removed {near_removed} rows")
+    cov = (pd.concat(cov) if cov else pd.Series(dtype=int)).rename("rows").rename_axis("date").reset_index()
+    print(f"Parsed {parsed} rows from {len(paths)} files.")
+    print(f"Wrote {written} rows to {out}. Unique days: {len(cov)}")
     print("Last few days coverage:"); print(cov.tail(10))
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+import argparse, asyncio, json
+import pandas as pd
+from pathlib import Path
+from src.live.runner import LiveRunner, serve_metrics
+from src.live.sources import FileTailSource
+from src.models.walk_forward import load_model
+from src.tracing import traced
+
+# Long-running scorer: tails a bars CSV (and optionally a headlines CSV) that a feed
+# process appends to, and emits one signal per completed bar into <state-dir>.
+
+@traced()
+def main():
+    ap = argparse.ArgumentParser("Score live bars with the saved fused model.")
+    ap.add_argument("--model", default="data/processed/model_fused.json", help="Saved by train_baseline --model-out")
+    ap.add_argument("--bars", default="data/live/bars.csv", help="Append-only CSV of completed bars (market_raw.csv columns)")
+    ap.add_argument("--headlines", default=None, help="Append-only CSV of date,headline rows")
+    ap.add_argument("--history", default="data/processed/market_raw.csv",
+                    help="Past bars to warm the features up from on a fresh start")
+    ap.add_argument("--state-dir", default="data/live")
+    ap.add_argument("--poll", type=float, default=0.05, help="Seconds between file polls")
+    ap.add_argument("--no-text", action="store_true", help="Skip headline scoring (neutral text features)")
+    ap.add_argument("--metrics-port", type=int, default=None, help="Serve /metrics JSON on this port")
+    ap.add_argument("--exit-after-idle", type=float, default=None,
+                    help="Stop after this many seconds without new rows (replays/tests)")
+    args = ap.parse_args()
+
+    model, meta = load_model(args.model)
+    source = FileTailSource(args.bars, args.headlines, poll=args.poll, stop_after_idle=args.exit_after_idle)
+    runner = LiveRunner(model, meta, state_dir=args.state_dir, text=not args.no_text)
+    if runner.load_state(source):
+        print(f"Resumed from {runner.state_path} at {runner.last_date}")
+    elif Path(args.history).exists():
+        runner.warm_up(pd.read_csv(args.history))
+        print(f"Warmed up on {args.history} through {runner.last_date}")
+
+    def on_signal(row):
+        print(f"{row['date']}  p={row['p']:.3f}  target={row['pos_target']:.2f}  equity={row['equity']:.4f}")
+
+    async def run():
+        server = await serve_metrics(runner, port=args.metrics_port) if args.metrics_port else None
+        try:
+            await runner.run(source, on_signal=on_signal)
+        finally:
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        runner.save_state(source)
+    runner.write_metrics(force=True)
+    print(json.dumps(runner.metrics.summary(), indent=2))
+
+if __name__ == "__main__":
+    main()
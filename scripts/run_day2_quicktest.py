@@ -1,6 +1,7 @@
 
 import pandas as pd
 from pathlib import Path
+from src.data.build_dataset import load_fusion
 
 p1 = Path("data/processed/text_features.parquet")
 p2 = Path("data/processed/fusion_dataset.parquet")
@@ -16,6 +17,6 @@ if not p2.exists():
     print("Fusion dataset not found. Run:")
     print("  python -m scripts.build_fusion_dataset")
 else:
-    X = pd.read_parquet(p2)
+    X = load_fusion(str(p2))
     print("✅ fusion_dataset.parquet:", X.shape)
     print(X[["date","close","y","finbert_neg","finbert_neu","finbert_pos"]].tail())
@@ -0,0 +1,91 @@
+import argparse
+import glob
+import json
+import time
+from pathlib import Path
+from src.data.bars import BAR_MINUTES
+from src.pipeline.dag import Stage, Pipeline, format_report
+from src.tracing import traced
+
+P = "data/processed"
+A = f"{P}/analytics"
+
+def build_stages(args) -> list[Stage]:
+    bar = ["--interval", args.interval]
+    market_args = ["--start", args.start] + bar + (["--offline"] if args.offline else [])
+    stages = [
+        Stage("market", "scripts.bootstrap_data", market_args,
+              outputs=[f"{P}/market.csv"], refresh_hours=args.refresh_hours),
+        Stage("ingest_text", "scripts.ingest_text_sources",
+              # expanded at run time so newly fetched files are picked up
+              lambda: sorted(glob.glob(f"{args.text_dir}/*.csv")) + ["--out", "data/raw/headlines.csv"],
+              inputs=[f"{args.text_dir}/*.csv"], outputs=["data/raw/headlines.csv"]),
+        # headline mode: the per-headline aggregates are what the live runner can reproduce
+        Stage("text_features", "scripts.build_text_features",
+              ["--input", "data/raw/headlines.csv", "--mode", "headline"],
+              inputs=["data/raw/headlines.csv"], outputs=[f"{P}/text_features.parquet"]),
+        Stage("fusion", "scripts.build_fusion_dataset", bar,
+              inputs=[f"{P}/market.csv", f"{P}/text_features.parquet"],
+              outputs=[f"{P}/fusion_dataset.parquet"]),
+        # curve_fused.parquet and the fused analytics are rewritten by calibrate, so train does not declare
+        # them; kpis.json is written by both (train's copy only has to exist, see Pipeline)
+        Stage("train", "scripts.train_baseline",
+              ["--min-date", args.min_date, "--start-idx", "252", "--step", str(args.step),
+               "--cost-bps", str(args.cost_bps)] + bar,
+              inputs=[f"{P}/fusion_dataset.parquet", f"{P}/market.csv"],
+              outputs=[f"{P}/wf_time_only.parquet", f"{P}/wf_fused.parquet", f"{P}/curve_time_only.parquet",
+                       f"{A}/time_only_*.parquet", f"{A}/kpis.json", f"{P}/model_fused.json"]),
+        Stage("calibrate", "scripts.calibrate_probs",
+              ["--cut", args.cut, "--sizing", "prob", "--prob-scale", "0.06", "--cost-bps", str(args.cost_bps)] + bar,
+              inputs=[f"{P}/wf_fused.parquet", f"{P}/market.csv"],
+              outputs=[f"{P}/wf_fused_cal.parquet", f"{P}/curve_fused.parquet", f"{A}/fused_*.parquet",
+                       f"{A}/kpis.json"]),
+        Stage("sweep", "scripts.sweep_thresholds", ["--cost-bps", str(args.cost_bps)] + bar,
+              inputs=[f"{P}/wf_fused.parquet", f"{P}/market.csv"],
+              outputs=[f"{P}/sweep_results.csv"]),
+    ]
+    if args.offline and not glob.glob(f"{args.text_dir}/*.csv"):
+        stages = [s for s in stages if s.name != "ingest_text"]  # keep the existing headlines file
+    if not args.offline:
+        stages.insert(1, Stage("fetch_text", "scripts.fetch_official_text",
+                               ["--since", args.since, "--outdir", args.text_dir],
+                               outputs=[args.text_dir], refresh_hours=args.refresh_hours))
+    return stages
+
+@traced()
+def main():
+    ap = argparse.ArgumentParser("Run the data -> model -> backtest pipeline, skipping up-to-date stages.")
+    ap.add_argument("--start", default="2010-01-01", help="Market history start")
+    ap.add_argument("--since", default="2018-01-01", help="Official text start")
+    ap.add_argument("--text-dir", default="mytexts")
+    ap.add_argument("--min-date", default="2018-01-01")
+    ap.add_argument("--step", type=int, default=10, help="Walk-forward refit step in trading days")
+    ap.add_argument("--cost-bps", type=float, default=1.0)
+    ap.add_argument("--cut", default="2023-01-01", help="Calibration cut date")
+    ap.add_argument("--interval", default="1d", choices=sorted(BAR_MINUTES),
+                    help="Bar size for market data, labels, features and annualization")
+    ap.add_argument("--offline", action="store_true", help="Synthetic market data, no text fetch")
+    ap.add_argument("--refresh-hours", type=float, default=12.0,
+                    help="Re-fetch remote data (market, official text) once it is older than this")
+    ap.add_argument("--workers", type=int, default=2, help="Independent stages run concurrently")
+    ap.add_argument("--force", default="", help="Comma-separated stages to re-run, or 'all'")
+    ap.add_argument("--only", default="", help="Comma-separated stages to run (others are left as is)")
+    ap.add_argument("--dry-run", action="store_true", help="Show what would run")
+    args = ap.parse_args()
+
+    pipe = Pipeline(build_stages(args), workers=args.workers)
+    force = [s for s in args.force.split(",") if s]
+    only = [s for s in args.only.split(",") if s] or None
+    t0 = time.perf_counter()
+    report = pipe.run(force=force, only=only, dry_run=args.dry_run)
+    wall = time.perf_counter() - t0
+
+    print("\n" + format_report(report, wall))
+    if not args.dry_run:
+        out = Path(pipe.state_dir) / "last_run.json"
+        out.write_text(json.dumps({"wall_seconds": wall, "stages": report}, indent=2))
+    if any(r["status"] in ("failed", "blocked") for r in report.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import argparse, itertools, json
 import pandas as pd
 from pathlib import Path
 from src.backtest.backtest import pnl_curve
+from src.data.bars import BAR_MINUTES
+from src.tracing import traced
 
 def make_positions(df: pd.DataFrame, sizing: str, threshold: float, band: float, prob_scale: float):
     out = df.copy()
@@ -13,6 +15,28 @@ def make_positions(df: pd.DataFrame, sizing: str, threshold: float, band: float,
         out["pos"] = z.clip(0, 1)
     return out
 
+def run_sweep(wf: pd.DataFrame, market: pd.DataFrame, sizing: str, thresholds, bands, prob_scales,
+              cost_bps: float = 1.0, interval: str = "1d") -> pd.DataFrame:
+    """Backtest stats for every sizing setting, best Sharpe first."""
+    results = []
+    if sizing == "binary":
+        for T, B in itertools.product(thresholds, bands):
+            df = make_positions(wf, "binary", T, B, 0.1)
+            curve = pnl_curve(df, market, cost_bps=cost_bps, interval=interval)
+            stats = curve.attrs.get("stats", {}).copy()
+            stats.update({"sizing":"binary","threshold":T,"band":B})
+            results.append(stats)
+    else:
+        for PS in prob_scales:
+            df = make_positions(wf, "prob", 0.5, 0.0, PS)
+            curve = pnl_curve(df, market, cost_bps=cost_bps, interval=interval)
+            stats = curve.attrs.get("stats", {}).copy()
+            stats.update({"sizing":"prob","prob_scale":PS})
+            results.append(stats)
+    out = pd.DataFrame(results)
+    return out.sort_values(["Sharpe (net)","Total Return (net)"], ascending=False)
+
+@traced()
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--wf", default="data/processed/wf_fused.parquet")
@@ -22,30 +46,15 @@ def main():
     ap.add_argument("--thresholds", default="0.55,0.57,0.60")
     ap.add_argument("--bands", default="0.00,0.02,0.05")
     ap.add_argument("--prob-scales", default="0.08,0.10,0.15")
+    ap.add_argument("--interval", default="1d", choices=sorted(BAR_MINUTES), help="Bar size of market.csv")
     args = ap.parse_args()
 
     wf = pd.read_parquet(args.wf)
-    market = pd.read_csv(args.market, parse_dates=["date"])
+    market = pd.read_csv(args.market, parse_dates=["date"], usecols=["date","close"])
 
-    results = []
-    if args.sizing == "binary":
-        for T, B in itertools.product(map(float, args.thresholds.split(",")),
-                                      map(float, args.bands.split(","))):
-            df = make_positions(wf, "binary", T, B, 0.1)
-            curve = pnl_curve(df, market, cost_bps=args.cost_bps)
-            stats = curve.attrs.get("stats", {}).copy()
-            stats.update({"sizing":"binary","threshold":T,"band":B})
-            results.append(stats)
-    else:
-        for PS in map(float, args.prob_scales.split(",")):
-            df = make_positions(wf, "prob", 0.5, 0.0, PS)
-            curve = pnl_curve(df, market, cost_bps=args.cost_bps)
-            stats = curve.attrs.get("stats", {}).copy()
-            stats.update({"sizing":"prob","prob_scale":PS})
-            results.append(stats)
-
-    out = pd.DataFrame(results)
-    out = out.sort_values(["Sharpe (net)","Total Return (net)"], ascending=False)
+    out = run_sweep(wf, market, args.sizing, [float(x) for x in args.thresholds.split(",")],
+                    [float(x) for x in args.bands.split(",")], [float(x) for x in args.prob_scales.split(",")],
+                    cost_bps=args.cost_bps, interval=args.interval)
     Path("data/processed").mkdir(parents=True, exist_ok=True)
     out.to_csv("data/processed/sweep_results.csv", index=False)
     print(out.head(10).to_string(index=False))
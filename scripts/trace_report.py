@@ -0,0 +1,35 @@
+import argparse
+import json
+from pathlib import Path
+from src.tracing import summarize, format_summary
+
+def main():
+    ap = argparse.ArgumentParser("Merge per-process trace files and print a span summary.")
+    ap.add_argument("paths", nargs="*", default=["data/cache/traces"], help="Trace files, directories or an MMH_TRACE=<file>.json target")
+    ap.add_argument("--out", default=None, help="Write the merged Chrome trace here")
+    ap.add_argument("--top", type=int, default=30, help="Rows in the summary table")
+    args = ap.parse_args()
+
+    files = []
+    for p in map(Path, args.paths):
+        if p.is_dir():
+            files.extend(sorted(p.glob("*.json")))
+        elif not p.exists() and p.suffix == ".json":  # MMH_TRACE=<file>.json wrote <file>.<script>-<pid>.json
+            files.extend(sorted(p.parent.glob(f"{p.stem}.*.json")))
+        else:
+            files.append(p)
+    events = []
+    for f in files:
+        events.extend(json.loads(f.read_text())["traceEvents"])
+    spans = [e for e in events if e.get("ph") == "X"]
+    if not spans:
+        raise SystemExit(f"No spans found in {', '.join(args.paths)} (was MMH_TRACE set?)")
+
+    print(f"{len(spans)} spans from {len(files)} file(s)\n")
+    print(format_summary(summarize(spans)[:args.top]))
+    if args.out:
+        Path(args.out).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+        print(f"\nMerged trace -> {args.out} (open in chrome://tracing or ui.perfetto.dev)")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,46 @@
 
-import argparse, json
+import argparse, json, sys
 import pandas as pd
 from pathlib import Path
-from src.data.build_dataset import load_market
-from src.models.walk_forward import walk_forward
+from src.backtest import backtest
+from src.data import bars, build_dataset
+from src.data.build_dataset import load_market, load_fusion, fusion_columns, fusion_embeddings
+from src.models import walk_forward as walk_forward_module
+from src.models.walk_forward import walk_forward, feature_cols, fit_final, save_model
 from src.backtest.backtest import pnl_curve
+from src.data.bars import BAR_MINUTES, is_intraday
+from src.data.feature_store import FeatureStore
+from src.viz import analytics
+from src.viz.analytics import write_bundle
+from src.data.embedding_store import EmbeddingStore
+from src.tracing import traced
+
+OUT = Path("data/processed")
+
+def _embeddings(args) -> str | None:
+    """--embeddings with no value uses the store build_fusion_dataset re-indexed to the fusion rows."""
+    if args.embeddings == "fusion":
+        prefix = fusion_embeddings(args.fusion)
+        if prefix is None:
+            raise SystemExit(f"{args.fusion} has no embedding store; build text embeddings and rerun build_fusion_dataset")
+        return prefix
+    return args.embeddings
+
+def _inputs(args) -> list[Path]:
+    """Files whose content decides the training run (fusion partitions, market, embeddings)."""
+    fusion = Path(args.fusion)
+    files = sorted(fusion.rglob("*.parquet")) + sorted(fusion.glob("_meta.json")) if fusion.is_dir() else [fusion]
+    files.append(Path("data/processed/market.csv"))
+    if args.embeddings:
+        files += [Path(f"{args.embeddings}.npy"), Path(f"{args.embeddings}_dates.npy")]
+    return files
+
+def text_mode(columns) -> str | None:
+    """How the fusion's text features were built: "headline" (per-headline aggregates, which the
+    live runner reproduces), "day" (one score of the concatenated day) or None (no text)."""
+    if "finbert_count" in columns:
+        return "headline"
+    return "day" if any(c.startswith("finbert_") for c in columns) else None
 
 def make_positions(df: pd.DataFrame, sizing: str, threshold: float, band: float, prob_scale: float):
     out = df.copy()
@@ -18,43 +54,69 @@ def make_positions(df: pd.DataFrame, sizing: str, threshold: float, band: float,
         raise ValueError("sizing must be 'binary' or 'prob'")
     return out
 
+@traced()
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--fusion", default="data/processed/fusion_dataset.parquet")
-    ap.add_argument("--start-idx", type=int, default=252)
+    ap.add_argument("--start-idx", type=int, default=252, help="Warm-up before the first fit, in trading days")
     ap.add_argument("--cost-bps", type=float, default=1.0)
-    ap.add_argument("--step", type=int, default=5)
+    ap.add_argument("--step", type=int, default=5, help="Refit every this many trading days")
     ap.add_argument("--min-date", type=str, default=None)
     ap.add_argument("--sizing", choices=["binary","prob"], default="binary")
     ap.add_argument("--threshold", type=float, default=0.55)
     ap.add_argument("--band", type=float, default=0.00)
     ap.add_argument("--prob-scale", type=float, default=0.10)
+    ap.add_argument("--interval", default="1d", choices=sorted(BAR_MINUTES), help="Bar size of market.csv")
+    ap.add_argument("--embeddings", nargs="?", const="fusion", default=None,
+                    help="Add text embeddings to the fused model: the fusion dataset's store when given without "
+                         "a value, or an embedding store prefix (e.g. data/processed/text_embeddings)")
+    ap.add_argument("--model-out", default="data/processed/model_fused.json",
+                    help="Save a fused model fit on all rows (for scripts.live_runner); '' to skip")
+    ap.add_argument("--no-cache", action="store_true", help="Retrain even if inputs, params and code are unchanged")
     args = ap.parse_args()
+    args.embeddings = _embeddings(args)
 
-    if args.fusion.endswith(".csv"):
-        X = pd.read_csv(args.fusion, parse_dates=["date"])
-    else:
-        X = pd.read_parquet(args.fusion)
-    X["date"] = pd.to_datetime(X["date"]).dt.normalize()
+    # outputs only this script writes (calibrate rewrites curve_fused and the fused analytics)
+    outputs = [OUT / "wf_time_only.parquet", OUT / "wf_fused.parquet", OUT / "curve_time_only.parquet"]
+    if args.model_out and not args.embeddings:
+        outputs.append(Path(args.model_out))
+    fs = FeatureStore(enabled=not args.no_cache)
+    key = fs.key("train", inputs=_inputs(args), code=[sys.modules[__name__], walk_forward_module, backtest,
+                                                      build_dataset, bars, analytics],
+                 params={k: v for k, v in vars(args).items() if k != "no_cache"})
+    if fs.up_to_date(outputs, key):
+        print("Walk-forward outputs are up to date (fusion, params and code unchanged); nothing to retrain.")
+        return
 
-    if args.min_date:
-        X = X[X["date"] >= pd.to_datetime(args.min_date)].reset_index(drop=True)
+    # read only the model inputs, and only from min-date on
+    cols = ["y"] + feature_cols(pd.DataFrame(columns=fusion_columns(args.fusion)), include_text=True)
+    X = load_fusion(args.fusion, columns=cols, start=args.min_date)
 
-    wf_time  = walk_forward(X, start_idx=args.start_idx, step=args.step, include_text=False)
-    wf_fused = walk_forward(X, start_idx=args.start_idx, step=args.step, include_text=True)
+    wf_time  = walk_forward(X, start_idx=args.start_idx, step=args.step, include_text=False, interval=args.interval)
+    emb = EmbeddingStore(args.embeddings).align(X["date"], before=is_intraday(args.interval)) if args.embeddings else None
+    wf_fused = walk_forward(X, start_idx=args.start_idx, step=args.step, include_text=True, emb=emb,
+                            interval=args.interval)
 
     wf_time  = make_positions(wf_time,  args.sizing, args.threshold, args.band, args.prob_scale)
     wf_fused = make_positions(wf_fused, args.sizing, args.threshold, args.band, args.prob_scale)
 
-    market = load_market("data/processed/market.csv")[["date","close"]]
-    curve_time  = pnl_curve(wf_time,  market, cost_bps=args.cost_bps)
-    curve_fused = pnl_curve(wf_fused, market, cost_bps=args.cost_bps)
+    market = load_market("data/processed/market.csv", columns=["date","close"])
+    curve_time  = pnl_curve(wf_time,  market, cost_bps=args.cost_bps, interval=args.interval)
+    curve_fused = pnl_curve(wf_fused, market, cost_bps=args.cost_bps, interval=args.interval)
 
-    OUT = Path("data/processed")
     wf_time.to_parquet(OUT / "wf_time_only.parquet", index=False)
     wf_fused.to_parquet(OUT / "wf_fused.parquet", index=False)
     curve_time.to_parquet(OUT / "curve_time_only.parquet", index=False)
     curve_fused.to_parquet(OUT / "curve_fused.parquet", index=False)
+    write_bundle("time_only", wf_time, curve_time, interval=args.interval)
+    write_bundle("fused", wf_fused, curve_fused, interval=args.interval)
+    if args.model_out and not args.embeddings:  # live features have no embeddings
+        model, feats = fit_final(X, include_text=True)
+        save_model(model, feats, args.model_out, sizing=args.sizing, threshold=args.threshold, band=args.band,
+                   prob_scale=args.prob_scale, cost_bps=args.cost_bps, interval=args.interval,
+                   text_mode=text_mode(feats), trained_through=X["date"].max())
+
+    fs.stamp(outputs, key)
 
     print("\n=== Metrics (walk-forward) ===")
     print("Time-only:", json.dumps(wf_time.attrs.get("metrics", {}), indent=2))
@@ -62,7 +124,7 @@ def main():
     print("\n=== Backtest (net) ===")
     print("Time-only:", json.dumps(curve_time.attrs.get("stats", {}), indent=2))
     print("Fused    :", json.dumps(curve_fused.attrs.get("stats", {}), indent=2))
-    print("\nSaved: wf_*.parquet and curve_*.parquet under data/processed")
+    print("\nSaved: wf_*.parquet, curve_*.parquet and analytics/ under data/processed")
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,15 @@
 
 import pandas as pd
 import numpy as np
+from src.data.bars import TRADING_DAYS, periods_per_year, window
+from src.tracing import traced
 
 def _max_drawdown(equity: pd.Series) -> float:
     cummax = equity.cummax()
     dd = (equity / cummax) - 1.0
     return float(dd.min()) if len(dd) else float("nan")
 
-def _ann_sharpe(returns: pd.Series, periods_per_year: int = 252) -> float:
+def _ann_sharpe(returns: pd.Series, periods_per_year: int = TRADING_DAYS) -> float:
     r = returns.dropna()
     if len(r) < 2:
         return float("nan")
@@ -24,13 +26,23 @@ def _trade_returns(strategy_ret: pd.Series, pos: pd.Series) -> np.ndarray:
     ends = (in_pos & ~in_pos.shift(-1, fill_value=False))
     start_idx = np.flatnonzero(starts.to_numpy())
     end_idx = np.flatnonzero(ends.to_numpy())
-    vals = strategy_ret.fillna(0.0).to_numpy()
-    rets = []
-    for s, e in zip(start_idx, end_idx):
-        rets.append(float(np.prod(1.0 + vals[s:e+1]) - 1.0))
-    return np.asarray(rets, dtype=float)
+    if not len(start_idx):
+        return np.array([], dtype=float)
+    # one reduceat over [start, end + 1) pairs; the trailing 1.0 keeps end + 1 in bounds
+    growth = np.r_[1.0 + strategy_ret.fillna(0.0).to_numpy(dtype=np.float64), 1.0]
+    bounds = np.column_stack([start_idx, end_idx + 1]).ravel()
+    return np.multiply.reduceat(growth, bounds)[::2] - 1.0
+
+@traced()
+def pnl_curve(signals_df: pd.DataFrame, price_df: pd.DataFrame, cost_bps: float = 1.0,
+              interval: str = "1d") -> pd.DataFrame:
+    """Long/flat backtest of `pos` (or `signal`) on `price_df` closes, net of costs.
 
-def pnl_curve(signals_df: pd.DataFrame, price_df: pd.DataFrame, cost_bps: float = 1.0) -> pd.DataFrame:
+    `interval` is the bar size: it sets the Sharpe annualization and the bar count of the
+    63-trading-day rolling columns. Count stats ("Long Days", ...) are in bars.
+    """
+    ppy = periods_per_year(interval)
+    quarter = window(63, interval)
     df = signals_df.copy().sort_values("date").reset_index(drop=True)
     px = price_df[["date","close"]].copy().sort_values("date")
     out = df.merge(px, on="date", how="left")
@@ -55,9 +67,9 @@ def pnl_curve(signals_df: pd.DataFrame, price_df: pd.DataFrame, cost_bps: float
     out["equity_gross"] = (1.0 + out["strategy_ret"].fillna(0.0)).cumprod()
     out["bh_equity"] = (1.0 + out["ret1"].fillna(0.0)).cumprod()
     out["drawdown"] = out["equity"] / out["equity"].cummax() - 1.0
-    out["rolling_drawdown_63"] = out["equity"] / out["equity"].rolling(63, min_periods=1).max() - 1.0
-    roll_mu = out["strategy_ret_net"].rolling(63).mean() * 252
-    roll_sd = out["strategy_ret_net"].rolling(63).std(ddof=1) * np.sqrt(252)
+    out["rolling_drawdown_63"] = out["equity"] / out["equity"].rolling(quarter, min_periods=1).max() - 1.0
+    roll_mu = out["strategy_ret_net"].rolling(quarter).mean() * ppy
+    roll_sd = out["strategy_ret_net"].rolling(quarter).std(ddof=1) * np.sqrt(ppy)
     out["rolling_sharpe_63"] = roll_mu / roll_sd.replace(0.0, np.nan)
 
     years = max((out["date"].iloc[-1] - out["date"].iloc[0]).days / 365.25, 1e-9) if len(out) else 0.0
@@ -66,8 +78,8 @@ def pnl_curve(signals_df: pd.DataFrame, price_df: pd.DataFrame, cost_bps: float
     cagr = float(out["equity"].iloc[-1] ** (1.0 / years) - 1.0) if len(out) else float("nan")
     cagr_gross = float(out["equity_gross"].iloc[-1] ** (1.0 / years) - 1.0) if len(out) else float("nan")
     bh_total = float(out["bh_equity"].iloc[-1] - 1.0) if len(out) else float("nan")
-    sharpe = _ann_sharpe(out["strategy_ret_net"])
-    sharpe_gross = _ann_sharpe(out["strategy_ret"])
+    sharpe = _ann_sharpe(out["strategy_ret_net"], ppy)
+    sharpe_gross = _ann_sharpe(out["strategy_ret"], ppy)
     maxdd = _max_drawdown(out["equity"])
     avg_turnover = float(turnover.mean()) if len(turnover) else float("nan")
     total_turnover = float(turnover.sum()) if len(turnover) else float("nan")
@@ -113,3 +125,60 @@ def pnl_curve(signals_df: pd.DataFrame, price_df: pd.DataFrame, cost_bps: float
         "FN": fn,
     }
     return out
+
+def positions_array(p: np.ndarray, sizing: str, threshold: float = 0.55, band: float = 0.0,
+                    prob_scale: float = 0.10) -> np.ndarray:
+    """NumPy twin of train_baseline.make_positions (target long exposure in [0, 1])."""
+    p = np.asarray(p, dtype=np.float64)
+    if sizing == "binary":
+        return (p >= threshold + band).astype(np.float64)
+    if sizing == "prob":
+        return np.clip((p - 0.5) / max(prob_scale, 1e-6), 0.0, 1.0)
+    raise ValueError("sizing must be 'binary' or 'prob'")
+
+def backtest_arrays(pos_raw: np.ndarray, ret1: np.ndarray, years: float, cost_bps: float = 1.0,
+                    periods_per_year: int = TRADING_DAYS) -> dict:
+    """Array version of pnl_curve's core for repeated what-if runs on fixed inputs.
+
+    `pos_raw` is the target exposure per bar and `ret1` the bar's close-to-close return
+    (NaN on the first bar), both on the signal calendar. Returns equity, equity_gross and
+    drawdown arrays plus the main pnl_curve stats, computed the same way.
+    """
+    pos = np.r_[0.0, np.nan_to_num(np.clip(pos_raw, 0.0, 1.0))[:-1]]  # enter next bar
+    r = np.nan_to_num(ret1)
+    gross = pos * r
+    turnover = np.abs(np.diff(pos, prepend=0.0))
+    net = gross - turnover * (cost_bps / 10000.0)
+    if np.isnan(ret1).any():  # pnl_curve leaves NaN returns NaN (skipped by Sharpe)
+        gross_s = np.where(np.isnan(ret1), np.nan, gross)
+        net_s = gross_s - turnover * (cost_bps / 10000.0)
+    else:
+        gross_s, net_s = gross, net
+    equity = np.cumprod(1.0 + net)
+    equity_gross = np.cumprod(1.0 + gross)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+
+    def sharpe(x):
+        x = x[~np.isnan(x)]
+        if len(x) < 2:
+            return float("nan")
+        sd = x.std(ddof=1) * np.sqrt(periods_per_year)
+        return float(x.mean() * periods_per_year / sd) if sd > 0 else float("nan")
+
+    n = len(pos)
+    years = max(years, 1e-9)
+    stats = {
+        "Total Return (gross)": float(equity_gross[-1] - 1.0) if n else float("nan"),
+        "Total Return (net)": float(equity[-1] - 1.0) if n else float("nan"),
+        "CAGR (gross)": float(equity_gross[-1] ** (1.0 / years) - 1.0) if n else float("nan"),
+        "CAGR": float(equity[-1] ** (1.0 / years) - 1.0) if n else float("nan"),
+        "Sharpe (gross)": sharpe(gross_s),
+        "Sharpe (net)": sharpe(net_s),
+        "Max Drawdown": float(drawdown.min()) if n else float("nan"),
+        "Trades": int((turnover > 0).sum()),
+        "Entries": int(((pos > 0) & (np.r_[0.0, pos[:-1]] == 0.0)).sum()),
+        "Total Turnover": float(turnover.sum()),
+        "Long Days": int((pos > 0).sum()),
+        "Flat Days": int((pos == 0).sum()),
+    }
+    return {"equity": equity, "equity_gross": equity_gross, "drawdown": drawdown, "stats": stats}
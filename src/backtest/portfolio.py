@@ -0,0 +1,112 @@
+# src/backtest/portfolio.py
+import numpy as np
+import pandas as pd
+from src.data.bars import periods_per_year
+from src.tracing import traced
+
+# Multi-asset counterpart of pnl_curve. Weights are targets decided on bar t and held over
+# bar t+1 (same one-bar delay as pnl_curve); costs are charged on traded weight
+# |w_t - w_{t-1}|. As in pnl_curve, weights are not drifted with returns between bars.
+# Everything is array arithmetic over the (bars x assets) matrices.
+
+def constrain_weights(w: np.ndarray, allow_short: bool = False, max_weight: float | None = None,
+                      max_leverage: float | None = 1.0) -> np.ndarray:
+    """Clip to long-only (unless `allow_short`) and to +-`max_weight` per asset, then scale
+    rows whose gross exposure sum(|w|) exceeds `max_leverage` back onto the limit."""
+    w = np.nan_to_num(np.asarray(w, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+    if not allow_short:
+        w = np.maximum(w, 0.0)
+    if max_weight is not None:
+        w = np.clip(w, -max_weight, max_weight)
+    if max_leverage is not None:
+        gross = np.abs(w).sum(axis=1)
+        scale = np.where(gross > max_leverage, max_leverage / np.where(gross > 0, gross, 1.0), 1.0)
+        w = w * scale[:, None]
+    return w
+
+def _frame(x, like: pd.DataFrame | None) -> pd.DataFrame:
+    return pd.DataFrame(x, index=like.index, columns=like.columns) if like is not None else pd.DataFrame(x)
+
+@traced()
+def portfolio_backtest(weights, returns, cost_bps=1.0, allow_short: bool = False,
+                       max_leverage: float | None = 1.0, max_weight: float | None = None,
+                       interval: str = "1d") -> dict:
+    """Backtest a (bars x assets) target-weight matrix against a matching return matrix.
+
+    `weights`/`returns` are DataFrames (date index, asset columns) or 2-D arrays;
+    `returns[t]` is the asset's return over bar t (close_t / close_t-1 - 1), NaN where it
+    did not trade (counted as 0). `cost_bps` is a scalar or one value per asset.
+
+    Returns {"curve": per-bar DataFrame, "weights"/"turnover"/"cost": (bars x assets)
+    frames of held weights, traded weight and cost, "stats": dict}; curve.attrs["stats"]
+    holds the same stats as pnl_curve (plus exposure figures) for the portfolio.
+    """
+    like = weights if isinstance(weights, pd.DataFrame) else None
+    if like is not None and isinstance(returns, pd.DataFrame):
+        returns = returns.reindex(index=like.index, columns=like.columns)
+    r = np.asarray(returns, dtype=np.float64)
+    w = constrain_weights(weights, allow_short=allow_short, max_weight=max_weight, max_leverage=max_leverage)
+    if r.shape != w.shape:
+        raise ValueError(f"weights {w.shape} and returns {r.shape} must have the same shape")
+    n, k = w.shape
+
+    held = np.zeros_like(w)
+    held[1:] = w[:-1]  # enter next bar
+    priced = ~np.isnan(r).all(axis=1) if k else np.zeros(n, bool)  # bars with no return at all skip Sharpe
+    r = np.nan_to_num(r, nan=0.0)
+    gross = np.einsum("ij,ij->i", held, r)
+    traded = np.abs(np.diff(held, axis=0, prepend=np.zeros((1, k))))
+    bps = np.broadcast_to(np.asarray(cost_bps, dtype=np.float64), (k,)) / 10000.0
+    cost = traded * bps
+    cost_bar = cost.sum(axis=1)
+    net = gross - cost_bar
+    turnover = traded.sum(axis=1)
+
+    equity = np.cumprod(1.0 + net)
+    equity_gross = np.cumprod(1.0 + gross)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0 if n else np.zeros(0)
+    gross_exp = np.abs(held).sum(axis=1)
+    net_exp = held.sum(axis=1)
+
+    index = like.index if like is not None else pd.RangeIndex(n)
+    curve = pd.DataFrame({
+        "ret_gross": gross, "cost": cost_bar, "ret_net": net, "turnover": turnover,
+        "gross_exposure": gross_exp, "net_exposure": net_exp, "holdings": (held != 0).sum(axis=1),
+        "equity": equity, "equity_gross": equity_gross, "drawdown": drawdown,
+    }, index=index)
+
+    ppy = periods_per_year(interval)
+    if isinstance(index, pd.DatetimeIndex) and n > 1:
+        years = max((index[-1] - index[0]).days / 365.25, 1e-9)
+    else:
+        years = max(n / ppy, 1e-9)
+
+    def sharpe(x):
+        if len(x) < 2:
+            return float("nan")
+        sd = x.std(ddof=1) * np.sqrt(ppy)
+        return float(x.mean() * ppy / sd) if sd > 0 else float("nan")
+
+    nan = float("nan")
+    stats = {
+        "Total Return (gross)": float(equity_gross[-1] - 1.0) if n else nan,
+        "Total Return (net)": float(equity[-1] - 1.0) if n else nan,
+        "CAGR (gross)": float(equity_gross[-1] ** (1.0 / years) - 1.0) if n else nan,
+        "CAGR": float(equity[-1] ** (1.0 / years) - 1.0) if n else nan,
+        "Sharpe (gross)": sharpe(gross[priced]),
+        "Sharpe (net)": sharpe(net[priced]),
+        "Max Drawdown": float(drawdown.min()) if n else nan,
+        "Trades": int((traded > 0).sum()),
+        "Rebalances": int((turnover > 0).sum()),
+        "Total Turnover": float(turnover.sum()),
+        "Avg Turnover": float(turnover.mean()) if n else nan,
+        "Total Cost": float(cost_bar.sum()),
+        "Avg Gross Exposure": float(gross_exp.mean()) if n else nan,
+        "Max Gross Exposure": float(gross_exp.max()) if n else nan,
+        "Avg Net Exposure": float(net_exp.mean()) if n else nan,
+        "Avg Holdings": float(curve["holdings"].mean()) if n else nan,
+        "Hit-Rate (bars)": float((net[gross_exp > 0] > 0).mean()) if (gross_exp > 0).any() else nan,
+    }
+    curve.attrs["stats"] = stats
+    return {"curve": curve, "weights": _frame(held, like), "turnover": _frame(traded, like),
+            "cost": _frame(cost, like), "stats": stats}
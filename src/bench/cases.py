@@ -0,0 +1,112 @@
+# src/bench/cases.py
+from src.bench import inputs
+
+# Each case is (setup(**size) -> state, run(state)); only `run` is timed and profiled.
+# Heavy imports stay inside the functions so a case only pays for what it uses.
+
+def _time_features_setup(years: int, symbols: int):
+    p = inputs.panel(years, symbols)
+    return [g.drop(columns="symbol") for _, g in p.groupby("symbol", sort=False)]
+
+def _time_features_run(groups):
+    from src.features.ts_features import add_time_features
+    for g in groups:
+        add_time_features(g)
+
+def _fusion_setup(years: int):
+    from src.features.ts_features import add_time_features
+    return add_time_features(inputs.market_frame(years)), inputs.text_features(years)
+
+def _fusion_run(state):
+    from src.data.build_dataset import build_fusion
+    build_fusion(*state, fill_neutral=True)
+
+def _walk_forward_setup(years: int, step: int):
+    from src.data.build_dataset import build_fusion
+    X = build_fusion(*_fusion_setup(years), fill_neutral=True)
+    return X, step
+
+def _walk_forward_run(state):
+    from src.models.walk_forward import walk_forward
+    X, step = state
+    walk_forward(X, start_idx=252, step=step, include_text=True)
+
+def _pnl_setup(years: int):
+    from scripts.train_baseline import make_positions
+    wf = make_positions(inputs.signals(years), "prob", 0.55, 0.0, 0.06)
+    return wf, inputs.market_frame(years)[["date", "close"]]
+
+def _pnl_run(state):
+    from src.backtest.backtest import pnl_curve
+    pnl_curve(*state, cost_bps=1.0)
+
+def _portfolio_setup(years: int, assets: int):
+    r = inputs.returns_matrix(years, assets)
+    # 20-day momentum, long the top fifth / short the bottom fifth
+    mom = r.fillna(0.0).rolling(20).sum()
+    rank = mom.rank(axis=1, pct=True)
+    w = (rank > 0.8).astype(float) - (rank <= 0.2).astype(float)
+    return w / max(assets * 0.2, 1.0), r
+
+def _portfolio_run(state):
+    from src.backtest.portfolio import portfolio_backtest
+    portfolio_backtest(*state, cost_bps=2.0, allow_short=True, max_leverage=2.0)
+
+def _finbert_setup(headlines: int):
+    from src.nlp.finbert_features import FinbertFeaturizer
+    fe = FinbertFeaturizer(use_embeddings=False, sa_name=inputs.tiny_model())
+    return fe, inputs.headlines(headlines)
+
+def _finbert_run(state):
+    from src.nlp.finbert_features import build_headline_features
+    fe, df = state
+    build_headline_features(df, text_col="headline", max_per_day=10**9, featurizer=fe)
+
+def _sweep_setup(years: int):
+    return inputs.signals(years), inputs.market_frame(years)[["date", "close"]]
+
+def _sweep_run(state):
+    from scripts.sweep_thresholds import run_sweep
+    wf, market = state
+    run_sweep(wf, market, "binary", [0.55, 0.57, 0.60], [0.0, 0.02, 0.05], [], cost_bps=1.0)
+    run_sweep(wf, market, "prob", [], [], [0.08, 0.10, 0.15], cost_bps=1.0)
+
+CASES = {
+    "add_time_features": (_time_features_setup, _time_features_run),
+    "build_fusion": (_fusion_setup, _fusion_run),
+    "walk_forward": (_walk_forward_setup, _walk_forward_run),
+    "pnl_curve": (_pnl_setup, _pnl_run),
+    "portfolio": (_portfolio_setup, _portfolio_run),
+    "finbert_headlines": (_finbert_setup, _finbert_run),
+    "sweep": (_sweep_setup, _sweep_run),
+}
+
+YEARS = [5, 15, 30]
+SYMBOLS = [1, 100, 500]
+HEADLINES = [10_000, 100_000, 1_000_000]
+
+GRIDS = {
+    # a couple of minutes on a laptop; meant for every change to a hot path
+    "quick": {
+        "add_time_features": [dict(years=5, symbols=1), dict(years=5, symbols=100)],
+        "build_fusion": [dict(years=5), dict(years=30)],
+        "walk_forward": [dict(years=5, step=63)],
+        "pnl_curve": [dict(years=5), dict(years=30)],
+        "portfolio": [dict(years=15, assets=500)],
+        "finbert_headlines": [dict(headlines=10_000)],
+        "sweep": [dict(years=15)],
+    },
+    # production scale; run nightly or before a release
+    "full": {
+        "add_time_features": [dict(years=y, symbols=s) for y in YEARS for s in SYMBOLS],
+        "build_fusion": [dict(years=y) for y in YEARS],
+        "walk_forward": [dict(years=y, step=21) for y in YEARS],
+        "pnl_curve": [dict(years=y) for y in YEARS],
+        "portfolio": [dict(years=y, assets=s) for y in YEARS for s in SYMBOLS],
+        "finbert_headlines": [dict(headlines=n) for n in HEADLINES],
+        "sweep": [dict(years=y) for y in YEARS],
+    },
+}
+
+def case_id(name: str, size: dict) -> str:
+    return f"{name}[{','.join(f'{k}={v}' for k, v in size.items())}]"
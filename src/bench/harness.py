@@ -0,0 +1,106 @@
+# src/bench/harness.py
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+def _maxrss_mb() -> float:
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / 2**20 if sys.platform == "darwin" else r / 2**10  # bytes on macOS, KiB on Linux
+
+def measure(name: str, size: dict, repeat: int = 3) -> dict:
+    """Time `repeat` runs of a case, then one traced run for memory.
+
+    seconds/cpu_seconds are medians (min is reported too); peak_mb is the tracemalloc
+    peak of the run (Python and NumPy allocations); rss_mb is how far the process
+    high-water RSS grew during the runs (also covers torch/XGBoost native memory).
+    """
+    from src.bench.cases import CASES
+    setup, run = CASES[name]
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        state = setup(**size)
+        rss0 = _maxrss_mb()
+        wall, cpu = [], []
+        for _ in range(max(repeat, 1)):
+            t0, c0 = time.perf_counter(), time.process_time()
+            run(state)
+            wall.append(time.perf_counter() - t0)
+            cpu.append(time.process_time() - c0)
+        rss1 = _maxrss_mb()
+        tracemalloc.start()
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "seconds": statistics.median(wall),
+        "min_seconds": min(wall),
+        "cpu_seconds": statistics.median(cpu),
+        "peak_mb": peak / 2**20,
+        "rss_mb": max(rss1 - rss0, 0.0),
+        "repeat": len(wall),
+    }
+
+def _child(name, size, repeat, conn):
+    try:
+        conn.send(("ok", measure(name, size, repeat)))
+    except BaseException as e:  # report instead of hanging the parent
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def measure_isolated(name: str, size: dict, repeat: int = 3) -> dict:
+    """`measure` in a fresh spawned process, so RSS and caches do not leak between cases."""
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    p = ctx.Process(target=_child, args=(name, size, repeat, child))
+    p.start()
+    child.close()
+    status, payload = parent.recv()
+    p.join()
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
+
+def load_results(path) -> dict:
+    p = Path(path)
+    return json.loads(p.read_text())["results"] if p.exists() else {}
+
+def save_results(path, results: dict, meta: dict | None = None):
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps({"meta": meta or {}, "results": results}, indent=2, sort_keys=True))
+
+def compare(results: dict, baseline: dict, threshold: float = 0.2,
+            min_seconds: float = 0.005, min_mb: float = 1.0) -> list[dict]:
+    """Regressions: seconds or peak_mb more than `threshold` above baseline.
+
+    Differences below `min_seconds` / `min_mb` are treated as noise.
+    """
+    flagged = []
+    for cid, r in results.items():
+        b = baseline.get(cid)
+        if not b:
+            continue
+        for metric, floor in (("seconds", min_seconds), ("peak_mb", min_mb)):
+            new, old = r[metric], b[metric]
+            if new > old * (1 + threshold) and new - old > floor:
+                flagged.append({"case": cid, "metric": metric, "baseline": old, "current": new,
+                                "change": new / old - 1 if old else float("inf")})
+    return flagged
+
+def format_table(results: dict, baseline: dict | None = None) -> str:
+    baseline = baseline or {}
+    lines = [f"{'case':44s} {'seconds':>9s} {'cpu':>8s} {'peak MB':>9s} {'RSS +MB':>8s} {'vs base':>8s}"]
+    for cid, r in results.items():
+        b = baseline.get(cid)
+        delta = f"{r['seconds'] / b['seconds'] - 1:+8.0%}" if b and b["seconds"] else f"{'':>8s}"
+        lines.append(f"{cid:44s} {r['seconds']:9.3f} {r['cpu_seconds']:8.3f} {r['peak_mb']:9.1f} "
+                     f"{r['rss_mb']:8.1f} {delta}")
+    return "\n".join(lines)
@@ -0,0 +1,99 @@
+# src/bench/inputs.py
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Deterministic synthetic inputs for the benchmark suite: the same (size, seed) always
+# gives the same frame, so timings are comparable across runs and machines.
+
+START = "1995-01-02"
+WORDS = ("fed rates inflation cpi jobs payrolls growth gdp yields treasury stocks rally selloff "
+         "earnings guidance outlook cut hike hold dovish hawkish strong weak surprise beat miss "
+         "markets investors oil dollar euro china tariffs recession recovery labor wages housing "
+         "retail sales consumer confidence manufacturing services survey minutes statement speech").split()
+
+def bdays(years: int) -> pd.DatetimeIndex:
+    return pd.bdate_range(START, periods=int(years * 252))
+
+def market_frame(years: int, seed: int = 0) -> pd.DataFrame:
+    """One daily OHLCV series with VIX and Treasury yields, like data/processed/market_raw.csv."""
+    dates = bdays(years)
+    n = len(dates)
+    rng = np.random.default_rng(seed)
+    ret = rng.normal(0.0003, 0.011, n)
+    close = 100 * np.exp(np.cumsum(ret))
+    spread = np.abs(rng.normal(0.0, 0.006, n))
+    dgs10 = 3.0 + np.cumsum(rng.normal(0, 0.03, n))
+    return pd.DataFrame({
+        "date": dates,
+        "open": np.r_[close[0], close[:-1]],
+        "high": close * (1 + spread),
+        "low": close * (1 - spread),
+        "close": close,
+        "volume": rng.integers(5_000_000, 15_000_000, n),
+        "vix": np.clip(18 + np.cumsum(rng.normal(0, 0.6, n)) * 0.1 + rng.normal(0, 1.5, n), 9, None),
+        "dgs10": dgs10,
+        "dgs3mo": dgs10 - 1.0 + rng.normal(0, 0.2, n),
+    })
+
+def panel(years: int, symbols: int, seed: int = 0) -> pd.DataFrame:
+    """Long (date, symbol) panel of `symbols` independent market frames."""
+    parts = []
+    for k in range(symbols):
+        f = market_frame(years, seed=seed + k)
+        f.insert(1, "symbol", f"S{k:04d}")
+        parts.append(f)
+    return pd.concat(parts, ignore_index=True)
+
+def returns_matrix(years: int, assets: int, seed: int = 4) -> pd.DataFrame:
+    """(dates x assets) daily returns with a shared factor; the first row is NaN."""
+    dates = bdays(years)
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.009, (len(dates), 1))
+    r = market + rng.normal(0.0, 0.012, (len(dates), assets))
+    r[0] = np.nan
+    return pd.DataFrame(r.astype(np.float32), index=dates, columns=[f"S{k:04d}" for k in range(assets)])
+
+def text_features(years: int, seed: int = 1, coverage: float = 0.6) -> pd.DataFrame:
+    """Daily finbert_neg/neu/pos on a random `coverage` share of business days."""
+    dates = bdays(years)
+    rng = np.random.default_rng(seed)
+    dates = dates[rng.random(len(dates)) < coverage]
+    p = rng.dirichlet([2.0, 3.0, 2.0], len(dates)).astype(np.float32)
+    return pd.DataFrame({"date": dates, "finbert_neg": p[:, 0], "finbert_neu": p[:, 1], "finbert_pos": p[:, 2]})
+
+def headlines(n: int, years: int = 15, seed: int = 2) -> pd.DataFrame:
+    """`n` headlines of 6-14 words spread over `years` of business days (date-sorted)."""
+    dates = bdays(years)
+    rng = np.random.default_rng(seed)
+    day = np.sort(rng.integers(0, len(dates), n))
+    lens = rng.integers(6, 15, n)
+    words = np.array(WORDS, dtype=object)[rng.integers(0, len(WORDS), int(lens.sum()))]
+    ends = np.cumsum(lens)
+    text = [" ".join(words[e - k:e]) for e, k in zip(ends, lens)]
+    return pd.DataFrame({"date": dates[day], "headline": text})
+
+def signals(years: int, seed: int = 3) -> pd.DataFrame:
+    """Walk-forward style output (date, y, p) with a weakly informative p."""
+    dates = bdays(years)
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, len(dates))
+    p = np.clip(0.5 + 0.04 * (y - 0.5) + rng.normal(0, 0.06, len(dates)), 0, 1)
+    return pd.DataFrame({"date": dates, "y": y, "p": p})
+
+def tiny_model(root: str = "data/bench/tiny_finbert") -> str:
+    """A 2-layer, 32-wide BERT sequence classifier (3 labels) saved locally; no download."""
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+    import torch
+    path = Path(root)
+    if (path / "config.json").exists():
+        return str(path)
+    path.mkdir(parents=True, exist_ok=True)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(WORDS))
+    (path / "vocab.txt").write_text("\n".join(vocab) + "\n")
+    BertTokenizerFast(vocab_file=str(path / "vocab.txt")).save_pretrained(path)
+    torch.manual_seed(0)
+    cfg = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                     intermediate_size=64, max_position_embeddings=128, num_labels=3)
+    BertForSequenceClassification(cfg).eval().save_pretrained(path)
+    return str(path)
@@ -0,0 +1,74 @@
+# src/data/align.py
+import numpy as np
+import pandas as pd
+
+class AsOfSeries:
+    """One input series for `align_asof`.
+
+    `lag` shifts each observation to when it becomes usable (publication lag), and
+    `max_staleness` bounds how long a value may be carried forward; both are anything
+    pd.Timedelta accepts ("3D", "36h", ...). `columns` defaults to every non-date column.
+    """
+
+    def __init__(self, name: str, frame: pd.DataFrame, columns: list[str] | None = None,
+                 max_staleness=None, lag=0, date_col: str = "date"):
+        self.name = name
+        self.frame = frame
+        self.columns = columns or [c for c in frame.columns if c != date_col]
+        self.max_staleness = None if max_staleness is None else pd.Timedelta(max_staleness)
+        self.lag = pd.Timedelta(lag)
+        self.date_col = date_col
+
+def _asof_index(obs: np.ndarray, cal: np.ndarray, max_staleness: pd.Timedelta | None) -> np.ndarray:
+    """Position of the latest observation at or before each calendar stamp (-1 if none/stale)."""
+    idx = np.searchsorted(obs, cal, side="right") - 1
+    if max_staleness is not None and len(obs):
+        age = cal - obs[np.maximum(idx, 0)]
+        idx = np.where(age <= max_staleness.value, idx, -1)
+    return idx
+
+def align_asof(base: pd.DataFrame, series: list[AsOfSeries], date_col: str = "date") -> pd.DataFrame:
+    """Attach any number of series to `base`'s calendar in one pass.
+
+    Each value is the latest non-missing observation available by that date, i.e.
+    observed at or before `date - lag` and no older than `max_staleness`; otherwise NaN.
+    Series may have their own calendars (holidays, weekly/monthly releases). Columns are
+    gathered straight from NumPy arrays and added to a single copy of `base`. A column the
+    series frame does not have (e.g. an empty store read) comes out all NaN.
+    """
+    cal_ts = pd.to_datetime(base[date_col])
+    cal = cal_ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    order = None
+    if len(cal) > 1 and np.any(np.diff(cal) < 0):
+        order = np.argsort(cal, kind="stable")
+        cal = cal[order]
+
+    new_cols = {}
+    for s in series:
+        if s.date_col not in s.frame.columns:
+            new_cols.update({col: np.full(len(cal), np.nan) for col in s.columns})
+            continue
+        d_all = pd.to_datetime(s.frame[s.date_col]).dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        d_all = d_all + s.lag.value
+        for col in s.columns:
+            if col not in s.frame.columns:
+                new_cols[col] = np.full(len(cal), np.nan)
+                continue
+            v = s.frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            ok = ~np.isnan(v)
+            d, v = d_all[ok], v[ok]
+            if len(d) > 1 and np.any(np.diff(d) < 0):
+                o = np.argsort(d, kind="stable")
+                d, v = d[o], v[o]
+            idx = _asof_index(d, cal, s.max_staleness)
+            vals = np.full(len(cal), np.nan)
+            hit = idx >= 0
+            vals[hit] = v[idx[hit]]
+            if order is not None:
+                unsorted = np.empty_like(vals)
+                unsorted[order] = vals
+                vals = unsorted
+            new_cols[col] = vals
+
+    keep = base.drop(columns=[c for c in new_cols if c in base.columns])
+    return pd.concat([keep, pd.DataFrame(new_cols, index=base.index)], axis=1)
@@ -0,0 +1,65 @@
+# src/data/bars.py
+import numpy as np
+import pandas as pd
+
+# Bar frequencies. Windows and annualization elsewhere are written in trading days (252 a
+# year, 63 a quarter); these helpers turn them into bar counts for the interval in use.
+# Intervals follow yfinance names; intraday bars cover the US regular session
+# (09:30-16:00 exchange time, so "1h" has 7 bars, the last one half an hour long).
+
+TRADING_DAYS = 252
+SESSION_OPEN = "09:30"
+SESSION_MINUTES = 390
+BAR_MINUTES = {"1d": SESSION_MINUTES, "1h": 60, "60m": 60, "30m": 30, "15m": 15, "5m": 5, "2m": 2, "1m": 1}
+# calendar days of intraday history Yahoo serves per bar size (older requests fail outright)
+INTRADAY_LOOKBACK_DAYS = {"1h": 730, "60m": 730, "30m": 60, "15m": 60, "5m": 60, "2m": 60, "1m": 7}
+
+def check_interval(interval: str) -> str:
+    if interval not in BAR_MINUTES:
+        raise ValueError(f"Unknown bar interval {interval!r}; expected one of {sorted(BAR_MINUTES)}")
+    return interval
+
+def is_intraday(interval: str) -> bool:
+    return check_interval(interval) != "1d"
+
+def bars_per_day(interval: str = "1d") -> int:
+    return -(-SESSION_MINUTES // BAR_MINUTES[check_interval(interval)])
+
+def periods_per_year(interval: str = "1d") -> int:
+    return TRADING_DAYS * bars_per_day(interval)
+
+def window(days: int, interval: str = "1d") -> int:
+    """Bars spanning `days` trading days."""
+    return int(days) * bars_per_day(interval)
+
+def intraday_start(start, interval: str, today=None) -> str:
+    """`start` moved up to the oldest day the intraday source still serves (a day of margin);
+    daily intervals are returned unchanged."""
+    if not is_intraday(interval):
+        return str(pd.Timestamp(start).date())
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    earliest = today.normalize() - pd.Timedelta(days=INTRADAY_LOOKBACK_DAYS[interval] - 1)
+    return str(max(pd.Timestamp(start), earliest).date())
+
+def session_stamps(days, interval: str = "1d") -> pd.DatetimeIndex:
+    """Bar timestamps (bar open, exchange-local and tz-naive) for each session day."""
+    days = pd.DatetimeIndex(days).normalize()
+    if not is_intraday(interval):
+        return days
+    offsets = pd.Timedelta(SESSION_OPEN + ":00") + pd.to_timedelta(
+        np.arange(bars_per_day(interval)) * BAR_MINUTES[interval], unit="min")
+    stamps = days.to_numpy()[:, None] + offsets.to_numpy()[None, :]
+    return pd.DatetimeIndex(stamps.ravel())
+
+def infer_interval(dates) -> str:
+    """Bar interval of a timestamp series (for artifacts that did not record it)."""
+    d = pd.DatetimeIndex(pd.to_datetime(dates)).sort_values()
+    if not len(d) or (d == d.normalize()).all():
+        return "1d"
+    same_day = d[1:].normalize() == d[:-1].normalize()
+    steps = (d[1:] - d[:-1])[same_day]
+    if not len(steps):
+        return "1d"
+    minutes = int(round(np.median(steps.total_seconds()) / 60))
+    sizes = {m: k for k, m in BAR_MINUTES.items() if k not in ("1d", "60m")}
+    return sizes[min(sizes, key=lambda m: abs(m - minutes))]
@@ -1,12 +1,23 @@
 
+import json
+import shutil
+from pathlib import Path
 import pandas as pd
 import numpy as np
+from src.data.bars import is_intraday
+from src.tracing import span, traced
 
-def load_market(path: str = "data/processed/market.csv") -> pd.DataFrame:
-    df = pd.read_csv(path, parse_dates=["date"])
+# intraday bars carry the latest earlier day's text for at most this long (long weekends)
+INTRADAY_TEXT_MAX_AGE = pd.Timedelta("4D")
+
+@traced()
+def load_market(path: str = "data/processed/market.csv", columns: list[str] | None = None) -> pd.DataFrame:
+    usecols = None if columns is None else (lambda c: c.lower() in {x.lower() for x in columns})
+    df = pd.read_csv(path, parse_dates=["date"], usecols=usecols)
     df.columns = [c.lower() for c in df.columns]
     return df
 
+@traced()
 def load_text_features(path: str = "data/processed/text_features.parquet") -> pd.DataFrame:
     if path.endswith(".csv"):
         t = pd.read_csv(path, parse_dates=["date"])
@@ -16,15 +27,30 @@ def load_text_features(path: str = "data/processed/text_features.parquet") -> pd
     t.columns = [c.lower() for c in t.columns]
     return t
 
-def build_fusion(market_df: pd.DataFrame, text_df: pd.DataFrame, fill_neutral: bool = True) -> pd.DataFrame:
+@traced()
+def build_fusion(market_df: pd.DataFrame, text_df: pd.DataFrame, fill_neutral: bool = True,
+                 interval: str = "1d") -> pd.DataFrame:
+    """Market rows + daily text features + next-bar direction label `y`.
+
+    Daily bars take the same day's text. Intraday bars keep their timestamps and take
+    the text of the latest earlier day (within INTRADAY_TEXT_MAX_AGE), since a
+    session's headlines are not all known at its open.
+    """
     m = market_df.copy()
     t = text_df.copy()
-    m["date"] = pd.to_datetime(m["date"]).dt.normalize()
     t["date"] = pd.to_datetime(t["date"]).dt.normalize()
 
-    X = m.merge(t, on="date", how="left")
+    if is_intraday(interval):
+        m["date"] = pd.to_datetime(m["date"])
+        m["session"] = m["date"].dt.normalize()
+        t = t.sort_values("date").rename(columns={"date": "session"})
+        X = pd.merge_asof(m.sort_values("date"), t, on="session", allow_exact_matches=False,
+                          tolerance=INTRADAY_TEXT_MAX_AGE).drop(columns="session")
+    else:
+        m["date"] = pd.to_datetime(m["date"]).dt.normalize()
+        X = m.merge(t, on="date", how="left")
 
-    # Build next-day direction label; keep unknown last label as NaN so it is dropped.
+    # Build next-bar direction label; keep unknown last label as NaN so it is dropped.
     next_close = X["close"].shift(-1)
     X["y"] = np.where(next_close.notna(), (next_close > X["close"]).astype(int), np.nan)
 
@@ -32,6 +58,12 @@ def build_fusion(market_df: pd.DataFrame, text_df: pd.DataFrame, fill_neutral: b
         if col in X.columns and fill_neutral:
             X[col] = X[col].fillna(1/3)
 
+    # headline-mode aggregates (build_text_features --mode headline)
+    if fill_neutral:
+        for col, val in [("finbert_pos_max", 1/3), ("finbert_neg_max", 1/3), ("finbert_disp", 0.0), ("finbert_count", 0)]:
+            if col in X.columns:
+                X[col] = X[col].fillna(val)
+
     for col in [c for c in X.columns if c.startswith("emb_")]:
         X[col] = X[col].fillna(0.0)
 
@@ -39,6 +71,94 @@ def build_fusion(market_df: pd.DataFrame, text_df: pd.DataFrame, fill_neutral: b
     X["y"] = X["y"].astype(int)
     return X
 
-def save_fusion(X: pd.DataFrame, out_prefix: str = "data/processed/fusion_dataset"):
-    X.to_parquet(f"{out_prefix}.parquet", index=False)
-    X.to_csv(f"{out_prefix}.csv", index=False)
+def compact_fusion(X: pd.DataFrame) -> pd.DataFrame:
+    """float32 features, int8 label, int32 counts; date stays datetime64."""
+    out = X.copy()
+    for c in out.columns:
+        if c == "y":
+            out[c] = out[c].astype(np.int8)
+        elif c == "finbert_count":
+            out[c] = out[c].fillna(0).astype(np.int32)
+        elif out[c].dtype.kind == "f":
+            out[c] = out[c].astype(np.float32)
+    return out
+
+@traced()
+def save_fusion(X: pd.DataFrame, out_prefix: str = "data/processed/fusion_dataset", csv: bool = False,
+                embeddings: str | None = None):
+    """Write <out_prefix>.parquet as a year-partitioned dataset (year=YYYY/part.parquet).
+
+    CSV export (<out_prefix>.csv, full precision) is opt-in. `embeddings` is the prefix of an
+    embedding store with one row per fusion row (save_calendar_embeddings); it is recorded in
+    _meta.json for fusion_embeddings().
+    """
+    root = Path(f"{out_prefix}.parquet")
+    if root.is_file():
+        root.unlink()  # legacy single-file layout
+    elif root.is_dir():
+        shutil.rmtree(root)
+    Xc = compact_fusion(X)
+    years = Xc["date"].dt.year
+    for year, part in Xc.groupby(years):
+        d = root / f"year={int(year)}"
+        d.mkdir(parents=True, exist_ok=True)
+        with span("build_dataset.write_parquet", year=int(year)):
+            part.reset_index(drop=True).to_parquet(d / "part.parquet", index=False)
+    (root / "_meta.json").write_text(json.dumps({
+        "rows": int(len(Xc)), "years": sorted(int(y) for y in years.unique()), "columns": list(Xc.columns),
+        "embeddings": embeddings}))
+    if csv:
+        with span("build_dataset.write_csv"):
+            X.to_csv(f"{out_prefix}.csv", index=False)
+
+def fusion_columns(path: str = "data/processed/fusion_dataset.parquet") -> list[str]:
+    """Column names of a fusion dataset without reading any data."""
+    if path.endswith(".csv"):
+        return list(pd.read_csv(path, nrows=0).columns)
+    meta = Path(path) / "_meta.json"
+    if meta.exists():
+        return json.loads(meta.read_text())["columns"]
+    import pyarrow.parquet as pq
+    return [c for c in pq.read_schema(path).names if c != "__index_level_0__"]
+
+def fusion_embeddings(path: str = "data/processed/fusion_dataset.parquet") -> str | None:
+    """Prefix of the fusion-aligned embedding store recorded by save_fusion, if any."""
+    meta = Path(path) / "_meta.json"
+    return json.loads(meta.read_text()).get("embeddings") if meta.exists() else None
+
+@traced()
+def load_fusion(path: str = "data/processed/fusion_dataset.parquet", columns: list[str] | None = None,
+                start=None, end=None) -> pd.DataFrame:
+    """Read only `columns` (plus date) for start <= date <= end.
+
+    Year partitions outside the range are skipped and the date filter is pushed into the
+    Parquet scan. Also reads legacy single-file Parquet and CSV outputs.
+    """
+    cols = None if columns is None else ["date"] + [c for c in columns if c != "date"]
+    if path.endswith(".csv"):
+        X = pd.read_csv(path, parse_dates=["date"], usecols=cols)
+    else:
+        filters = []
+        if start is not None:
+            filters.append(("date", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("date", "<=", pd.Timestamp(end)))
+        if Path(path).is_dir():
+            years = sorted(int(d.name.split("=")[1]) for d in Path(path).glob("year=*"))
+            lo = pd.Timestamp(start).year if start is not None else None
+            hi = pd.Timestamp(end).year if end is not None else None
+            files = [str(Path(path) / f"year={y}" / "part.parquet") for y in years
+                     if (lo is None or y >= lo) and (hi is None or y <= hi)]
+            if not files:
+                return pd.DataFrame(columns=cols or fusion_columns(path))
+            parts = [pd.read_parquet(f, columns=cols, filters=filters or None) for f in files]
+            X = pd.concat(parts, ignore_index=True)
+        else:
+            X = pd.read_parquet(path, columns=cols, filters=filters or None)
+    X["date"] = pd.to_datetime(X["date"])  # daily rows are already at midnight; intraday keep their time
+    if path.endswith(".csv"):
+        if start is not None:
+            X = X[X["date"] >= pd.Timestamp(start)]
+        if end is not None:
+            X = X[X["date"] <= pd.Timestamp(end)]
+    return X.sort_values("date").reset_index(drop=True)
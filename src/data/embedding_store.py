@@ -0,0 +1,89 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Daily text embeddings live in one float32 matrix (<prefix>.npy) plus a sorted
+# date index sidecar (<prefix>_dates.npy) instead of emb_0..emb_N frame columns.
+# Text days include weekends and holidays, so a trading calendar rarely maps onto a
+# contiguous run of them; save_calendar_embeddings writes a second store with one row per
+# bar of the calendar (build_fusion_dataset does this for the fusion rows), which aligns
+# back as a plain slice of the memory map.
+
+def save_embeddings(dates, matrix: np.ndarray, prefix: str = "data/processed/text_embeddings",
+                    normalize: bool = True):
+    """Write a store; normalize=False keeps intraday timestamps (calendar stores)."""
+    d = pd.to_datetime(pd.Series(dates))
+    d = (d.dt.normalize() if normalize else d).to_numpy(dtype="datetime64[ns]")
+    mat = np.asarray(matrix, dtype=np.float32)
+    if mat.ndim != 2 or len(mat) != len(d):
+        raise ValueError(f"Expected an (n_dates, dim) matrix, got {mat.shape} for {len(d)} dates")
+    order = np.argsort(d, kind="stable")
+    if not np.all(order == np.arange(len(d))):
+        d, mat = d[order], mat[order]
+    Path(prefix).parent.mkdir(parents=True, exist_ok=True)
+    np.save(f"{prefix}.npy", np.ascontiguousarray(mat))
+    np.save(f"{prefix}_dates.npy", d.astype(np.int64))
+
+def save_calendar_embeddings(store: "EmbeddingStore", calendar, prefix: str, before: bool = False,
+                             chunk_rows: int = 65536):
+    """Write `store` re-indexed to `calendar` (one row per bar, zeros where there is no text).
+
+    `before` as in EmbeddingStore.align (intraday bars take the previous text day). Rows are
+    written in chunks straight into the output .npy, so the full matrix is never in memory.
+    """
+    d = pd.to_datetime(pd.Series(calendar)).to_numpy(dtype="datetime64[ns]")
+    if len(d) > 1 and not np.all(d[1:] > d[:-1]):
+        raise ValueError("calendar must be sorted and unique")
+    Path(prefix).parent.mkdir(parents=True, exist_ok=True)
+    out = np.lib.format.open_memmap(f"{prefix}.npy", mode="w+", dtype=np.float32, shape=(len(d), store.dim))
+    for lo in range(0, len(d), chunk_rows):
+        out[lo:lo + chunk_rows] = store.align(d[lo:lo + chunk_rows], before=before)
+    out.flush()
+    del out
+    np.save(f"{prefix}_dates.npy", d.astype(np.int64))
+
+class EmbeddingStore:
+    """Read-only, memory-mapped view of a saved embedding matrix."""
+
+    def __init__(self, prefix: str = "data/processed/text_embeddings"):
+        self.prefix = prefix
+        self.dates = pd.DatetimeIndex(np.load(f"{prefix}_dates.npy").astype("datetime64[ns]"))
+        self.matrix = np.load(f"{prefix}.npy", mmap_mode="r")
+        # day-keyed (text days) vs bar-keyed (a calendar store with intraday timestamps)
+        self.daily = bool((self.dates == self.dates.normalize()).all())
+
+    @staticmethod
+    def exists(prefix: str = "data/processed/text_embeddings") -> bool:
+        return Path(f"{prefix}.npy").exists() and Path(f"{prefix}_dates.npy").exists()
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1])
+
+    def align(self, dates, before: bool = False, max_age_days: int = 4) -> np.ndarray:
+        """Rows matching `dates`; days without text get zero vectors.
+
+        When `dates` is a contiguous run of stored dates the result is a slice of the
+        memory map (no copy); otherwise only the requested rows are gathered. With
+        `before` (intraday bars) each date takes the latest stored day strictly before
+        its own day, at most `max_age_days` old. A bar-keyed store matches timestamps
+        exactly and ignores `before` (it was applied when the store was written).
+        """
+        d = pd.to_datetime(pd.Series(dates))
+        d = (d.dt.normalize() if self.daily else d).to_numpy(dtype="datetime64[ns]")
+        if before and self.daily:
+            pos = self.dates.searchsorted(d, side="left") - 1
+            stored = self.dates.to_numpy()
+            hit = (pos >= 0) & (d - stored[np.maximum(pos, 0)] <= np.timedelta64(max_age_days, "D")) \
+                if len(self.dates) else np.zeros(len(d), bool)
+            out = np.zeros((len(d), self.dim), dtype=np.float32)
+            out[hit] = self.matrix[pos[hit]]
+            return out
+        pos = self.dates.searchsorted(d)
+        pos_c = np.minimum(pos, max(len(self.dates) - 1, 0))
+        hit = (pos < len(self.dates)) & (self.dates.to_numpy()[pos_c] == d) if len(self.dates) else np.zeros(len(d), bool)
+        if len(d) and hit.all() and np.all(np.diff(pos) == 1):
+            return self.matrix[pos[0]:pos[-1] + 1]
+        out = np.zeros((len(d), self.dim), dtype=np.float32)
+        out[hit] = self.matrix[pos[hit]]
+        return out
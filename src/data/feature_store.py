@@ -0,0 +1,130 @@
+# src/data/feature_store.py
+import hashlib
+import inspect
+import json
+from pathlib import Path
+from typing import Callable
+import pandas as pd
+from src.tracing import span
+
+# Bump to invalidate every materialized entry (e.g. after a storage-format change).
+CACHE_VERSION = 1
+
+_file_memo: dict[tuple, str] = {}
+
+def hash_frame(df: pd.DataFrame) -> str:
+    h = hashlib.sha1()
+    h.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+def hash_file(path) -> str:
+    """Content hash of a file, memoized per (path, size, mtime) within the process."""
+    p = Path(path)
+    st = p.stat()
+    memo_key = (str(p.resolve()), st.st_size, st.st_mtime_ns)
+    if memo_key not in _file_memo:
+        h = hashlib.sha1()
+        with open(p, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+        _file_memo[memo_key] = h.hexdigest()
+    return _file_memo[memo_key]
+
+def hash_code(*objs) -> str:
+    """Hash of the source files defining `objs` (modules, functions or classes)."""
+    h = hashlib.sha1()
+    for obj in objs:
+        src = inspect.getsourcefile(obj)
+        h.update(Path(src).read_bytes() if src else repr(obj).encode())
+    return h.hexdigest()
+
+def _hash_input(x) -> str:
+    if isinstance(x, pd.DataFrame):
+        return hash_frame(x)
+    if isinstance(x, (str, Path)) and Path(x).is_file():
+        return hash_file(x)
+    return hashlib.sha1(repr(x).encode()).hexdigest()
+
+class FeatureStore:
+    """Materialized frames keyed by input content, code and parameters.
+
+    `materialize(name, fn, inputs, code, params)` returns the stored frame when none of
+    those changed and otherwise runs `fn()` and stores its result under
+    <root>/<name>/<key>.parquet. Only the newest `keep` entries per name are retained.
+    """
+
+    def __init__(self, root: str = "data/cache/features", enabled: bool = True, keep: int = 3):
+        self.root = Path(root)
+        self.enabled = enabled
+        self.keep = keep
+
+    def key(self, name: str, inputs=(), code=(), params: dict | None = None) -> str:
+        parts = {
+            "version": CACHE_VERSION,
+            "name": name,
+            "inputs": [_hash_input(x) for x in inputs],
+            "code": hash_code(*code) if code else "",
+            "params": json.dumps(params or {}, sort_keys=True, default=str),
+        }
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, name: str, key: str) -> Path:
+        return self.root / name / f"{key}.parquet"
+
+    def load(self, name: str, key: str) -> pd.DataFrame | None:
+        p = self._path(name, key)
+        if not (self.enabled and p.exists()):
+            return None
+        try:
+            with span("feature_store.read", name=name):
+                df = pd.read_parquet(p)
+        except Exception:
+            return None
+        p.touch()  # keep recently used entries from being pruned
+        return df
+
+    def save(self, name: str, key: str, df: pd.DataFrame):
+        if not self.enabled:
+            return
+        p = self._path(name, key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        with span("feature_store.write", name=name):
+            df.to_parquet(tmp, index=True)
+        tmp.replace(p)
+        old = sorted(p.parent.glob("*.parquet"), key=lambda f: f.stat().st_mtime, reverse=True)[self.keep:]
+        for f in old:
+            f.unlink(missing_ok=True)
+
+    def _stamp_path(self, outputs) -> Path:
+        ident = hashlib.sha1(json.dumps(sorted(str(Path(o).resolve()) for o in outputs)).encode()).hexdigest()
+        return self.root / "_stamps" / f"{ident}.json"
+
+    def up_to_date(self, outputs, key: str) -> bool:
+        """True if `outputs` were last written for `key` and have not been touched since."""
+        sp = self._stamp_path(outputs)
+        if not (self.enabled and sp.exists()) or not all(Path(o).exists() for o in outputs):
+            return False
+        rec = json.loads(sp.read_text())
+        files = {str(o): [Path(o).stat().st_size, Path(o).stat().st_mtime_ns] for o in outputs}
+        return rec.get("key") == key and rec.get("files") == files
+
+    def stamp(self, outputs, key: str):
+        if not self.enabled:
+            return
+        sp = self._stamp_path(outputs)
+        sp.parent.mkdir(parents=True, exist_ok=True)
+        files = {str(o): [Path(o).stat().st_size, Path(o).stat().st_mtime_ns] for o in outputs}
+        sp.write_text(json.dumps({"key": key, "files": files}))
+
+    def materialize(self, name: str, fn: Callable[[], pd.DataFrame], inputs=(), code=(),
+                    params: dict | None = None) -> pd.DataFrame:
+        key = self.key(name, inputs, code, params)
+        df = self.load(name, key)
+        if df is not None:
+            print(f"[feature-store] {name}: cache hit ({key[:10]})")
+            return df
+        df = fn()
+        self.save(name, key, df)
+        return df
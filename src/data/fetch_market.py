@@ -1,9 +1,25 @@
 # src/data/fetch_market.py
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 import pandas as pd
 import numpy as np
 import yfinance as yf
 import pandas_datareader.data as web
+from src.data.align import AsOfSeries, align_asof
+from src.data.bars import intraday_start, is_intraday, periods_per_year, window
+from src.tracing import span, traced
+
+# yf.download keeps per-call results in module-global state, so concurrent calls must not overlap
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+# Carry-forward limits used when aligning onto SPY's trading calendar: a few missed
+# sessions are bridged, but a dead feed shows up as NaN instead of a flat line.
+MACRO_STALENESS = {"vix": "7D", "dgs10": "10D", "dgs3mo": "10D"}
+# On intraday bars a daily macro print (stamped at midnight, known at the close) is only
+# used from the next session on.
+INTRADAY_MACRO_LAG = "1D"
 
 # ---------- helpers ----------
 def _normalize(df: pd.DataFrame) -> pd.DataFrame:
@@ -21,20 +37,27 @@ def _normalize(df: pd.DataFrame) -> pd.DataFrame:
     df = df.reset_index()
     df.columns = [c.lower().replace(" ", "_") for c in df.columns]
     if "date" not in df.columns:
-        if "index" in df.columns:
+        if "datetime" in df.columns:  # intraday history is indexed by "Datetime"
+            df = df.rename(columns={"datetime": "date"})
+        elif "index" in df.columns:
             df = df.rename(columns={"index": "date"})
     df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
     return df
 
-def _yf_hist(ticker: str, start: str) -> pd.DataFrame:
-    """Robust single-ticker download via yfinance with retries."""
+@traced("fetch_market.yf")
+def _yf_hist(ticker: str, start: str, interval: str = "1d") -> pd.DataFrame:
+    """Robust single-ticker download via yfinance with retries.
+
+    Intraday timestamps keep exchange-local wall time (tz dropped). Yahoo only serves
+    recent intraday history (about 730 days of 1h, 60 days of 5m bars).
+    """
     last_err = None
     for i in range(1):
         try:
             t = yf.Ticker(ticker)
             df = t.history(
                 start=start,
-                interval="1d",
+                interval=interval,
                 auto_adjust=False,
                 actions=False,
                 raise_errors=False,
@@ -45,16 +68,17 @@ def _yf_hist(ticker: str, start: str) -> pd.DataFrame:
             last_err = e
 
         try:
-            df = yf.download(
-                ticker,
-                start=start,
-                interval="1d",
-                auto_adjust=False,
-                actions=False,
-                progress=False,
-                threads=False,
-                group_by="column",
-            )
+            with _YF_DOWNLOAD_LOCK:
+                df = yf.download(
+                    ticker,
+                    start=start,
+                    interval=interval,
+                    auto_adjust=False,
+                    actions=False,
+                    progress=False,
+                    threads=False,
+                    group_by="column",
+                )
             if isinstance(df, pd.DataFrame) and not df.empty:
                 return _normalize(df)
         except Exception as e:
@@ -63,6 +87,7 @@ def _yf_hist(ticker: str, start: str) -> pd.DataFrame:
         time.sleep(1 + i)  # simple backoff
     raise RuntimeError(f"yfinance history failed for {ticker}: {last_err}")
 
+@traced("fetch_market.stooq")
 def _stooq_hist(symbol: str, start: str) -> pd.DataFrame:
     """Stooq fallback for symbols (not all indices are available)."""
     candidates = [symbol]
@@ -79,6 +104,7 @@ def _stooq_hist(symbol: str, start: str) -> pd.DataFrame:
             last_err = e
     raise RuntimeError(f"stooq failed for {symbol}: {last_err}")
 
+@traced("fetch_market.fred")
 def _fred_series(series: str, start: str, out_col: str) -> pd.DataFrame:
     df = web.DataReader(series, "fred", start)
     if not isinstance(df, pd.DataFrame) or df.empty:
@@ -91,14 +117,25 @@ def _fred_series(series: str, start: str, out_col: str) -> pd.DataFrame:
     return out.sort_values("date").reset_index(drop=True)
 
 # ---------- fetchers ----------
-def get_prices(symbol="SPY", start="2010-01-01") -> pd.DataFrame:
+def get_prices(symbol="SPY", start="2010-01-01", interval: str = "1d") -> pd.DataFrame:
+    if is_intraday(interval):  # stooq is daily only; Yahoo rejects starts beyond its intraday lookback
+        df = _yf_hist(symbol, intraday_start(start, interval), interval)
+        for c in ["open", "high", "low", "close", "adj_close"]:
+            if c in df.columns:
+                df[c] = df[c].astype(np.float32)
+        return df
     try:
         return _yf_hist(symbol, start)
     except Exception:
         return _stooq_hist(symbol, start)
 
-def get_vix(start="2010-01-01", spy_df: pd.DataFrame | None = None) -> pd.DataFrame:
-    # Try ^VIX, else realized-vol proxy from SPY so the pipeline never breaks
+def get_vix(start="2010-01-01", spy_df: pd.DataFrame | Callable[[], pd.DataFrame] | None = None,
+            interval: str = "1d") -> pd.DataFrame:
+    # Try ^VIX, else realized-vol proxy from SPY so the pipeline never breaks.
+    # `spy_df` may be a callable (e.g. a future's .result) so SPY is only awaited when the proxy is needed;
+    # `interval` is SPY's bar size, which sets the proxy's window and annualization. The proxy is
+    # computed over all of `spy_df` (so its window is warm at `start`), returned from `start` on and
+    # tagged attrs["fallback"], which MarketStore.update never persists.
     try:
         vix = _yf_hist("^VIX", start)[["date", "close"]].rename(columns={"close": "vix"})
         return vix
@@ -107,13 +144,20 @@ def get_vix(start="2010-01-01", spy_df: pd.DataFrame | None = None) -> pd.DataFr
             return _fred_series("VIXCLS", start, "vix")
         except Exception:
             pass
+        if callable(spy_df):
+            try:
+                spy_df = spy_df()
+            except Exception:
+                spy_df = None
         if spy_df is None or spy_df.empty:
             return pd.DataFrame({"date": pd.to_datetime([]), "vix": []})
         tmp = spy_df[["date", "close"]].copy()
         tmp["ret"] = tmp["close"].pct_change()
-        rv = tmp["ret"].rolling(21).std() * np.sqrt(252) * 100.0  # annualized %
+        rv = tmp["ret"].rolling(window(21, interval)).std() * np.sqrt(periods_per_year(interval)) * 100.0  # annualized %
         out = tmp[["date"]].copy()
         out["vix"] = rv
+        out = out[out["date"] >= pd.Timestamp(start)].reset_index(drop=True)
+        out.attrs["fallback"] = "realized-vol proxy from SPY"
         return out
 
 def get_yield_10y(start="2010-01-01") -> pd.DataFrame:
@@ -133,20 +177,132 @@ def get_yield_3m(start="2010-01-01") -> pd.DataFrame:
     except Exception:
         return _fred_series("DGS3MO", start, "dgs3mo")
 
-def merge_market(start="2010-01-01") -> pd.DataFrame:
-    spy = get_prices("SPY", start)
-    vix = get_vix(start, spy_df=spy)
-    dgs10 = get_yield_10y(start)
-    dgs3m = get_yield_3m(start)
+# ---------- universe (many symbols) ----------
+UNIVERSE_FIELDS = ["open", "high", "low", "close", "adj_close", "volume"]
+
+@traced("fetch_market.yf_batch")
+def _yf_batch(tickers: list[str], start: str, interval: str = "1d") -> pd.DataFrame:
+    """One yfinance request for many tickers; returns wide (field, ticker) columns."""
+    with _YF_DOWNLOAD_LOCK:
+        return yf.download(
+            tickers,
+            start=start,
+            interval=interval,
+            auto_adjust=False,
+            actions=False,
+            progress=False,
+            threads=True,
+            group_by="column",
+        )
+
+def _wide_to_long(df: pd.DataFrame, tickers: list[str]) -> pd.DataFrame:
+    """(date x (field, ticker)) -> long (date, symbol, fields); rows with no close are dropped."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=["date", "symbol"] + UNIVERSE_FIELDS)
+    df = df.copy()
+    if not isinstance(df.columns, pd.MultiIndex):
+        df.columns = pd.MultiIndex.from_product([df.columns, tickers[:1]])
+    lvl0 = {str(x).lower().replace(" ", "_") for x in df.columns.get_level_values(0)}
+    if "close" not in lvl0:  # group_by="ticker" layout -> (ticker, field)
+        df.columns = df.columns.swaplevel(0, 1)
+    df.columns = pd.MultiIndex.from_arrays([
+        [str(x).lower().replace(" ", "_") for x in df.columns.get_level_values(0)],
+        df.columns.get_level_values(1),
+    ])
+    df.index = pd.to_datetime(df.index).tz_localize(None)
+    df.index.name = "date"
+    long = df.stack(level=1, future_stack=True)
+    long.index = long.index.set_names(["date", "symbol"])
+    long = long.reset_index()
+    long = long.dropna(subset=["close"]) if "close" in long.columns else long.iloc[0:0]
+    return long
+
+@traced()
+def get_universe(symbols: list[str], start: str = "2010-01-01", batch_size: int = 100, retries: int = 2,
+                 source: Callable[[list[str], str], pd.DataFrame] | None = None,
+                 interval: str = "1d", backoff: float = 0.5) -> pd.DataFrame:
+    """OHLCV bars (daily by default) for many symbols in batched requests.
+
+    Returns a compact long frame (date, symbol, open, high, low, close, adj_close, volume)
+    with categorical `symbol` and float32 prices. Symbols missing from a batch are retried
+    one at a time (up to `retries` attempts, waiting backoff * attempt between them);
+    `source(tickers, start)` can replace yfinance (e.g. a local file reader).
+    """
+    source = source or (lambda tickers, start: _yf_batch(tickers, start, interval))
+    symbols = list(dict.fromkeys(symbols))
+    parts, missing = [], []
+    for b in range(0, len(symbols), batch_size):
+        batch = symbols[b:b+batch_size]
+        try:
+            long = _wide_to_long(source(batch, start), batch)
+        except Exception:
+            long = _wide_to_long(None, batch)
+        if not long.empty:
+            parts.append(long)
+        got = set(long["symbol"].unique())
+        missing.extend(s for s in batch if s not in got)
+
+    failed = []
+    for sym in missing:
+        for i in range(retries):
+            try:
+                long = _wide_to_long(source([sym], start), [sym])
+                if not long.empty:
+                    parts.append(long)
+                    break
+            except Exception:
+                pass
+            if i < retries - 1:
+                time.sleep(backoff * (i + 1))  # simple backoff, only before another attempt
+        else:
+            failed.append(sym)
+    if failed:
+        print(f"[universe] no data for {len(failed)} symbols: {failed[:10]}{'...' if len(failed) > 10 else ''}")
+
+    out = pd.concat(parts, ignore_index=True) if parts else _wide_to_long(None, [])
+    for col in UNIVERSE_FIELDS:
+        if col not in out.columns:
+            out[col] = np.nan
+        out[col] = out[col].astype(np.float32)
+    out["symbol"] = pd.Categorical(out["symbol"], categories=symbols)
+    out = out[["date", "symbol"] + UNIVERSE_FIELDS].sort_values(["date", "symbol"]).reset_index(drop=True)
+    out.attrs["failed"] = failed
+    return out
+
+@traced()
+def merge_market(start="2010-01-01", store=None, offline: bool = False, interval: str = "1d") -> pd.DataFrame:
+    """SPY + VIX + 10Y + 3M aligned on SPY dates.
 
-    m = (
-        spy.merge(vix, on="date", how="left")
-           .merge(dgs10, on="date", how="left")
-           .merge(dgs3m, on="date", how="left")
-    )
+    With a `MarketStore`, each series is read from the local store after a delta
+    fetch of its missing tail (`offline=True` skips the network entirely). With an
+    intraday `interval` SPY comes as bars of that size (stored as "SPY_<interval>") and
+    the daily macro series are lagged to the next session. Intraday SPY history is fetched
+    from `intraday_start` (the source's lookback); older bars already in the store are kept.
+    """
+    def load(series, fetch, earliest=None):
+        if store is None:
+            return fetch(earliest or start)
+        return store.update(series, fetch, start=start, offline=offline, earliest=earliest)
 
-    for col in ["dgs10", "dgs3mo", "vix"]:
-        if col in m.columns:
-            m[col] = m[col].ffill()
+    # Each series runs its own fallback chain (and backoff) in its own thread,
+    # so latency is that of the slowest series rather than the sum.
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        spy_series = f"SPY_{interval}" if is_intraday(interval) else "SPY"
+        f_spy = ex.submit(load, spy_series, lambda s: get_prices("SPY", s, interval),
+                          intraday_start(start, interval) if is_intraday(interval) else None)
+        # the realized-vol proxy (used for one run, never stored) is only built from daily SPY bars
+        f_vix = ex.submit(load, "vix", lambda s: get_vix(s, f_spy.result if not is_intraday(interval) else None))
+        f_10y = ex.submit(load, "dgs10", get_yield_10y)
+        f_3m = ex.submit(load, "dgs3mo", get_yield_3m)
+    spy = f_spy.result()
+    vix = f_vix.result()
+    dgs10 = f_10y.result()
+    dgs3m = f_3m.result()
 
-    return m
+    lag = INTRADAY_MACRO_LAG if is_intraday(interval) else 0
+    with span("fetch_market.align"):
+        return align_asof(spy, [
+            AsOfSeries("vix", vix, ["vix"], max_staleness=MACRO_STALENESS["vix"], lag=lag),
+            AsOfSeries("dgs10", dgs10, ["dgs10"], max_staleness=MACRO_STALENESS["dgs10"], lag=lag),
+            AsOfSeries("dgs3mo", dgs3m, ["dgs3mo"], max_staleness=MACRO_STALENESS["dgs3mo"], lag=lag),
+        ])
@@ -0,0 +1,136 @@
+# src/data/market_store.py
+import json
+import threading
+from pathlib import Path
+from typing import Callable
+import pandas as pd
+from src.tracing import traced
+
+# value columns of a series that has never been stored (after a store, _meta.json records them):
+# macro series hold one column named after the series, anything else is a price series
+SERIES_COLUMNS = {"vix": ["vix"], "dgs10": ["dgs10"], "dgs3mo": ["dgs3mo"]}
+PRICE_COLUMNS = ["open", "high", "low", "close", "adj_close", "volume"]
+
+class MarketStore:
+    """Local Parquet store: one dataset per series, partitioned by year.
+
+    Layout: <root>/<series>/year=YYYY/part.parquet plus <root>/<series>/_meta.json
+    recording the first/last stored dates. `update` fetches only the missing tail
+    (re-requesting `overlap_days` to pick up revisions) and falls back to the cached
+    rows when the remote source is unavailable. Fetched frames tagged attrs["fallback"]
+    (stand-ins such as the VIX proxy) are used for that run only and never stored.
+    """
+
+    def __init__(self, root: str = "data/store/market", overlap_days: int = 7):
+        self.root = Path(root)
+        self.overlap_days = overlap_days
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _dir(self, series: str) -> Path:
+        safe = series.replace("^", "_").replace("/", "_")
+        return self.root / safe
+
+    def _lock(self, series: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(series, threading.Lock())
+
+    def meta(self, series: str) -> dict:
+        f = self._dir(series) / "_meta.json"
+        return json.loads(f.read_text()) if f.exists() else {}
+
+    def schema(self, series: str) -> list[str]:
+        """Value columns of `series` (without date)."""
+        return self.meta(series).get("columns") or SERIES_COLUMNS.get(series.lower(), PRICE_COLUMNS)
+
+    def empty(self, series: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """Zero-row frame with the series' full schema: datetime `date` + float value columns."""
+        cols = [c for c in (columns or self.schema(series)) if c != "date"]
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"),
+                             **{c: pd.Series(dtype="float64") for c in cols}})
+
+    @traced("market_store.read")
+    def read(self, series: str, start: str | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        d = self._dir(series)
+        files = sorted(d.glob("year=*/part.parquet"))
+        if start is not None:
+            y0 = pd.Timestamp(start).year
+            files = [f for f in files if int(f.parent.name.split("=")[1]) >= y0]
+        if not files:
+            return self.empty(series, columns)
+        cols = None if columns is None else ["date"] + [c for c in columns if c != "date"]
+        df = pd.concat([pd.read_parquet(f, columns=cols) for f in files], ignore_index=True)
+        if start is not None:
+            df = df[df["date"] >= pd.Timestamp(start)]
+        if df.empty:
+            return self.empty(series, columns or [c for c in df.columns if c != "date"])
+        return df.sort_values("date").reset_index(drop=True)
+
+    @traced("market_store.upsert")
+    def upsert(self, series: str, df: pd.DataFrame) -> int:
+        """Merge rows by date (incoming rows win) and rewrite only the touched year partitions."""
+        if df is None or df.empty:
+            return 0
+        new = df.copy()
+        new["date"] = pd.to_datetime(new["date"]).dt.tz_localize(None)
+        d = self._dir(series)
+        for year, chunk in new.groupby(new["date"].dt.year):
+            f = d / f"year={int(year)}" / "part.parquet"
+            if f.exists():
+                old = pd.read_parquet(f)
+                chunk = pd.concat([old[~old["date"].isin(chunk["date"])], chunk], ignore_index=True)
+            f.parent.mkdir(parents=True, exist_ok=True)
+            tmp = f.with_suffix(".tmp")
+            chunk.sort_values("date").reset_index(drop=True).to_parquet(tmp, index=False)
+            tmp.replace(f)
+        meta = self.meta(series)
+        first, last = new["date"].min(), new["date"].max()
+        if meta:
+            first = min(first, pd.Timestamp(meta["first_date"]))
+            last = max(last, pd.Timestamp(meta["last_date"]))
+        columns = list(dict.fromkeys(meta.get("columns", []) + [c for c in new.columns if c != "date"]))
+        meta = {"series": series, "first_date": str(first.date()), "last_date": str(last.date()), "columns": columns}
+        (d / "_meta.json").write_text(json.dumps(meta))
+        return len(new)
+
+    def update(self, series: str, fetch: Callable[[str], pd.DataFrame], start: str = "2010-01-01",
+               offline: bool = False, earliest: str | None = None) -> pd.DataFrame:
+        """Bring `series` up to date via `fetch(start_date)` and return the stored rows from `start`.
+
+        `earliest` is the oldest date the source can serve (intraday lookback): coverage and a
+        full fetch start there instead of at `start`.
+        """
+        with self._lock(series):
+            meta = self.meta(series)
+            if not offline:
+                first = max(pd.Timestamp(start), pd.Timestamp(earliest)) if earliest else pd.Timestamp(start)
+                covered = meta and pd.Timestamp(meta["first_date"]) <= first + pd.Timedelta(days=7)
+                since = str(first.date())
+                if covered:
+                    since = str((pd.Timestamp(meta["last_date"]) - pd.Timedelta(days=self.overlap_days)).date())
+                try:
+                    df = fetch(since)
+                except Exception as e:
+                    if not meta:
+                        raise
+                    print(f"[store] {series}: fetch failed ({e}); using cached data through {meta['last_date']}")
+                else:
+                    fallback = df.attrs.get("fallback") if df is not None else None
+                    if df is not None and not df.empty:  # a fetcher may return more than asked for
+                        df = df[pd.to_datetime(df["date"]).dt.tz_localize(None) >= pd.Timestamp(since)]
+                    if fallback:
+                        return self._with_fallback(series, df, start, fallback)
+                    n = self.upsert(series, df)
+                    print(f"[store] {series}: fetched {n} rows since {since}")
+            return self.read(series, start=start)
+
+    def _with_fallback(self, series: str, df: pd.DataFrame, start: str, what: str) -> pd.DataFrame:
+        """Stored rows plus fallback rows for dates the store does not have (not persisted)."""
+        stored = self.read(series, start=start)
+        df = df.copy()
+        df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
+        extra = df[(df["date"] >= pd.Timestamp(start)) & ~df["date"].isin(stored["date"])]
+        print(f"[store] {series}: using {len(extra)} {what} rows for this run only (not stored)")
+        if stored.empty:
+            return extra.sort_values("date").reset_index(drop=True)
+        return pd.concat([stored, extra], ignore_index=True).sort_values("date").reset_index(drop=True)
@@ -0,0 +1,250 @@
+# src/data/synthetic.py
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from pandas.tseries.offsets import BDay
+from src.data.bars import SESSION_MINUTES, SESSION_OPEN
+from src.features.ts_features import TimeFeatureEngine
+
+# Synthetic market for load testing.
+#
+# Returns follow a one-factor model r_i = beta_i * f + e_i where the factor and every
+# idiosyncratic term have their own GARCH(1,1) variance with Student-t shocks, so
+# returns are correlated across symbols, fat-tailed and volatility-clustered. VIX
+# tracks the factor's conditional vol, yields are mean-reverting, and headline tone
+# follows the factor's daily move. Time is generated in chunks with the recursion state
+# carried across chunks, so output size is bounded only by disk.
+
+GARCH_ALPHA, GARCH_BETA = 0.08, 0.90
+T_DOF = 5
+
+_TONE = {
+    "pos": ["{a} beats expectations as {b} improves", "{a} rallies on strong {b}", "upbeat {b} lifts {a}",
+            "{a} rises after {b} surprise", "investors cheer {b}; {a} gains"],
+    "neg": ["{a} slides as {b} disappoints", "{a} falls on weak {b}", "{b} worries weigh on {a}",
+            "{a} drops after {b} miss", "selloff in {a} deepens on {b} fears"],
+    "neu": ["{a} steady ahead of {b} data", "{b} in line; {a} little changed", "{a} flat as traders await {b}",
+            "officials comment on {b} outlook", "{a} mixed after {b} release"],
+}
+_SUBJECTS = ["stocks", "treasuries", "the dollar", "oil", "tech shares", "banks", "the S&P 500", "futures"]
+_TOPICS = ["payrolls", "inflation", "CPI", "retail sales", "GDP", "Fed minutes", "earnings", "PMI",
+           "jobless claims", "consumer confidence", "housing starts", "wage growth"]
+
+def _t_shocks(rng, shape) -> np.ndarray:
+    return rng.standard_t(T_DOF, shape) / np.sqrt(T_DOF / (T_DOF - 2))  # unit variance
+
+class SyntheticMarket:
+    """Streaming generator of daily panels, intraday bars, macro series and headlines.
+
+    `chunks(chunk_days)` yields dicts of DataFrames covering consecutive business-day
+    blocks: "panel" (date, symbol, OHLCV; float32 prices), "macro" (date, vix, dgs10,
+    dgs3mo), "headlines" (date, headline) and, with `intraday_minutes`, "intraday" bars
+    for the first `intraday_symbols` symbols. The same arguments always give the same data.
+    """
+
+    def __init__(self, symbols: int = 100, start: str = "2000-01-03", end: str | None = None,
+                 corr: float = 0.4, ann_vol: float = 0.18, drift: float = 0.07, seed: int = 0,
+                 intraday_minutes: int = 0, intraday_symbols: int = 1, headlines_per_day: float = 0.0,
+                 primary: str = "SPY"):
+        self.dates = pd.date_range(start, end or pd.Timestamp.today().normalize(), freq=BDay())
+        self.n = int(symbols)
+        self.names = [primary] + [f"SYN{k:04d}" for k in range(1, self.n)]
+        self.seed = seed
+        self.intraday_minutes = int(intraday_minutes)
+        self.intraday_symbols = min(int(intraday_symbols), self.n) if intraday_minutes else 0
+        if intraday_minutes and SESSION_MINUTES % intraday_minutes:
+            raise ValueError(f"intraday_minutes must divide {SESSION_MINUTES}")
+        self.headlines_per_day = float(headlines_per_day)
+
+        rng = np.random.default_rng([seed, 0])
+        self.beta = np.r_[1.0, rng.uniform(0.5, 1.5, self.n - 1)]
+        v_f = ann_vol ** 2 / 252
+        corr = min(max(corr, 1e-3), 0.999)
+        # idiosyncratic variance giving pairwise correlation ~corr for beta=1 names
+        self.v_f = v_f
+        self.v_e = self.beta ** 2 * v_f * (1 - corr) / corr * rng.uniform(0.6, 1.6, self.n)
+        self.v_e[0] = v_f * 0.05  # the primary series is close to the factor itself
+        self.mu = drift / 252
+        self.base_volume = rng.lognormal(15.5, 0.8, self.n)
+        # recursion state carried across chunks
+        self._s2_f = v_f
+        self._s2_e = self.v_e.copy()
+        self._eps_f = 0.0
+        self._eps_e = np.zeros(self.n)
+        self._close = 100.0 * rng.uniform(0.3, 3.0, self.n)
+        self._close[0] = 100.0
+        self._dgs10, self._dgs3m = 3.0, 1.5
+
+    def _garch(self, rng, days: int):
+        """Factor and idiosyncratic returns with their conditional variances, day by day."""
+        z_f = _t_shocks(rng, days)
+        z_e = _t_shocks(rng, (days, self.n))
+        w_f = self.v_f * (1 - GARCH_ALPHA - GARCH_BETA)
+        w_e = self.v_e * (1 - GARCH_ALPHA - GARCH_BETA)
+        f = np.empty(days)
+        e = np.empty((days, self.n))
+        s2f = np.empty(days)
+        s2e = np.empty((days, self.n))
+        s2_f, s2_e, eps_f, eps_e = self._s2_f, self._s2_e, self._eps_f, self._eps_e
+        for t in range(days):
+            s2_f = w_f + GARCH_ALPHA * eps_f ** 2 + GARCH_BETA * s2_f
+            s2_e = w_e + GARCH_ALPHA * eps_e ** 2 + GARCH_BETA * s2_e
+            eps_f = np.sqrt(s2_f) * z_f[t]
+            eps_e = np.sqrt(s2_e) * z_e[t]
+            f[t], e[t], s2f[t], s2e[t] = eps_f, eps_e, s2_f, s2_e
+        self._s2_f, self._s2_e, self._eps_f, self._eps_e = s2_f, s2_e, eps_f, eps_e
+        return f, e, s2f, s2e
+
+    def _ohlcv(self, rng, dates, r, sigma):
+        days = len(dates)
+        drift = self.mu - 0.5 * sigma ** 2
+        logret = drift + r
+        gap = 0.2 * sigma * rng.standard_normal((days, self.n))
+        prev = self._close * np.exp(np.r_[np.zeros((1, self.n)), np.cumsum(logret, axis=0)[:-1]])
+        close = self._close * np.exp(np.cumsum(logret, axis=0))
+        self._close = close[-1]
+        openp = prev * np.exp(gap)
+        wick = 0.5 * sigma * np.abs(rng.standard_normal((2, days, self.n)))
+        high = np.maximum(openp, close) * np.exp(wick[0])
+        low = np.minimum(openp, close) * np.exp(-wick[1])
+        volume = (self.base_volume * np.exp(0.5 * np.abs(r) / sigma + 0.3 * rng.standard_normal((days, self.n))))
+        return openp, high, low, close, volume.astype(np.int64)
+
+    def _intraday(self, rng, dates, openp, close, sigma, volume):
+        """Brownian-bridge bars from each day's open to its close, with a U-shaped vol profile."""
+        k = self.intraday_symbols
+        bars = SESSION_MINUTES // self.intraday_minutes
+        u = np.linspace(-1, 1, bars)
+        prof = 1.0 + 1.5 * u ** 2
+        prof /= prof.sum()
+        days = len(dates)
+        sd = sigma[:, None, :k] * np.sqrt(prof)[None, :, None]  # (days, bars, k)
+        steps = sd * rng.standard_normal((days, bars, k))
+        target = np.log(close[:, :k] / openp[:, :k])
+        steps += prof[None, :, None] * (target - steps.sum(axis=1))[:, None, :]
+        path = openp[:, None, :k] * np.exp(np.cumsum(steps, axis=1))  # bar closes
+        bar_open = np.concatenate([openp[:, None, :k], path[:, :-1]], axis=1)
+        wick = 0.3 * sd * np.abs(rng.standard_normal((2, days, bars, k)))
+        bar_high = np.maximum(bar_open, path) * np.exp(wick[0])
+        bar_low = np.minimum(bar_open, path) * np.exp(-wick[1])
+        bar_vol = (volume[:, None, :k] * prof[None, :, None]).astype(np.int64)
+        # bar opens on the same session grid as bars.session_stamps
+        stamps = (dates.values[:, None] + pd.Timedelta(SESSION_OPEN + ":00").to_timedelta64()
+                  + np.arange(bars)[None, :] * np.timedelta64(self.intraday_minutes, "m"))
+        frame = pd.DataFrame({
+            "date": np.repeat(stamps.ravel(), k),
+            "symbol": pd.Categorical.from_codes(np.tile(np.arange(k), days * bars), self.names[:k]),
+            "open": bar_open.ravel().astype(np.float32),
+            "high": bar_high.ravel().astype(np.float32),
+            "low": bar_low.ravel().astype(np.float32),
+            "close": path.ravel().astype(np.float32),
+            "volume": bar_vol.ravel(),
+        })
+        # daily range of these symbols is the range of their bars
+        return frame, bar_high.max(axis=1), bar_low.min(axis=1)
+
+    def _macro(self, rng, dates, s2f):
+        days = len(dates)
+        vix = 100 * np.sqrt(252 * s2f) * 1.1 * np.exp(0.05 * rng.standard_normal(days))
+        d10, d3 = np.empty(days), np.empty(days)
+        x10, x3 = self._dgs10, self._dgs3m
+        n10, n3 = 0.05 * rng.standard_normal(days), 0.03 * rng.standard_normal(days)
+        for t in range(days):
+            x10 += 0.002 * (3.0 - x10) + n10[t]
+            x3 = max(x3 + 0.003 * (1.5 - x3) + n3[t], 0.0)
+            d10[t], d3[t] = x10, x3
+        self._dgs10, self._dgs3m = x10, x3
+        return pd.DataFrame({"date": dates, "vix": vix, "dgs10": d10, "dgs3mo": d3})
+
+    def _headlines(self, rng, dates, f, s2f):
+        counts = rng.poisson(self.headlines_per_day, len(dates))
+        total = int(counts.sum())
+        if not total:
+            return pd.DataFrame({"date": pd.to_datetime([]), "headline": []})
+        day = np.repeat(np.arange(len(dates)), counts)
+        z = (f / np.sqrt(s2f))[day]
+        p_pos = 1 / (1 + np.exp(-1.5 * z))
+        u = rng.random(total)
+        tone = np.where(u < 0.3, "neu", np.where(rng.random(total) < p_pos, "pos", "neg"))
+        tmpl = rng.integers(0, 5, total)
+        subj = rng.integers(0, len(_SUBJECTS), total)
+        topic = rng.integers(0, len(_TOPICS), total)
+        text = [_TONE[t][i].format(a=_SUBJECTS[s], b=_TOPICS[b]) for t, i, s, b in zip(tone, tmpl, subj, topic)]
+        return pd.DataFrame({"date": dates.values[day], "headline": text})
+
+    def chunks(self, chunk_days: int = 63):
+        for c, lo in enumerate(range(0, len(self.dates), chunk_days)):
+            dates = self.dates[lo:lo + chunk_days]
+            rng = np.random.default_rng([self.seed, 1, c])
+            f, e, s2f, s2e = self._garch(rng, len(dates))
+            r = self.beta * f[:, None] + e
+            sigma = np.sqrt(self.beta ** 2 * s2f[:, None] + s2e)
+            openp, high, low, close, volume = self._ohlcv(rng, dates, r, sigma)
+            out = {"macro": self._macro(rng, dates, s2f)}
+            if self.intraday_symbols:
+                out["intraday"], hi, lo_ = self._intraday(rng, dates, openp, close, sigma, volume)
+                high[:, :self.intraday_symbols], low[:, :self.intraday_symbols] = hi, lo_
+            days = len(dates)
+            out["panel"] = pd.DataFrame({
+                "date": np.repeat(dates.values, self.n),
+                "symbol": pd.Categorical.from_codes(np.tile(np.arange(self.n), days), self.names),
+                "open": openp.ravel().astype(np.float32),
+                "high": high.ravel().astype(np.float32),
+                "low": low.ravel().astype(np.float32),
+                "close": close.ravel().astype(np.float32),
+                "adj_close": close.ravel().astype(np.float32),
+                "volume": volume.ravel(),
+            })
+            # primary series in full precision, shaped like merge_market's output
+            out["market"] = pd.DataFrame({"date": dates, "open": openp[:, 0], "high": high[:, 0], "low": low[:, 0],
+                                          "close": close[:, 0], "adj_close": close[:, 0], "volume": volume[:, 0]})
+            out["market"] = out["market"].merge(out["macro"], on="date", how="left")
+            if self.headlines_per_day > 0:
+                out["headlines"] = self._headlines(rng, dates, f, s2f)
+            yield out
+
+def _append_csv(df: pd.DataFrame, path: Path, first: bool):
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+def _write_parts(df: pd.DataFrame, root: Path, chunk: int):
+    for year, part in df.groupby(df["date"].dt.year):
+        d = root / f"year={int(year)}"
+        d.mkdir(parents=True, exist_ok=True)
+        part.reset_index(drop=True).to_parquet(d / f"part-{chunk:05d}.parquet", index=False)
+
+def write_synthetic(gen: SyntheticMarket, out_dir: str, chunk_days: int = 63, features: bool = True) -> dict:
+    """Stream `gen` to disk one chunk at a time.
+
+    Files (same formats as the real pipeline):
+      market_raw.csv / market.csv  primary symbol + macro, as written by scripts.bootstrap_data
+      headlines.csv                date,headline (input to ingest_text_sources / build_text_features)
+      universe/year=YYYY/*.parquet long (date, symbol) daily panel, float32 prices
+      intraday/year=YYYY/*.parquet intraday bars, when enabled
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    for sub in ("universe", "intraday"):
+        for f in (out / sub).glob("year=*/part-*.parquet"):
+            f.unlink()
+    engine = TimeFeatureEngine() if features else None
+    rows = {"market": 0, "panel": 0, "intraday": 0, "headlines": 0}
+    first_feat = first_text = True
+    for c, ch in enumerate(gen.chunks(chunk_days)):
+        _append_csv(ch["market"], out / "market_raw.csv", c == 0)
+        if engine is not None:
+            feat = engine.update(ch["market"])
+            if len(feat):
+                _append_csv(feat, out / "market.csv", first_feat)
+                first_feat = False
+        _write_parts(ch["panel"], out / "universe", c)
+        if "intraday" in ch:
+            _write_parts(ch["intraday"], out / "intraday", c)
+            rows["intraday"] += len(ch["intraday"])
+        if "headlines" in ch:
+            if len(ch["headlines"]) or first_text:
+                _append_csv(ch["headlines"], out / "headlines.csv", first_text)
+                first_text = False
+            rows["headlines"] += len(ch["headlines"])
+        rows["market"] += len(ch["market"])
+        rows["panel"] += len(ch["panel"])
+    return rows
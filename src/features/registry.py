@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+# Declarative feature registry.
+#
+# A feature is (kind, input, window). Inputs are raw columns (close, high, low, vix, ...),
+# derived series (DERIVED below) or other registered features; the dependency graph is
+# resolved once per call. All rolling-moment kinds for one input share a single set of
+# prefix sums, so adding windows costs a subtraction per window rather than a pandas pass.
+# Windows count bars, like the core time features (ret2, vol20, ...): on daily bars vol20 is
+# a month, on 1h bars about three sessions. Register longer windows (bars.window(days,
+# interval)) for day-length horizons on intraday data.
+
+DERIVED = {
+    # name: (inputs, fn(*arrays) -> array)
+    "ret1": (["close"], lambda c: np.r_[np.nan, c[1:] / c[:-1] - 1.0]),
+    "logret1": (["close"], lambda c: np.r_[np.nan, np.log(c[1:] / c[:-1])]),
+    "hl_log_sq": (["high", "low"], lambda h, l: np.log(h / l) ** 2),
+}
+
+MOMENT_KINDS = {"mean", "std", "zscore", "skew", "parkinson"}
+KINDS = MOMENT_KINDS | {"ret", "ewm_vol"}
+
+REGISTRY: dict[str, dict] = {}
+
+def register(name: str, kind: str, input: str, window: int, overwrite: bool = False):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown feature kind {kind!r}; expected one of {sorted(KINDS)}")
+    if name in REGISTRY and not overwrite:
+        raise ValueError(f"Feature {name!r} already registered")
+    REGISTRY[name] = {"kind": kind, "input": input, "window": int(window)}
+
+def register_windows(kind: str, input: str, windows, prefix: str | None = None):
+    prefix = prefix or f"{input}_{kind}"
+    for w in windows:
+        register(f"{prefix}{w}", kind, input, w, overwrite=True)
+
+def _register_defaults():
+    register_windows("ret", "close", [2, 5, 10, 20, 60, 120, 250], prefix="ret")
+    register_windows("std", "ret1", [2, 5, 10, 20, 60, 120, 250], prefix="vol")
+    register_windows("ewm_vol", "ret1", [10, 20, 60], prefix="ewm_vol")
+    register_windows("skew", "ret1", [20, 60, 120], prefix="skew")
+    register_windows("zscore", "close", [20, 60, 250], prefix="close_z")
+    register_windows("parkinson", "hl_log_sq", [5, 10, 20, 60], prefix="pk_vol")
+    register_windows("zscore", "vix", [20, 60], prefix="vix_z")
+
+_register_defaults()
+
+def _resolve(names: list[str], columns: set[str]) -> list[str]:
+    """Topological order of derived series/features needed for `names`."""
+    order, state = [], {}
+
+    def visit(n):
+        if n in columns and n not in REGISTRY and n not in DERIVED:
+            return
+        if state.get(n) == 1:
+            raise ValueError(f"Cyclic feature dependency at {n!r}")
+        if state.get(n) == 2:
+            return
+        state[n] = 1
+        if n in DERIVED:
+            deps = DERIVED[n][0]
+        elif n in REGISTRY:
+            deps = [REGISTRY[n]["input"]]
+        else:
+            raise KeyError(f"Unknown feature or missing input column {n!r}")
+        for d in deps:
+            visit(d)
+        state[n] = 2
+        order.append(n)
+
+    for n in names:
+        visit(n)
+    return order
+
+def _moments(x: np.ndarray, kinds_windows: list[tuple[str, int, str]], dtype=np.float32) -> dict[str, np.ndarray]:
+    """All moment-based features of one input from shared prefix sums.
+
+    One cumulative pass per power of x; then, per window length, the window sums are
+    taken once (contiguous slice differences) and shared by every kind using that window.
+    """
+    n = len(x)
+    out = {name: np.full(n, np.nan, dtype=dtype) for _, _, name in kinds_windows}
+    if not kinds_windows or not n:
+        return out
+    valid = ~np.isnan(x)
+    shift = np.nanmean(x) if valid.any() else 0.0  # centring keeps the sums well conditioned
+    xc = np.where(valid, x - shift, 0.0)
+    kinds = {kind for kind, _, _ in kinds_windows}
+    cs1 = np.r_[0.0, np.cumsum(xc)]
+    cs2 = np.r_[0.0, np.cumsum(xc * xc)] if kinds & {"std", "zscore", "skew"} else None
+    cs3 = np.r_[0.0, np.cumsum(xc ** 3)] if "skew" in kinds else None
+    # leading NaNs (warm-up) are the common case: then a window is full iff it starts after them
+    first = int(np.argmax(valid)) if valid.any() else n
+    contiguous = bool(valid[first:].all())
+    cs_n = None if contiguous else np.r_[0, np.cumsum(valid)]
+    by_window = {}
+    for kind, k, name in kinds_windows:
+        by_window.setdefault(k, []).append((kind, name))
+
+    for k, items in by_window.items():
+        if k > n - first:
+            continue
+        lo = first if contiguous else 0  # outputs start at index lo + k - 1
+        s1 = cs1[lo + k:] - cs1[lo:-k]
+        m = s1 / k
+        need = {kind for kind, _ in items}
+        sd = s2 = None
+        if need & {"std", "zscore", "skew"}:
+            s2 = cs2[lo + k:] - cs2[lo:-k]
+        if need & {"std", "zscore"}:
+            var = s2 - s1 * m
+            var *= 1.0 / max(k - 1, 1)
+            np.maximum(var, 0.0, out=var)
+            sd = np.sqrt(var, out=var)
+        mask = None if contiguous else (cs_n[lo + k:] - cs_n[lo:-k]) == k
+        for kind, name in items:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if kind == "mean":
+                    res = m + shift
+                elif kind == "parkinson":
+                    # input is ln(H/L)^2; sigma = sqrt(mean / (4 ln 2))
+                    res = np.sqrt(np.maximum(m + shift, 0.0) / (4.0 * np.log(2.0)))
+                elif kind == "std":
+                    res = sd
+                elif kind == "zscore":
+                    res = (xc[lo + k - 1:] - m) / sd
+                    res[sd == 0] = np.nan
+                else:  # skew, same estimator as pandas rolling().skew()
+                    s3 = cs3[lo + k:] - cs3[lo:-k]
+                    b = s2 / k - m * m
+                    c = s3 / k - m ** 3 - 3 * m * b
+                    res = np.sqrt(k * (k - 1.0)) * c / ((k - 2.0) * b * np.sqrt(b))
+                    res[~(b > 1e-14)] = np.nan
+            if mask is not None:
+                res = np.where(mask, res, np.nan)
+            out[name][lo + k - 1:] = res
+    return out
+
+def compute_features(df: pd.DataFrame, names: list[str] | None = None, dtype=np.float32) -> pd.DataFrame:
+    """Compute registered features for `df` (lowercase columns) in batched passes.
+
+    Returns a frame of the requested features (default: whole registry) aligned to df.index.
+    Inputs whose raw columns are missing are skipped rather than failing the batch.
+    """
+    cols = {c.lower(): c for c in df.columns}
+    names = list(REGISTRY) if names is None else list(names)
+
+    def available(n):
+        if n in cols and n not in REGISTRY and n not in DERIVED:
+            return True
+        deps = DERIVED[n][0] if n in DERIVED else [REGISTRY[n]["input"]] if n in REGISTRY else None
+        return deps is not None and all(available(d) for d in deps)
+
+    names = [n for n in names if available(n)]
+    order = _resolve(names, set(cols))
+    arrays = {c: df[orig].to_numpy(dtype=np.float64, na_value=np.nan) for c, orig in cols.items()
+              if df[orig].dtype.kind in "fiub"}
+    results = {}
+
+    # features sharing an input are computed together; topological order guarantees the input exists
+    pending = [n for n in order if n in REGISTRY]
+    for n in order:
+        if n in DERIVED:
+            deps, fn = DERIVED[n]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                arrays[n] = fn(*[arrays[d] for d in deps])
+            continue
+        if n in results:
+            continue
+        spec = REGISTRY[n]
+        x = arrays[spec["input"]]
+        group = [m for m in pending if m not in results and REGISTRY[m]["input"] == spec["input"]]
+        moment = [(REGISTRY[m]["kind"], REGISTRY[m]["window"], m) for m in group if REGISTRY[m]["kind"] in MOMENT_KINDS]
+        results.update(_moments(x, moment, dtype=dtype))
+        for m in group:
+            kind, k = REGISTRY[m]["kind"], REGISTRY[m]["window"]
+            if kind == "ret":
+                prev = np.r_[np.full(min(k, len(x)), np.nan), x[:-k]] if k < len(x) else np.full(len(x), np.nan)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    results[m] = x / prev - 1.0
+            elif kind == "ewm_vol":
+                r2 = pd.Series(x * x)
+                results[m] = np.sqrt(r2.ewm(span=k, adjust=False, min_periods=k).mean().to_numpy())
+        for m in group:
+            arrays[m] = results[m]
+
+    return pd.DataFrame({n: results[n].astype(dtype) for n in names}, index=df.index)
@@ -1,34 +1,121 @@
 import pandas as pd
 import numpy as np
 
-def add_time_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    # standardize all column names to lowercase once
-    df.columns = [c.lower() for c in df.columns]
-
-    if "close" not in df.columns:
-        raise ValueError("Expected a 'close' column in the input DataFrame.")
-
-    # base returns/vol
-    df["ret1"] = df["close"].pct_change()
-    for k in [2, 5, 10, 20]:
-        df[f"ret{k}"] = df["close"].pct_change(k)
-        df[f"vol{k}"] = df["ret1"].rolling(k).std()
-
-    # vix change (if present)
-    if "vix" in df.columns:
-        df["vix_chg"] = df["vix"].pct_change()
-    else:
-        df["vix_chg"] = np.nan  # keep pipeline working even without vix
+WINDOWS = [2, 5, 10, 20]
+MUST_HAVE = ["ret1", "ret2", "ret5", "ret10", "vol5", "vol10", "vol20"]
+_STATE = max(WINDOWS)  # bars of history needed to continue every window
 
-    # term spread (10y - 3m) if both present
-    if "dgs10" in df.columns and "dgs3mo" in df.columns:
-        df["term_spread"] = df["dgs10"] - df["dgs3mo"]
-    else:
-        df["term_spread"] = np.nan
+def _ffill(x: np.ndarray, last: float = np.nan) -> np.ndarray:
+    """Forward-fill NaNs (like pct_change's default pad), seeded with `last` from earlier bars."""
+    x = np.concatenate([[last], x])
+    idx = np.where(np.isnan(x), 0, np.arange(len(x)))
+    np.maximum.accumulate(idx, out=idx)
+    return x[idx][1:]
+
+def _pct(x: np.ndarray, k: int, n_new: int) -> np.ndarray:
+    # same arithmetic as Series.pct_change: x / x.shift(k) - 1
+    t = np.arange(len(x) - n_new, len(x))
+    prev = np.where(t >= k, x[np.maximum(t - k, 0)], np.nan)
+    return x[t] / prev - 1
+
+def _rolling_std(r: np.ndarray, k: int, n_new: int) -> np.ndarray:
+    """Sample std (ddof=1) of the last k values at each of the last n_new positions.
+
+    Every output is computed from its own window with a fixed operation order, so the
+    result for a bar does not depend on how much history came before it.
+    """
+    t = np.arange(len(r) - n_new, len(r))
+    ok = t >= k - 1
+    cols = [np.where(ok, r[np.maximum(t - j, 0)], np.nan) for j in range(k - 1, -1, -1)]
+    s = cols[0].copy()
+    for c in cols[1:]:
+        s += c
+    mean = s / k
+    ss = (cols[0] - mean) ** 2
+    for c in cols[1:]:
+        ss += (c - mean) ** 2
+    return np.sqrt(ss / (k - 1))
+
+class TimeFeatureEngine:
+    """Stateful time features: feed bars in order, get feature rows for the new bars only.
+
+    State is the last closes, 1-bar returns and forward-filled VIX needed to continue
+    the windows, so each update is O(new rows). Output is bit-for-bit identical to
+    `add_time_features` on the full history (which runs this engine once).
+    """
+
+    def __init__(self):
+        self._close = np.empty(0)
+        self._ret1 = np.empty(0)
+        self._last_vix = np.nan
+
+    def get_state(self) -> dict:
+        """JSON-serializable engine state (for resuming a live run)."""
+        return {"close": self._close.tolist(), "ret1": self._ret1.tolist(),
+                "last_vix": None if np.isnan(self._last_vix) else float(self._last_vix)}
+
+    def set_state(self, state: dict):
+        self._close = np.asarray(state["close"], dtype=np.float64)
+        self._ret1 = np.asarray(state["ret1"], dtype=np.float64)
+        self._last_vix = np.nan if state.get("last_vix") is None else float(state["last_vix"])
+        return self
+
+    def update(self, bars: pd.DataFrame) -> pd.DataFrame:
+        df = bars.copy()
+        # standardize all column names to lowercase once
+        df.columns = [c.lower() for c in df.columns]
 
-    # drop only the rows that are invalid for *core* features
-    must_have = ["ret1", "ret2", "ret5", "ret10", "vol5", "vol10", "vol20"]
-    df = df.dropna(subset=[c for c in must_have if c in df.columns])
+        if "close" not in df.columns:
+            raise ValueError("Expected a 'close' column in the input DataFrame.")
 
-    return df
\ No newline at end of file
+        n = len(df)
+        last_close = self._close[-1] if len(self._close) else np.nan
+        close = np.concatenate([self._close, _ffill(df["close"].to_numpy(dtype=np.float64), last_close)])
+
+        # base returns/vol
+        ret1 = np.concatenate([self._ret1, _pct(close, 1, n)])
+        feats = {"ret1": ret1[len(ret1) - n:]}
+        for k in WINDOWS:
+            feats[f"ret{k}"] = _pct(close, k, n)
+            feats[f"vol{k}"] = _rolling_std(ret1, k, n)
+
+        # vix change (if present)
+        if "vix" in df.columns:
+            vix = np.concatenate([[self._last_vix], _ffill(df["vix"].to_numpy(dtype=np.float64), self._last_vix)])
+            feats["vix_chg"] = _pct(vix, 1, n)
+            self._last_vix = vix[-1]
+        else:
+            feats["vix_chg"] = np.full(n, np.nan)  # keep pipeline working even without vix
+
+        # term spread (10y - 3m) if both present
+        if "dgs10" in df.columns and "dgs3mo" in df.columns:
+            feats["term_spread"] = (df["dgs10"] - df["dgs3mo"]).to_numpy()
+        else:
+            feats["term_spread"] = np.full(n, np.nan)
+
+        self._close = close[-_STATE:]
+        self._ret1 = ret1[-_STATE:]
+
+        for col, vals in feats.items():
+            df[col] = vals
+
+        # drop only the rows that are invalid for *core* features
+        return df.dropna(subset=[c for c in MUST_HAVE if c in df.columns])
+
+FEATURES = ["ret1"] + [f"{kind}{k}" for k in WINDOWS for kind in ("ret", "vol")] + ["vix_chg", "term_spread"]
+
+def add_time_features(df: pd.DataFrame, chunk_rows: int | None = None, dtype=None) -> pd.DataFrame:
+    """Time features for a full history (windows are in bars, at any bar size).
+
+    `chunk_rows` feeds the engine that many bars at a time, which bounds the working
+    memory on long intraday histories without changing any value; `dtype` (e.g.
+    np.float32) is applied to the feature columns for compact storage.
+    """
+    eng = TimeFeatureEngine()
+    if chunk_rows is None or len(df) <= chunk_rows:
+        out = eng.update(df)
+    else:
+        out = pd.concat([eng.update(df.iloc[i:i + chunk_rows]) for i in range(0, len(df), chunk_rows)])
+    if dtype is not None:
+        out = out.astype({c: dtype for c in FEATURES if c in out.columns})
+    return out
@@ -0,0 +1,436 @@
+# src/live/runner.py
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.backtest.backtest import positions_array
+from src.data.bars import is_intraday
+from src.data.build_dataset import INTRADAY_TEXT_MAX_AGE
+from src.features.registry import REGISTRY, compute_features
+from src.features.ts_features import FEATURES as ENGINE_FEATURES, TimeFeatureEngine
+from src.tracing import span
+
+# Event-driven live scoring. Each completed bar goes through the same steps as the batch
+# pipeline, but incrementally:
+#   features  TimeFeatureEngine continues from saved state (registry features, if the
+#             model uses them, come from a trailing buffer of featured bars)
+#   text      headlines are scored as they arrive and folded into running per-day sums,
+#             giving the build_headline_features columns (neutral fill as in build_fusion)
+#   score     the saved fused model (train_baseline --model-out) on one feature row
+#   size      make_positions rules (binary/prob, threshold, band, prob_scale) from the
+#             model's metadata
+#   curve     one pnl_curve step: the new target is held from the next bar, cost on turnover
+# After each bar the signal/curve row is appended to <state_dir>/live_curve.csv and all
+# state (engine, text days, curve, source offsets) is written atomically to state.json, so a
+# restarted runner resumes where it stopped. The saved offsets are those of the last
+# processed event (not how far the source has read ahead), and on resume curve rows past
+# the saved last_date (appended just before a crash) are dropped, since those bars are
+# replayed. Per-stage latencies go to metrics.json.
+
+TEXT_COLS = ["finbert_neg", "finbert_neu", "finbert_pos", "finbert_pos_max", "finbert_neg_max",
+             "finbert_disp", "finbert_count"]
+TEXT_NEUTRAL = {"finbert_neg": 1/3, "finbert_neu": 1/3, "finbert_pos": 1/3, "finbert_pos_max": 1/3,
+                "finbert_neg_max": 1/3, "finbert_disp": 0.0, "finbert_count": 0}
+CURVE_COLS = ["date", "close", "ret1", "p", "pos_target", "pos", "turnover", "cost", "strategy_ret",
+              "strategy_ret_net", "equity", "equity_gross", "drawdown"]
+STAGES = ["parse", "features", "text", "score", "size", "curve", "write", "bar_to_signal", "persist", "headlines"]
+
+class LatencyMetrics:
+    """Rolling per-stage latencies (last `window` observations per stage), in milliseconds."""
+
+    def __init__(self, window: int = 2000):
+        self.samples = {s: deque(maxlen=window) for s in STAGES}
+        self.counts = dict.fromkeys(STAGES, 0)
+
+    def record(self, stage: str, seconds: float):
+        self.samples.setdefault(stage, deque(maxlen=2000)).append(seconds * 1000.0)
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        t0 = time.perf_counter()
+        with span(f"live.{name}", **args):
+            yield
+        self.record(name, time.perf_counter() - t0)
+
+    def summary(self) -> dict:
+        out = {}
+        for s, d in self.samples.items():
+            if not d:
+                continue
+            x = np.fromiter(d, dtype=np.float64)
+            out[s] = {"count": self.counts[s], "last_ms": float(x[-1]), "mean_ms": float(x.mean()),
+                      "p50_ms": float(np.percentile(x, 50)), "p95_ms": float(np.percentile(x, 95)),
+                      "max_ms": float(x.max())}
+        return out
+
+class DailyText:
+    """Running headline aggregates per day; features() reproduces build_headline_features."""
+
+    def __init__(self, max_per_day: int = 50, keep_days: int = 10):
+        self.max_per_day = max_per_day
+        self.keep_days = keep_days
+        # day -> [count, sum_neg, sum_neu, sum_pos, max_pos, max_neg, sum(pos-neg), sum((pos-neg)^2)]
+        self.days: dict[str, list[float]] = {}
+
+    def add(self, days: list[pd.Timestamp], probs: np.ndarray):
+        probs = np.asarray(probs, dtype=np.float64)
+        for day, (neg, neu, pos) in zip(days, probs):
+            key = str(pd.Timestamp(day).normalize().date())
+            a = self.days.setdefault(key, [0, 0.0, 0.0, 0.0, -np.inf, -np.inf, 0.0, 0.0])
+            if a[0] >= self.max_per_day:
+                continue
+            s = pos - neg
+            a[0] += 1
+            a[1] += neg; a[2] += neu; a[3] += pos
+            a[4] = max(a[4], pos); a[5] = max(a[5], neg)
+            a[6] += s; a[7] += s * s
+        if len(self.days) > self.keep_days:
+            for key in sorted(self.days)[:-self.keep_days]:
+                del self.days[key]
+
+    def features(self, ts: pd.Timestamp, intraday: bool = False) -> dict:
+        """Daily bars: the bar's own day. Intraday: the latest earlier day within
+        INTRADAY_TEXT_MAX_AGE (as build_fusion)."""
+        day = pd.Timestamp(ts).normalize()
+        if intraday:
+            keys = [k for k in self.days if day - INTRADAY_TEXT_MAX_AGE <= pd.Timestamp(k) < day]
+            key = max(keys) if keys else None
+        else:
+            key = str(day.date())
+        a = self.days.get(key) if key else None
+        if not a or not a[0]:
+            return dict(TEXT_NEUTRAL)
+        n = a[0]
+        var = (a[7] - a[6] * a[6] / n) / max(n - 1, 1)
+        return {"finbert_neg": a[1] / n, "finbert_neu": a[2] / n, "finbert_pos": a[3] / n,
+                "finbert_pos_max": a[4], "finbert_neg_max": a[5],
+                "finbert_disp": float(np.sqrt(max(var, 0.0))) if n > 1 else 0.0, "finbert_count": n}
+
+    def state(self) -> dict:
+        return self.days
+
+    def restore(self, state: dict):
+        self.days = {k: list(v) for k, v in state.items()}
+
+class LiveCurve:
+    """pnl_curve one bar at a time: pos[t] = target[t-1], cost = |pos[t] - pos[t-1]| * bps."""
+
+    def __init__(self, cost_bps: float = 1.0):
+        self.cost_bps = cost_bps
+        self.last_close = np.nan
+        self.target = 0.0   # decided on the last bar, held over the next one
+        self.held = 0.0
+        self.equity = self.equity_gross = self.peak = 1.0
+
+    def step(self, date, close: float, p: float, pos_target: float) -> dict:
+        ret1 = close / self.last_close - 1.0 if np.isfinite(self.last_close) else np.nan
+        pos = self.target
+        turnover = abs(pos - self.held)
+        cost = turnover * (self.cost_bps / 10000.0)
+        gross = pos * ret1
+        net = gross - cost
+        self.equity *= 1.0 + (0.0 if np.isnan(net) else net)
+        self.equity_gross *= 1.0 + (0.0 if np.isnan(gross) else gross)
+        self.peak = max(self.peak, self.equity)
+        self.last_close, self.held, self.target = close, pos, pos_target
+        return {"date": date, "close": close, "ret1": ret1, "p": p, "pos_target": pos_target, "pos": pos,
+                "turnover": turnover, "cost": cost, "strategy_ret": gross, "strategy_ret_net": net,
+                "equity": self.equity, "equity_gross": self.equity_gross,
+                "drawdown": self.equity / self.peak - 1.0}
+
+    def state(self) -> dict:
+        return {k: getattr(self, k) for k in ("cost_bps", "last_close", "target", "held", "equity",
+                                              "equity_gross", "peak")}
+
+    def restore(self, state: dict):
+        for k, v in state.items():
+            setattr(self, k, np.nan if v is None else v)
+
+def _write_json(path: Path, obj):
+    """Atomic replace so a crash never leaves a half-written file (NaN stays NaN, as json reads it)."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(obj, default=_jsonable))
+    os.replace(tmp, path)
+
+def _jsonable(x):
+    if isinstance(x, (np.floating, np.integer)):
+        return x.item()
+    if isinstance(x, pd.Timestamp):
+        return x.isoformat()
+    raise TypeError(f"not JSON serializable: {type(x)}")
+
+class LiveRunner:
+    """Scores bars from a source with a saved model; see the module comment for the steps.
+
+    `meta` is the model's sidecar (load_model): feature order, sizing rules, cost_bps,
+    interval and text_mode. `scorer(texts) -> (n, 3) [neg, neu, pos]` scores headlines (default
+    FinBERT, loaded on the first headline); pass scorer=None with text=False to run without text.
+    Live text features are per-headline aggregates, so a model trained on day-mode text
+    (build_text_features --mode day) is refused unless text=False.
+    """
+
+    def __init__(self, model, meta: dict, state_dir="data/live", scorer="finbert", text: bool = True,
+                 metrics: LatencyMetrics | None = None, metrics_every: float = 1.0):
+        self.model = model
+        self.feats = list(meta["features"])
+        self.meta = meta
+        self.interval = meta.get("interval", "1d")
+        self.intraday = is_intraday(self.interval)
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.scorer = scorer
+        self.text_enabled = text
+        mode = meta.get("text_mode", "headline" if "finbert_count" in self.feats else "day")
+        if text and mode == "day" and any(f.startswith("finbert_") for f in self.feats):
+            raise ValueError("Model was trained on day-mode text features, which live headline scoring does not "
+                             "reproduce; rebuild them with build_text_features --mode headline and retrain, "
+                             "or run with text=False (--no-text)")
+        self.metrics = metrics or LatencyMetrics()
+        self.metrics_every = metrics_every
+        self._metrics_written = 0.0
+
+        self.engine = TimeFeatureEngine()
+        self.text = DailyText()
+        self.curve = LiveCurve(cost_bps=float(meta.get("cost_bps", 1.0)))
+        self.last_date: pd.Timestamp | None = None
+        self.source_state: dict | None = None
+        self.positions: dict = {}  # stream -> offset after the last processed event
+        self.bars_seen = 0
+        self.signals = 0
+
+        # registry features come from a trailing buffer of featured bars (exact for windowed
+        # kinds; ewm_vol uses ~4 spans of history instead of the whole series); names the
+        # engine already produces (ret2..vol20) keep the engine's exact values
+        self.registry = [f for f in self.feats if f in REGISTRY and f not in ENGINE_FEATURES]
+        span_ = max((REGISTRY[f]["window"] for f in self.registry), default=0)
+        self.buffer: deque | None = deque(maxlen=4 * span_ + 2) if self.registry else None
+
+    # ----- state -----
+    @property
+    def state_path(self) -> Path:
+        return self.state_dir / "state.json"
+
+    @property
+    def curve_path(self) -> Path:
+        return self.state_dir / "live_curve.csv"
+
+    def warm_up(self, history: pd.DataFrame):
+        """Feed past bars (market_raw.csv columns) through the engine without scoring them."""
+        h = history.copy()
+        h.columns = [c.lower() for c in h.columns]
+        h["date"] = pd.to_datetime(h["date"])
+        h = h.sort_values("date")
+        feat = self.engine.update(h.rename(columns={"adj close": "adj_close"}))
+        if self.buffer is not None:
+            self.buffer.extend(feat.to_dict("records"))
+        if len(h):
+            self.last_date = h["date"].iloc[-1]
+            self.curve.last_close = float(h["close"].iloc[-1])
+        return self
+
+    def save_state(self, source=None):
+        if source is not None and hasattr(source, "state"):
+            self.source_state = source.state(self.positions)
+        state = {
+            "last_date": self.last_date.isoformat() if self.last_date is not None else None,
+            "engine": self.engine.get_state(),
+            "text": self.text.state(),
+            "curve": self.curve.state(),
+            "source": self.source_state,
+            "buffer": list(self.buffer) if self.buffer is not None else None,
+            "bars_seen": self.bars_seen, "signals": self.signals,
+        }
+        _write_json(self.state_path, state)
+
+    def load_state(self, source=None) -> bool:
+        if not self.state_path.exists():
+            return False
+        s = json.loads(self.state_path.read_text())
+        self.last_date = pd.Timestamp(s["last_date"]) if s["last_date"] else None
+        self.engine.set_state(s["engine"])
+        self.text.restore(s["text"])
+        self.curve.restore(s["curve"])
+        self.source_state = s.get("source")
+        if self.buffer is not None and s.get("buffer"):
+            self.buffer.extend(s["buffer"])
+        self.bars_seen, self.signals = s.get("bars_seen", 0), s.get("signals", 0)
+        self.positions = {k: v[0] for k, v in (self.source_state or {}).items() if v}
+        if source is not None and self.source_state and hasattr(source, "restore"):
+            source.restore(self.source_state)
+        self._trim_curve()
+        return True
+
+    def _trim_curve(self):
+        """Drop curve rows after last_date: a crash between the append and save_state leaves
+        a row whose bar is replayed on resume."""
+        if not self.curve_path.exists():
+            return
+        lines = self.curve_path.read_text().splitlines(keepends=True)
+        keep = lines[:1] + [l for l in lines[1:] if self.last_date is not None
+                            and pd.Timestamp(l.split(",", 1)[0]) <= self.last_date]
+        if len(keep) < len(lines):
+            tmp = self.curve_path.with_suffix(".csv.tmp")
+            tmp.write_text("".join(keep))
+            os.replace(tmp, self.curve_path)
+
+    def _processed(self, events: list):
+        for e in events:
+            if e.pos is not None:
+                self.positions[e.pos[0]] = e.pos[1]
+
+    # ----- events -----
+    def _score_texts(self, texts: list[str]) -> np.ndarray:
+        if self.scorer == "finbert":
+            from src.nlp.finbert_features import FinbertFeaturizer
+            fe = FinbertFeaturizer(use_embeddings=False)
+            self.scorer = lambda t: fe.sa_probs_batch(t)
+        return self.scorer(texts)
+
+    def on_headlines(self, events: list) -> int:
+        """Score a batch of headline events and fold them into the daily sums.
+
+        Headlines without a date count towards the day of the last processed bar (not the wall
+        clock, so replays and resumes put them on the same day); before any bar they are dropped.
+        """
+        if not self.text_enabled:
+            return 0
+        rows = [(e.data.get("date"), str(e.data.get("headline") or "").strip()) for e in events]
+        rows = [(d if pd.notna(d) and d != "" else self.last_date, t) for d, t in rows if t]
+        rows = [(d, t) for d, t in rows if d is not None]
+        if not rows:
+            return 0
+        with self.metrics.stage("headlines", n=len(rows)):
+            days = [pd.Timestamp(d) for d, _ in rows]
+            self.text.add(days, self._score_texts([t for _, t in rows]))
+        return len(rows)
+
+    def on_bar(self, event) -> dict | None:
+        """Process one completed bar; returns the appended curve row (None if skipped)."""
+        m = self.metrics
+        with m.stage("parse"):
+            bar = {k.lower(): v for k, v in event.data.items()}
+            date = pd.Timestamp(bar.pop("date"))
+            if self.last_date is not None and date <= self.last_date:
+                return None  # already processed (replayed file or duplicate)
+            frame = pd.DataFrame({k: [pd.to_numeric(v, errors="coerce")] for k, v in bar.items()})
+            frame.insert(0, "date", [date])
+            frame = frame.rename(columns={"adj close": "adj_close"})
+        self.last_date = date
+        self.bars_seen += 1
+
+        with m.stage("features"):
+            feat = self.engine.update(frame)
+            if feat.empty:  # warm-up bar (core windows not filled yet)
+                self.curve.last_close = float(frame["close"].iloc[0])
+                return None
+            row = feat.iloc[0].to_dict()
+            if self.buffer is not None:
+                self.buffer.append(row)
+                extra = compute_features(pd.DataFrame(list(self.buffer)), names=self.registry)
+                row.update(extra.iloc[-1].to_dict())
+            if "year" in self.feats:
+                row["year"] = date.year
+        with m.stage("text"):
+            row.update(self.text.features(date, self.intraday))
+            missing = [f for f in self.feats if f not in row]
+            if missing:
+                raise KeyError(f"Live features cannot provide {missing}")
+            x = np.array([[row[f] for f in self.feats]], dtype=np.float32)
+        with m.stage("score"):
+            p = float(self.model.predict_proba(x)[0, 1])
+        with m.stage("size"):
+            pos_target = float(positions_array(
+                np.array([p]), self.meta.get("sizing", "binary"), float(self.meta.get("threshold", 0.55)),
+                float(self.meta.get("band", 0.0)), float(self.meta.get("prob_scale", 0.10)))[0])
+        with m.stage("curve"):
+            out = self.curve.step(date, float(row["close"]), p, pos_target)
+        with m.stage("write"):
+            new = not self.curve_path.exists()
+            with open(self.curve_path, "a") as f:
+                if new:
+                    f.write(",".join(CURVE_COLS) + "\n")
+                f.write(",".join("" if isinstance(out[c], float) and np.isnan(out[c]) else str(out[c])
+                                 for c in CURVE_COLS) + "\n")
+        m.record("bar_to_signal", time.perf_counter() - event.received)
+        self.signals += 1
+        return out
+
+    def write_metrics(self, force: bool = False):
+        now = time.monotonic()
+        if force or now - self._metrics_written >= self.metrics_every:
+            _write_json(self.state_dir / "metrics.json", self.metrics_payload())
+            self._metrics_written = now
+
+    def metrics_payload(self) -> dict:
+        return {"stages": self.metrics.summary(), "bars": self.bars_seen, "signals": self.signals,
+                "last_date": self.last_date.isoformat() if self.last_date is not None else None,
+                "equity": self.curve.equity, "position": self.curve.target}
+
+    async def run(self, source, on_signal=None):
+        """Consume `source` until it ends. A reader task queues events; the consumer drains
+        everything queued at once, so headlines that arrived together are scored as one batch
+        (in a worker thread) before the bars that followed them."""
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def reader():
+            try:
+                async for e in source:
+                    queue.put_nowait(e)
+            finally:
+                queue.put_nowait(done)
+
+        task = asyncio.create_task(reader())
+        try:
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                heads = []
+                for e in batch + [done]:
+                    if e is not done and e.kind == "headline":
+                        heads.append(e)
+                        continue
+                    if heads:
+                        await asyncio.to_thread(self.on_headlines, heads)
+                        self._processed(heads)
+                        heads = []
+                    if e is done:
+                        continue
+                    out = self.on_bar(e)
+                    self._processed([e])
+                    if out is not None:
+                        with self.metrics.stage("persist"):
+                            self.save_state(source)
+                        if on_signal is not None:
+                            on_signal(out)
+                    elif self.last_date is not None:
+                        self.save_state(source)
+                self.write_metrics(force=done in batch)
+                if done in batch:
+                    break
+        finally:
+            task.cancel()
+        return self
+
+async def serve_metrics(runner: LiveRunner, host: str = "127.0.0.1", port: int = 9108):
+    """Minimal HTTP endpoint: any GET returns runner.metrics_payload() as JSON."""
+
+    async def handle(reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        body = json.dumps(runner.metrics_payload(), default=_jsonable).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,129 @@
+# src/live/sources.py
+import asyncio
+import csv
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Event sources for the live runner. A source is an async iterator of Events; "headline"
+# events carry {"date", "headline"} and "bar" events a completed bar in market_raw.csv
+# columns (date, open, high, low, close, volume, vix, dgs10, dgs3mo). Within one read,
+# headlines are yielded before bars so a bar sees every headline that arrived with it.
+# Sources with a resumable position expose state()/restore(state) for the runner's
+# state file; their events carry `pos` = (stream, byte offset just past the row), so the
+# runner can persist the position of the last event it actually processed rather than
+# how far the source has read ahead.
+
+@dataclass
+class Event:
+    kind: str           # "bar" | "headline"
+    data: dict
+    received: float = field(default_factory=time.perf_counter)  # when the runner got it
+    pos: tuple | None = None  # (stream, offset) to resume after this event, if resumable
+
+class _TailedCsv:
+    """New complete rows of an append-only CSV since the last read (by byte offset)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.header: list[str] | None = None
+
+    def read(self) -> list[tuple[int, dict]]:
+        """(end offset, row) pairs; the offset is where a reader resumes after that row."""
+        if not self.path.exists():
+            return []
+        size = self.path.stat().st_size
+        if size < self.offset:  # truncated or replaced: start over
+            self.offset, self.header = 0, None
+        if size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        end = chunk.rfind(b"\n") + 1  # leave a partially written last line for the next read
+        if not end:
+            return []
+        rows, pos = [], self.offset
+        for line in chunk[:end].splitlines(keepends=True):
+            pos += len(line)
+            r = next(csv.reader([line.decode("utf-8")]), None)
+            if not r:
+                continue
+            if self.header is None:
+                self.header = [c.strip().lower() for c in r]
+                continue
+            rows.append((pos, dict(zip(self.header, r))))
+        self.offset += end
+        return rows
+
+class FileTailSource:
+    """Tails a bars CSV (and optionally a headlines CSV) that another process appends to.
+
+    Stand-in for a market-data / news feed: polls every `poll` seconds, so bar-to-signal
+    latency includes up to one poll interval of discovery delay.
+    """
+
+    def __init__(self, bars_path, headlines_path=None, poll: float = 0.05, text_col: str = "headline",
+                 stop_after_idle: float | None = None):
+        self.bars = _TailedCsv(bars_path)
+        self.headlines = _TailedCsv(headlines_path) if headlines_path else None
+        self.poll = poll
+        self.text_col = text_col
+        self.stop_after_idle = stop_after_idle  # end the stream after this long without new rows
+
+    def state(self, positions: dict | None = None) -> dict:
+        """Resume point per file. `positions` ({stream: offset} of the last processed events)
+        overrides the read-ahead offsets; streams without an entry resume from the start."""
+        def at(name, t):
+            off = t.offset if positions is None else positions.get(name, 0)
+            return [off, t.header if off else None]
+        return {"bars": at("bars", self.bars),
+                "headlines": at("headlines", self.headlines) if self.headlines else None}
+
+    def restore(self, state: dict):
+        self.bars.offset, self.bars.header = state["bars"]
+        if self.headlines and state.get("headlines"):
+            self.headlines.offset, self.headlines.header = state["headlines"]
+
+    async def __aiter__(self):
+        idle = 0.0
+        while True:
+            events = []
+            if self.headlines:
+                for off, r in self.headlines.read():
+                    text = r.get(self.text_col) or r.get("corpus_text") or r.get("text")
+                    events.append(Event("headline", {"date": r.get("date"), "headline": text},
+                                        pos=("headlines", off)))
+            events += [Event("bar", r, pos=("bars", off)) for off, r in self.bars.read()]
+            for e in events:
+                yield e
+            idle = 0.0 if events else idle + self.poll
+            if self.stop_after_idle is not None and idle >= self.stop_after_idle:
+                return
+            await asyncio.sleep(self.poll)
+
+class QueueSource:
+    """In-process feed: push bars/headlines from other coroutines, close() to end the stream."""
+
+    _END = object()
+
+    def __init__(self, maxsize: int = 0):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def put_bar(self, bar: dict):
+        await self.queue.put(Event("bar", bar))
+
+    async def put_headline(self, date, headline: str):
+        await self.queue.put(Event("headline", {"date": date, "headline": headline}))
+
+    async def close(self):
+        await self.queue.put(self._END)
+
+    async def __aiter__(self):
+        while True:
+            e = await self.queue.get()
+            if e is self._END:
+                return
+            e.received = time.perf_counter()
+            yield e
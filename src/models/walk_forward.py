@@ -1,10 +1,27 @@
+import json
+from pathlib import Path
 import numpy as np
 import pandas as pd
 from sklearn.metrics import roc_auc_score, accuracy_score
 from xgboost import XGBClassifier  # force XGBoost
+from src.data.bars import window
+from src.tracing import span, traced
 
 TIME_EXCLUDE = {"date","y","open","high","low","close","adj close","adj_close","volume"}
 
+XGB_PARAMS = dict(
+    n_estimators=120,          # ↓ fewer trees
+    max_depth=4,               # ↓ shallower trees
+    learning_rate=0.08,
+    subsample=0.9,
+    colsample_bytree=0.6,
+    reg_lambda=1.0,
+    n_jobs=-1,                 # use all CPU cores
+    tree_method="hist",        # fast
+    eval_metric="logloss",
+    random_state=42,
+)
+
 def feature_cols(df: pd.DataFrame, include_text: bool = True) -> list[str]:
     cols = []
     for c in df.columns:
@@ -19,34 +36,50 @@ def feature_cols(df: pd.DataFrame, include_text: bool = True) -> list[str]:
         cols.append(c)
     return cols
 
+@traced()
 def walk_forward(df: pd.DataFrame, start_idx: int = 252, step: int = 5, include_text: bool = True,
-                 xgb_params: dict | None = None) -> pd.DataFrame:
-    """Expanding-window walk-forward. Refit every `step` days."""
+                 xgb_params: dict | None = None, emb: np.ndarray | None = None,
+                 interval: str = "1d") -> pd.DataFrame:
+    """Expanding-window walk-forward. Refit every `step` days.
+
+    `start_idx` (warm-up before the first fit) and `step` are trading days; for intraday
+    `interval`s they are converted to bar counts, so the number of refits does not grow
+    with the bar size. `emb` is an optional (len(df), dim) text-embedding matrix aligned to `df` rows
+    (e.g. EmbeddingStore.align(df["date"])); it is appended to the text features. Features and
+    embeddings are written once into one preallocated float32 buffer and every refit trains on a
+    row slice of it (a view), so neither is concatenated or copied per fit.
+    """
     if xgb_params is None:
-        xgb_params = dict(
-            n_estimators=120,          # ↓ fewer trees
-            max_depth=4,               # ↓ shallower trees
-            learning_rate=0.08,
-            subsample=0.9,
-            colsample_bytree=0.6,
-            reg_lambda=1.0,
-            n_jobs=-1,                 # use all CPU cores
-            tree_method="hist",        # fast
-            eval_metric="logloss",
-            random_state=42,
-        )
+        xgb_params = XGB_PARAMS
 
+    start_idx, step = window(start_idx, interval), window(step, interval)
     feats = feature_cols(df, include_text=include_text)
     preds, ys, dates = [], [], []
     n = len(df)
+    X_all = None
+    if emb is not None and include_text:
+        if len(emb) != n:
+            raise ValueError(f"emb has {len(emb)} rows, expected {n}")
+        X_all = np.empty((n, len(feats) + emb.shape[1]), dtype=np.float32)
+        for j, c in enumerate(feats):
+            X_all[:, j] = df[c].to_numpy()
+        X_all[:, len(feats):] = emb  # one pass over the (memory-mapped) store rows
 
     for i in range(start_idx, n-1, step):
         train = df.iloc[:i]
-        test  = df.iloc[i:i+step]  # predict the next `step` days at once
+        test  = df.iloc[i:i+step]  # predict the next `step` bars at once
 
         model = XGBClassifier(**xgb_params)
-        model.fit(train[feats], train["y"])
-        p = model.predict_proba(test[feats])[:,1]
+        if X_all is None:
+            with span("walk_forward.fit", rows=i):
+                model.fit(train[feats], train["y"])
+            with span("walk_forward.predict"):
+                p = model.predict_proba(test[feats])[:,1]
+        else:
+            with span("walk_forward.fit", rows=i):
+                model.fit(X_all[:i], train["y"])
+            with span("walk_forward.predict"):
+                p = model.predict_proba(X_all[i:i+step])[:,1]
 
         preds.extend(p.tolist())
         ys.extend(test["y"].tolist())
@@ -54,7 +87,8 @@ def walk_forward(df: pd.DataFrame, start_idx: int = 252, step: int = 5, include_
 
         # progress ping every ~50 refits
         if ((i - start_idx) // step) % 50 == 0:
-            print(f"[walk_forward] {i-start_idx:4d}/{n-start_idx} rows processed | feats={len(feats)}")
+            n_feats = len(feats) if X_all is None else X_all.shape[1]
+            print(f"[walk_forward] {i-start_idx:4d}/{n-start_idx} rows processed | feats={n_feats}")
 
     out = pd.DataFrame({"date":dates, "y":ys, "p":preds})
     threshold = 0.55
@@ -87,3 +121,28 @@ def walk_forward(df: pd.DataFrame, start_idx: int = 252, step: int = 5, include_
         "FN": fn,
     }
     return out
+
+@traced()
+def fit_final(df: pd.DataFrame, include_text: bool = True, xgb_params: dict | None = None) -> tuple[XGBClassifier, list[str]]:
+    """One model on every labelled row (what a live run scores with) and its feature order."""
+    feats = feature_cols(df, include_text=include_text)
+    model = XGBClassifier(**(xgb_params or XGB_PARAMS))
+    with span("walk_forward.fit", rows=len(df)):
+        model.fit(df[feats], df["y"])
+    return model, feats
+
+def _meta_path(path) -> Path:
+    return Path(path).with_suffix(".meta.json")
+
+def save_model(model: XGBClassifier, feats: list[str], path, **meta):
+    """Write the booster as XGBoost JSON plus <stem>.meta.json (feature order and `meta`,
+    e.g. sizing rules and bar interval)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    model.save_model(str(path))
+    _meta_path(path).write_text(json.dumps({"features": list(feats), **meta}, indent=2, default=str))
+
+def load_model(path) -> tuple[XGBClassifier, dict]:
+    model = XGBClassifier()
+    model.load_model(str(path))
+    return model, json.loads(_meta_path(path).read_text())
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoModel
+from src.tracing import span, traced
 
 os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 
@@ -21,16 +22,19 @@ def _chunk_by_length(text: str, max_chars: int = 1000):
     return [t[i:i+max_chars] for i in range(0, len(t), max_chars)]
 
 class FinbertFeaturizer:
-    def __init__(self, use_embeddings: bool = False):
+    def __init__(self, use_embeddings: bool = False, sa_name: str = "yiyanghkust/finbert-tone",
+                 emb_name: str = "ProsusAI/finbert"):
         self.device = _device()
-        self.sa_name = "yiyanghkust/finbert-tone"
-        self.sa_tok = AutoTokenizer.from_pretrained(self.sa_name)
-        self.sa_model = AutoModelForSequenceClassification.from_pretrained(self.sa_name).to(self.device).eval()
+        self.sa_name = sa_name
+        with span("finbert.load", model=sa_name):
+            self.sa_tok = AutoTokenizer.from_pretrained(self.sa_name)
+            self.sa_model = AutoModelForSequenceClassification.from_pretrained(self.sa_name).to(self.device).eval()
         self.use_embeddings = use_embeddings
         if use_embeddings:
-            self.emb_name = "ProsusAI/finbert"
-            self.emb_tok = AutoTokenizer.from_pretrained(self.emb_name)
-            self.emb_model = AutoModel.from_pretrained(self.emb_name).to(self.device).eval()
+            self.emb_name = emb_name
+            with span("finbert.load", model=emb_name):
+                self.emb_tok = AutoTokenizer.from_pretrained(self.emb_name)
+                self.emb_model = AutoModel.from_pretrained(self.emb_name).to(self.device).eval()
             self.emb_dim = self.emb_model.config.hidden_size
         else:
             self.emb_model = None
@@ -40,8 +44,10 @@ class FinbertFeaturizer:
     def _sa_probs(self, text: str, max_length: int = 256):
         if not text:
             return np.array([1/3, 1/3, 1/3], dtype=np.float32)
-        inputs = self.sa_tok(text, return_tensors="pt", truncation=True, max_length=max_length).to(self.device)
-        logits = self.sa_model(**inputs).logits
+        with span("finbert.tokenize"):
+            inputs = self.sa_tok(text, return_tensors="pt", truncation=True, max_length=max_length).to(self.device)
+        with span("finbert.forward"):
+            logits = self.sa_model(**inputs).logits
         probs = torch.softmax(logits, dim=-1).detach().cpu().numpy()[0]
         return probs.astype(np.float32)
 
@@ -51,12 +57,31 @@ class FinbertFeaturizer:
             return np.zeros(0, dtype=np.float32)
         if not text:
             return np.zeros(self.emb_dim, dtype=np.float32)
-        inputs = self.emb_tok(text, return_tensors="pt", truncation=True, max_length=max_length).to(self.device)
-        last = self.emb_model(**inputs).last_hidden_state
+        with span("finbert.tokenize"):
+            inputs = self.emb_tok(text, return_tensors="pt", truncation=True, max_length=max_length).to(self.device)
+        with span("finbert.forward_embed"):
+            last = self.emb_model(**inputs).last_hidden_state
         vec = last.mean(dim=1).detach().cpu().numpy()[0]
         return vec.astype(np.float32)
 
-    def featurize_row(self, date, text: str):
+    @torch.no_grad()
+    def sa_probs_batch(self, texts: list[str], batch_size: int = 64, max_length: int = 64) -> np.ndarray:
+        """Score many short texts; returns an (n, 3) float32 array of [neg, neu, pos]."""
+        out = np.full((len(texts), 3), 1/3, dtype=np.float32)
+        # length-sorted batches keep padding (and wasted compute) to a minimum
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        for s in range(0, len(order), batch_size):
+            idx = order[s:s+batch_size]
+            with span("finbert.tokenize", batch=len(idx)):
+                inputs = self.sa_tok([texts[i] for i in idx], return_tensors="pt", padding=True,
+                                     truncation=True, max_length=max_length).to(self.device)
+            with span("finbert.forward", batch=len(idx), seq=int(inputs["input_ids"].shape[1])):
+                logits = self.sa_model(**inputs).logits
+            out[idx] = torch.softmax(logits, dim=-1).detach().cpu().numpy().astype(np.float32)
+        return out
+
+    def featurize_text(self, text: str):
+        """Return (sa_probs, embedding) for one day of text; embedding is empty without embeddings."""
         chunks = _chunk_by_length(text, max_chars=1000)
         if not chunks:
             sa = np.array([1/3, 1/3, 1/3], dtype=np.float32)
@@ -70,6 +95,10 @@ class FinbertFeaturizer:
             sa = np.stack(sa_list, axis=0).mean(axis=0) if sa_list else np.array([1/3,1/3,1/3], dtype=np.float32)
             emb = (np.stack(emb_list, axis=0).mean(axis=0) if (self.use_embeddings and emb_list) else
                    (np.zeros(self.emb_dim, dtype=np.float32) if self.use_embeddings else np.zeros(0, dtype=np.float32)))
+        return sa, emb
+
+    def featurize_row(self, date, text: str):
+        sa, emb = self.featurize_text(text)
         out = {
             "date": pd.to_datetime(date).normalize(),
             "finbert_neg": float(sa[0]),
@@ -81,10 +110,74 @@ class FinbertFeaturizer:
                 out[f"emb_{i}"] = float(v)
         return out
 
-def build_finbert_features(df_text: pd.DataFrame, date_col: str = "date", text_col: str = "corpus_text", use_embeddings: bool = False) -> pd.DataFrame:
+@traced()
+def build_finbert_features(df_text: pd.DataFrame, date_col: str = "date", text_col: str = "corpus_text", use_embeddings: bool = False,
+                           emb_out: str | None = None) -> pd.DataFrame:
+    """Daily FinBERT features.
+
+    With `use_embeddings` and `emb_out`, pooled embeddings go to a float32 matrix at
+    `emb_out` (see src.data.embedding_store) and the frame keeps only sentiment columns;
+    without `emb_out` they are returned as emb_0..emb_N columns as before.
+    """
     df_text = df_text.copy()
     df_text[date_col] = pd.to_datetime(df_text[date_col]).dt.normalize()
     agg = df_text.groupby(date_col)[text_col].apply(lambda s: "\n".join([str(x) for x in s if isinstance(x, str)])).reset_index()
     fe = FinbertFeaturizer(use_embeddings=use_embeddings)
-    rows = [fe.featurize_row(row[date_col], row[text_col]) for _, row in agg.iterrows()]
-    return pd.DataFrame(rows).sort_values("date").reset_index(drop=True)
+    if not (use_embeddings and emb_out):
+        rows = [fe.featurize_row(row[date_col], row[text_col]) for _, row in agg.iterrows()]
+        return pd.DataFrame(rows).sort_values("date").reset_index(drop=True)
+
+    from src.data.embedding_store import save_embeddings
+    dates = pd.to_datetime(agg[date_col]).dt.normalize()
+    sa = np.empty((len(agg), 3), dtype=np.float32)
+    emb = np.empty((len(agg), fe.emb_dim), dtype=np.float32)
+    for i, text in enumerate(agg[text_col].tolist()):
+        sa[i], emb[i] = fe.featurize_text(text)
+    save_embeddings(dates, emb, prefix=emb_out)
+    out = pd.DataFrame({"date": dates, "finbert_neg": sa[:, 0], "finbert_neu": sa[:, 1], "finbert_pos": sa[:, 2]})
+    return out.sort_values("date").reset_index(drop=True)
+
+@traced()
+def build_headline_features(df_text: pd.DataFrame, date_col: str = "date", text_col: str = "corpus_text",
+                            max_per_day: int = 50, batch_size: int = 64, max_length: int = 64,
+                            featurizer: FinbertFeaturizer | None = None) -> pd.DataFrame:
+    """Score each headline on its own, then reduce to daily features.
+
+    Columns: `date_col`, finbert_neg/neu/pos (daily means, same meaning as the concatenated mode),
+    finbert_pos_max, finbert_neg_max, finbert_disp (std of pos-neg across headlines)
+    and finbert_count.
+    """
+    df = df_text[[date_col, text_col]].copy()
+    df[date_col] = pd.to_datetime(df[date_col]).dt.normalize()
+    df = df[df[text_col].map(lambda x: isinstance(x, str) and bool(x.strip()))]
+    df = df.sort_values(date_col, kind="stable").groupby(date_col).head(max_per_day).reset_index(drop=True)
+    cols = [date_col, "finbert_neg", "finbert_neu", "finbert_pos",
+            "finbert_pos_max", "finbert_neg_max", "finbert_disp", "finbert_count"]
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+
+    fe = featurizer or FinbertFeaturizer(use_embeddings=False)
+    probs = fe.sa_probs_batch(df[text_col].str.strip().tolist(), batch_size=batch_size, max_length=max_length)
+
+    # rows are date-sorted, so each day is a contiguous block -> reduceat over block starts
+    codes, days = pd.factorize(df[date_col], sort=True)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    count = np.diff(np.r_[starts, len(codes)]).astype(np.float64)
+    sums = np.add.reduceat(probs.astype(np.float64), starts, axis=0)
+    mean = sums / count[:, None]
+    score = probs[:, 2].astype(np.float64) - probs[:, 0]
+    s1 = np.add.reduceat(score, starts)
+    s2 = np.add.reduceat(score * score, starts)
+    var = (s2 - s1 * s1 / count) / np.maximum(count - 1, 1)
+    disp = np.where(count > 1, np.sqrt(np.clip(var, 0.0, None)), 0.0)
+
+    return pd.DataFrame({
+        date_col: days,
+        "finbert_neg": mean[:, 0].astype(np.float32),
+        "finbert_neu": mean[:, 1].astype(np.float32),
+        "finbert_pos": mean[:, 2].astype(np.float32),
+        "finbert_pos_max": np.maximum.reduceat(probs[:, 2], starts),
+        "finbert_neg_max": np.maximum.reduceat(probs[:, 0], starts),
+        "finbert_disp": disp.astype(np.float32),
+        "finbert_count": count.astype(np.int32),
+    })
@@ -0,0 +1,92 @@
+import re
+import zlib
+from collections import deque
+import numpy as np
+import pandas as pd
+
+_PRIME = (1 << 31) - 1  # Mersenne prime; a * h stays below 2**62, so uint64 never overflows
+# trailing wire/source tags: "... - Reuters", "... | CNBC", "... (AP)"
+_source_tag = re.compile(r"\s*(?:[-|–—]\s*[\w .&']{2,30}|\([\w .&']{2,30}\))\s*$")
+_non_word = re.compile(r"[^a-z0-9 ]+")
+_spaces = re.compile(r"\s+")
+
+def normalize_for_dedupe(s: str) -> str:
+    if not isinstance(s, str):
+        return ""
+    s = _source_tag.sub("", s.strip())
+    s = _non_word.sub(" ", s.lower())
+    return _spaces.sub(" ", s).strip()
+
+def _shingles(s: str, k: int = 5) -> np.ndarray:
+    if len(s) <= k:
+        grams = {s} if s else set()
+    else:
+        grams = {s[i:i+k] for i in range(len(s) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode()) % _PRIME for g in grams), dtype=np.uint64, count=len(grams))
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, text: str, k: int = 5) -> np.ndarray | None:
+        h = _shingles(normalize_for_dedupe(text), k=k)
+        if not len(h):
+            return None
+        return ((self.a[:, None] * h[None, :] + self.b[:, None]) % _PRIME).min(axis=1)
+
+def near_duplicate_mask(dates: pd.Series, texts: pd.Series, threshold: float = 0.8, window_days: int = 1,
+                        num_perm: int = 64, bands: int = 16) -> np.ndarray:
+    """Boolean keep-mask; a row is dropped if it near-duplicates an earlier kept row.
+
+    Rows must be in date order (the earliest copy wins). Candidates come from an LSH index
+    over MinHash bands; a pair is a duplicate when the estimated Jaccard similarity of their
+    character 5-gram sets is >= `threshold`. Kept rows leave the index once they fall more
+    than `window_days` behind the current row, so the scan is bounded by the window rather
+    than the corpus.
+    """
+    if num_perm % bands:
+        raise ValueError("num_perm must be divisible by bands")
+    rows = num_perm // bands
+    mh = MinHasher(num_perm=num_perm)
+    day = pd.to_datetime(dates).to_numpy().astype("datetime64[D]").astype(np.int64)
+    if len(day) > 1 and (np.diff(day) < 0).any():
+        raise ValueError("near_duplicate_mask expects rows sorted by date")
+    keep = np.ones(len(texts), dtype=bool)
+    index: dict[tuple, deque] = {}  # (band, band-signature bytes) -> kept row ids, oldest first
+    live = deque()                  # kept row ids still in the index, oldest first
+    sigs, row_keys = {}, {}
+    for i, text in enumerate(texts.tolist()):
+        # evict kept rows older than the window; each is the leftmost id of all its buckets
+        while live and day[live[0]] < day[i] - window_days:
+            j = live.popleft()
+            for key in row_keys.pop(j):
+                bucket = index[key]
+                bucket.popleft()
+                if not bucket:
+                    del index[key]
+            del sigs[j]
+        sig = mh.signature(text)
+        if sig is None:
+            continue
+        keys = [(b, sig[b*rows:(b+1)*rows].tobytes()) for b in range(bands)]
+        seen = set()
+        for key in keys:
+            for j in index.get(key, ()):
+                if j in seen:
+                    continue
+                seen.add(j)
+                if np.mean(sigs[j] == sig) >= threshold:
+                    keep[i] = False
+                    break
+            if not keep[i]:
+                break
+        if keep[i]:
+            sigs[i] = sig
+            row_keys[i] = keys
+            live.append(i)
+            for key in keys:
+                index.setdefault(key, deque()).append(i)
+    return keep
@@ -0,0 +1,218 @@
+# src/pipeline/dag.py
+import fnmatch
+import glob
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable
+from src.data.feature_store import hash_file
+from src.tracing import span
+
+def _expand(paths) -> list[Path]:
+    """Files named by `paths`: globs are expanded and directories walked recursively."""
+    files = []
+    for p in paths:
+        for m in sorted(glob.glob(str(p))):
+            mp = Path(m)
+            if mp.is_dir():
+                files.extend(sorted(f for f in mp.rglob("*") if f.is_file()))
+            elif mp.is_file():
+                files.append(mp)
+    return files
+
+def _stat(f: Path) -> list[int]:
+    st = f.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+class Stage:
+    """One pipeline step: a `python -m <module> <args>` run with declared file inputs/outputs.
+
+    `inputs`/`outputs` may be files, directories or globs. Upstream stages are the ones whose
+    outputs overlap this stage's inputs, plus any named in `after`. `args` may be a callable
+    so globs can be expanded when the stage actually runs. Stages without file inputs (remote
+    fetches) are considered fresh for `refresh_hours` after their last successful run.
+    """
+
+    def __init__(self, name: str, module: str, args: list[str] | Callable[[], list[str]] = (),
+                 inputs=(), outputs=(), after=(), refresh_hours: float | None = None):
+        self.name = name
+        self.module = module
+        self.args = args
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+        self.refresh_hours = refresh_hours
+
+    def argv(self) -> list[str]:
+        args = self.args() if callable(self.args) else list(self.args)
+        return [sys.executable, "-m", self.module, *args]
+
+class Pipeline:
+    """Run stages in dependency order, skipping up-to-date ones and overlapping independent ones.
+
+    A stage is skipped when the content hash of its inputs and its command line match the last
+    successful run and its outputs are untouched since (same size and mtime). An output that a
+    downstream stage also declares (rewritten later in the run, e.g. a shared summary file) only
+    has to exist. Each stage runs as a subprocess with output captured to <state_dir>/logs/<stage>.log.
+    """
+
+    def __init__(self, stages: list[Stage], state_dir: str = "data/cache/pipeline", workers: int = 2):
+        self.stages = {s.name: s for s in stages}
+        self.state_dir = Path(state_dir)
+        self.workers = workers
+        self.deps = self._deps()
+        self.shared = self._shared_outputs()
+
+    def _deps(self) -> dict[str, set[str]]:
+        produced = {}
+        for s in self.stages.values():
+            for o in s.outputs:
+                produced[str(Path(o))] = s.name
+        deps = {}
+        for s in self.stages.values():
+            d = set(s.after)
+            for i in s.inputs:
+                for out, owner in produced.items():
+                    # an input matches an output exactly, by glob, or one lies inside the other
+                    i = str(Path(i))
+                    if owner != s.name and (out == i or fnmatch.fnmatch(out, i) or
+                                            out.startswith(i + "/") or i.startswith(out + "/")):
+                        d.add(owner)
+            unknown = d - set(self.stages)
+            if unknown:
+                raise ValueError(f"Stage {s.name!r} depends on unknown stages {sorted(unknown)}")
+            deps[s.name] = d
+        order, seen = [], {}
+
+        def visit(n):
+            if seen.get(n) == 1:
+                raise ValueError(f"Cycle in pipeline at stage {n!r}")
+            if seen.get(n) == 2:
+                return
+            seen[n] = 1
+            for m in deps[n]:
+                visit(m)
+            seen[n] = 2
+            order.append(n)
+
+        for n in self.stages:
+            visit(n)
+        self.order = order
+        return deps
+
+    def _shared_outputs(self) -> dict[str, set[str]]:
+        """Per stage, the outputs a (transitive) downstream stage declares too."""
+        below = {n: set() for n in self.stages}
+        for n in reversed(self.order):  # dependents come later in topological order
+            for d in self.deps[n]:
+                below[d] |= {n} | below[n]
+        return {n: {o for o in s.outputs if any(o in self.stages[m].outputs for m in below[n])}
+                for n, s in self.stages.items()}
+
+    def _stats(self, s: Stage) -> dict[str, list[int]]:
+        return {str(f): _stat(f) for f in _expand([o for o in s.outputs if o not in self.shared[s.name]])}
+
+    def _key(self, s: Stage) -> str:
+        h = hashlib.sha1(json.dumps(s.argv()[1:]).encode())
+        for f in _expand(s.inputs):
+            h.update(str(f).encode())
+            h.update(hash_file(f).encode())
+        return h.hexdigest()
+
+    def _state_path(self, s: Stage) -> Path:
+        return self.state_dir / f"{s.name}.json"
+
+    def fresh(self, s: Stage) -> bool:
+        sp = self._state_path(s)
+        if not sp.exists() or not s.outputs:
+            return False
+        rec = json.loads(sp.read_text())
+        if not all(glob.glob(str(o)) for o in s.outputs):
+            return False
+        if rec.get("files") != self._stats(s):
+            return False
+        if not s.inputs and s.refresh_hours is not None:
+            return time.time() - rec.get("finished", 0) < s.refresh_hours * 3600
+        return bool(s.inputs) and rec.get("key") == self._key(s)
+
+    def _run(self, s: Stage) -> tuple[int, float, Path]:
+        log = self.state_dir / "logs" / f"{s.name}.log"
+        log.parent.mkdir(parents=True, exist_ok=True)
+        t0 = time.perf_counter()
+        with open(log, "w") as fh, span(f"pipeline.{s.name}"):
+            rc = subprocess.run(s.argv(), stdout=fh, stderr=subprocess.STDOUT).returncode
+        return rc, time.perf_counter() - t0, log
+
+    def run(self, force=(), only=None, dry_run: bool = False) -> dict[str, dict]:
+        """Run the pipeline; returns {stage: {"status", "seconds"}} in topological order.
+
+        `force` names stages to re-run regardless of state ("all" for every stage); `only`
+        restricts the run to the named stages (their upstream outputs must already exist).
+        """
+        force = set(self.stages) if "all" in force else set(force)
+        selected = set(only) if only else set(self.stages)
+        report = {n: {"status": "pending", "seconds": 0.0} for n in self.order if n in selected}
+        running = {}
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+
+        def ready(n):
+            return all(report.get(d, {"status": "skipped"})["status"] in ("done", "skipped", "up-to-date", "would-run")
+                       for d in self.deps[n])
+
+        def blocked(n):
+            return any(report.get(d, {}).get("status") in ("failed", "blocked") for d in self.deps[n])
+
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            while True:
+                for n in self.order:
+                    if n not in report or report[n]["status"] != "pending" or n in running.values():
+                        continue
+                    if blocked(n):
+                        report[n]["status"] = "blocked"
+                        print(f"[pipeline] {n}: blocked by failed upstream stage")
+                        continue
+                    if not ready(n):
+                        continue
+                    s = self.stages[n]
+                    if n not in force and self.fresh(s):
+                        report[n]["status"] = "up-to-date"
+                        print(f"[pipeline] {n}: up to date, skipped")
+                        continue
+                    if dry_run:
+                        report[n]["status"] = "would-run"
+                        print(f"[pipeline] {n}: would run {' '.join(s.argv()[1:])}")
+                        continue
+                    print(f"[pipeline] {n}: running {' '.join(s.argv()[1:])}")
+                    running[ex.submit(self._run, s)] = n
+                if not running:
+                    break  # a pass in topological order resolves everything not waiting on a run
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    n = running.pop(fut)
+                    s = self.stages[n]
+                    rc, secs, log = fut.result()
+                    report[n]["seconds"] = secs
+                    if rc == 0:
+                        report[n]["status"] = "done"
+                        state = {"key": self._key(s) if s.inputs else None, "finished": time.time(),
+                                 "files": self._stats(s)}
+                        self._state_path(s).write_text(json.dumps(state))
+                        print(f"[pipeline] {n}: done in {secs:.1f}s")
+                    else:
+                        report[n]["status"] = "failed"
+                        tail = log.read_text().splitlines()[-15:]
+                        print(f"[pipeline] {n}: FAILED (exit {rc}) after {secs:.1f}s; log {log}")
+                        print("\n".join("    " + line for line in tail))
+        return report
+
+def format_report(report: dict[str, dict], wall: float | None = None) -> str:
+    lines = [f"{'stage':22s} {'status':11s} {'seconds':>9s}"]
+    for n, r in report.items():
+        lines.append(f"{n:22s} {r['status']:11s} {r['seconds']:9.2f}")
+    if wall is not None:
+        lines.append(f"{'total (wall)':22s} {'':11s} {wall:9.2f}")
+    return "\n".join(lines)
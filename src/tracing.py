@@ -0,0 +1,142 @@
+# src/tracing.py
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+# Span tracing, off unless MMH_TRACE is set:
+#   MMH_TRACE=1            -> data/cache/traces/<script>-<pid>.json
+#   MMH_TRACE=<dir>        -> <dir>/<script>-<pid>.json (one file per process; merge with scripts.trace_report)
+#   MMH_TRACE=<file>.json  -> <file>.<script>-<pid>.json next to it (pipeline stages run as
+#                             separate processes, so one shared path would keep only the last)
+# Files are Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev). Each span records
+# wall time, CPU time (process-wide) and the RSS change. A per-name summary is printed to
+# stderr at exit. When disabled, `span` returns a shared no-op context manager and
+# `traced` functions cost one flag check per call.
+
+ENV = "MMH_TRACE"
+_NOOP = nullcontext()
+_events: list[dict] = []
+_enabled = False
+_out: Path | None = None
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE
+    except OSError:  # not Linux: fall back to the high-water mark
+        import resource
+        r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return r if sys.platform == "darwin" else r * 1024
+
+class _Span:
+    __slots__ = ("name", "args", "t0", "c0", "r0", "ts")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.ts = time.time_ns() // 1000
+        self.r0 = _rss_bytes()
+        self.c0 = time.process_time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        dur = time.perf_counter() - self.t0
+        cpu = time.process_time() - self.c0
+        rss = _rss_bytes() - self.r0
+        args = dict(self.args, cpu_ms=round(cpu * 1e3, 3), rss_delta_mb=round(rss / 2**20, 3))
+        if exc[0] is not None:
+            args["error"] = exc[0].__name__
+        _events.append({"name": self.name, "cat": self.name.split(".")[0], "ph": "X", "ts": self.ts,
+                        "dur": round(dur * 1e6, 1), "pid": os.getpid(), "tid": threading.get_ident(),
+                        "args": args})
+        return False
+
+def enabled() -> bool:
+    return _enabled
+
+def span(name: str, /, **args):
+    """Context manager timing one block: `with span("walk_forward.fit", i=i): ...`."""
+    return _Span(name, args) if _enabled else _NOOP
+
+def traced(name: str | None = None):
+    """Decorator form of `span`; the span name defaults to module.function."""
+    def deco(fn):
+        module = _process_label() if fn.__module__ == "__main__" else fn.__module__.rsplit(".", 1)[-1]
+        label = name or f"{module}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*a, **k):
+            if not _enabled:
+                return fn(*a, **k)
+            with _Span(label, {}):
+                return fn(*a, **k)
+        return wrapper
+    return deco
+
+def summarize(events: list[dict]) -> list[dict]:
+    """Per span name: calls, total/mean/max wall ms, total CPU ms, summed RSS delta."""
+    rows = {}
+    for e in events:
+        r = rows.setdefault(e["name"], {"name": e["name"], "calls": 0, "wall_ms": 0.0, "max_ms": 0.0,
+                                        "cpu_ms": 0.0, "rss_mb": 0.0})
+        ms = e["dur"] / 1e3
+        r["calls"] += 1
+        r["wall_ms"] += ms
+        r["max_ms"] = max(r["max_ms"], ms)
+        r["cpu_ms"] += e["args"].get("cpu_ms", 0.0)
+        r["rss_mb"] += e["args"].get("rss_delta_mb", 0.0)
+    for r in rows.values():
+        r["mean_ms"] = r["wall_ms"] / r["calls"]
+    return sorted(rows.values(), key=lambda r: -r["wall_ms"])
+
+def format_summary(rows: list[dict]) -> str:
+    lines = [f"{'span':40s} {'calls':>6s} {'wall ms':>10s} {'mean ms':>9s} {'max ms':>9s} {'cpu ms':>10s} {'RSS +MB':>8s}"]
+    for r in rows:
+        lines.append(f"{r['name'][:40]:40s} {r['calls']:6d} {r['wall_ms']:10.1f} {r['mean_ms']:9.2f} "
+                     f"{r['max_ms']:9.1f} {r['cpu_ms']:10.1f} {r['rss_mb']:8.1f}")
+    return "\n".join(lines)
+
+def write(path=None) -> Path | None:
+    """Write the collected events as Chrome trace JSON (default: the MMH_TRACE target)."""
+    path = Path(path) if path else _out
+    if path is None or not _events:
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": _process_label()}}]
+    path.write_text(json.dumps({"traceEvents": meta + _events, "displayTimeUnit": "ms"}))
+    return path
+
+def _process_label() -> str:
+    argv0 = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+    main = sys.modules.get("__main__")
+    spec = getattr(main, "__spec__", None)
+    return spec.name.rsplit(".", 1)[-1] if spec and spec.name else argv0
+
+def _at_exit():
+    path = write()
+    if path:
+        print(f"\n[trace] {len(_events)} spans -> {path}", file=sys.stderr)
+        print(format_summary(summarize(_events)), file=sys.stderr)
+
+def enable(target: str = "1"):
+    """Turn tracing on for this process (what MMH_TRACE does at import)."""
+    global _enabled, _out
+    t = Path("data/cache/traces") if target in ("1", "true", "yes") else Path(target)
+    proc = f"{_process_label()}-{os.getpid()}"
+    _out = t.with_name(f"{t.stem}.{proc}.json") if t.suffix == ".json" else t / f"{proc}.json"
+    if not _enabled:
+        atexit.register(_at_exit)
+    _enabled = True
+
+if os.environ.get(ENV, "").strip() not in ("", "0", "false", "no"):
+    enable(os.environ[ENV].strip())
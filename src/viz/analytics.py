@@ -0,0 +1,92 @@
+# src/viz/analytics.py
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.data.bars import window
+from src.viz.downsample import drawdown_keypoints, downsample_curve
+
+# Dashboard analytics, materialized next to the artifacts by train/calibrate so the app
+# only reads and renders. Per strategy ("time_only", "fused") the bundle holds:
+#   <name>_rolling.parquet  date + hit_<w> rolling directional accuracy per standard window
+#                           (w in trading days, converted to bars for intraday runs)
+#   <name>_curve.parquet    date, equity, drawdown, key (drawdown peak/trough) and pts_<b>
+#                           (row is in the full-history downsample for a budget of b points)
+#   <name>_monthly.parquet  year x Jan..Dec net returns plus the full-year return
+# and kpis.json holds every strategy's backtest stats, fused-minus-time_only deltas and the
+# bar interval.
+
+ANALYTICS_DIR = Path("data/processed/analytics")
+WINDOWS = (21, 63, 126, 252)
+BUDGETS = (250, 500, 1000, 2000, 5000)
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+KPI_KEYS = ["Total Return (net)", "Total Return (gross)", "CAGR", "Sharpe (net)", "Max Drawdown", "Trades", "Hit-Rate"]
+
+def rolling_hit_rates(wf: pd.DataFrame, prob_col: str = "p", windows=WINDOWS, interval: str = "1d") -> pd.DataFrame:
+    """Rolling share of days where (prob > 0.5) matched y, one column per window."""
+    d = wf[["date", "y", prob_col]].sort_values("date")
+    hit = ((d[prob_col].to_numpy() > 0.5).astype(int) == d["y"].to_numpy()).astype(float)
+    hit = pd.Series(hit, index=d.index)
+    out = pd.DataFrame({"date": d["date"].to_numpy()})
+    for w in windows:
+        bars = window(w, interval)
+        out[f"hit_{w}"] = hit.rolling(bars, min_periods=bars // 2).mean().to_numpy(dtype=np.float32)
+    return out
+
+def curve_table(curve: pd.DataFrame, budgets=BUDGETS) -> pd.DataFrame:
+    """Equity/drawdown with drawdown keypoints and full-history downsample masks."""
+    d = curve[["date", "equity"]].dropna().sort_values("date").reset_index(drop=True)
+    eq = d["equity"].to_numpy(dtype=np.float64)
+    d["drawdown"] = eq / np.maximum.accumulate(eq) - 1.0 if len(eq) else np.zeros(0)
+    keep = drawdown_keypoints(eq)
+    d["key"] = np.isin(np.arange(len(d)), keep)
+    d["row"] = np.arange(len(d))
+    for b in budgets:
+        mask = np.zeros(len(d), dtype=bool)
+        mask[downsample_curve(d, b, keep=keep)["row"].to_numpy()] = True
+        d[f"pts_{b}"] = mask
+    return d.drop(columns="row")
+
+def monthly_returns(curve: pd.DataFrame) -> pd.DataFrame:
+    """Net monthly returns (rows = years, columns = Jan..Dec) and the compounded year."""
+    eq = curve[["date", "equity"]].dropna().set_index("date")["equity"].sort_index()
+    if eq.empty:
+        return pd.DataFrame(columns=["year"] + MONTHS + ["Year"])
+    m = eq.resample("ME").last().dropna()
+    r = m / m.shift(1, fill_value=1.0) - 1.0  # equity starts at 1
+    t = pd.DataFrame({"year": r.index.year, "month": r.index.month, "r": r.to_numpy()})
+    table = t.pivot(index="year", columns="month", values="r").reindex(columns=range(1, 13))
+    table.columns = MONTHS
+    table["Year"] = np.exp(np.log1p(t["r"]).groupby(t["year"]).sum()) - 1.0
+    return table.reset_index()
+
+def kpi_deltas(stats: dict, base: str = "time_only", target: str = "fused") -> dict:
+    a, b = stats.get(target, {}), stats.get(base, {})
+    out = {}
+    for k in KPI_KEYS:
+        if a.get(k) is not None and b.get(k) is not None:
+            out[k] = float(a[k]) - float(b[k])
+    return out
+
+def build_bundle(wf: pd.DataFrame, curve: pd.DataFrame, prob_col: str = "p", interval: str = "1d") -> dict:
+    return {
+        "rolling": rolling_hit_rates(wf, prob_col, interval=interval),
+        "curve": curve_table(curve),
+        "monthly": monthly_returns(curve),
+        "stats": curve.attrs.get("stats", {}),
+    }
+
+def write_bundle(name: str, wf: pd.DataFrame, curve: pd.DataFrame, prob_col: str = "p",
+                 out_dir=ANALYTICS_DIR, interval: str = "1d") -> dict:
+    """Write one strategy's tables and merge its stats into kpis.json."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    b = build_bundle(wf, curve, prob_col, interval)
+    for part in ("rolling", "curve", "monthly"):
+        b[part].to_parquet(out / f"{name}_{part}.parquet", index=False)
+    kp = out / "kpis.json"
+    kpis = json.loads(kp.read_text()) if kp.exists() else {}
+    stats = dict(kpis.get("stats", {}), **{name: b["stats"]})
+    kp.write_text(json.dumps({"stats": stats, "deltas": kpi_deltas(stats), "interval": interval},
+                             indent=2, default=float))
+    return b
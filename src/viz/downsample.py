@@ -0,0 +1,77 @@
+# src/viz/downsample.py
+import numpy as np
+import pandas as pd
+
+# Server-side downsampling for long time-series charts.
+#
+# Min/max bucketing: the visible rows are cut into equal-count buckets and each bucket
+# keeps its lowest and highest point of every series, so spikes and dips survive while the
+# payload stays bounded: at most `budget` points (endpoints included) plus the points passed
+# as `keep` (drawdown peaks/troughs), which are always included.
+
+def visible_budget(n_visible: int, max_points: int = 1000, min_points: int = 200) -> int:
+    """Points per series for `n_visible` rows: everything if it fits, else `max_points`."""
+    return n_visible if n_visible <= max_points else max(min_points, max_points)
+
+def minmax_indices(y: np.ndarray, budget: int, keep=None) -> np.ndarray:
+    """Sorted positions to plot: per-bucket argmin/argmax, the endpoints and `keep`.
+
+    `y` is one series (n,) or several (n, k) sharing the buckets; the result has at most
+    max(budget, 2 + 2k) positions besides `keep`.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    y = y[:, None] if y.ndim == 1 else y
+    n, k = y.shape
+    if n <= max(budget, 2):
+        return np.arange(n)
+    buckets = max((budget - 2) // (2 * k), 1)
+    bucket = (np.arange(n) * buckets) // n
+    picked = [[0, n - 1]]
+    for col in y.T:
+        idx = np.flatnonzero(~np.isnan(col))
+        order = idx[np.lexsort((col[idx], bucket[idx]))]  # by bucket, then value
+        b = bucket[order]
+        picked += [order[np.r_[True, b[1:] != b[:-1]]], order[np.r_[b[1:] != b[:-1], True]]]
+    if keep is not None:
+        picked.append(np.asarray(keep, dtype=np.int64))
+    return np.unique(np.concatenate(picked))
+
+def drawdown_keypoints(equity: np.ndarray, max_episodes: int = 50) -> np.ndarray:
+    """Peak and trough positions of the deepest drawdown episodes (the max drawdown always).
+
+    An episode runs from a running-max peak to the next new high; its trough is the
+    lowest equity inside it.
+    """
+    eq = np.asarray(equity, dtype=np.float64)
+    if not len(eq):
+        return np.zeros(0, dtype=np.int64)
+    peak = np.fmax.accumulate(np.where(np.isnan(eq), -np.inf, eq))
+    dd = np.where(np.isnan(eq), 0.0, eq / peak - 1.0)
+    under = dd < 0
+    starts = np.flatnonzero(under & ~np.r_[False, under[:-1]])
+    ends = np.flatnonzero(under & ~np.r_[under[1:], False]) + 1
+    if not len(starts):
+        return np.array([int(np.nanargmax(eq))])
+    troughs = np.array([s + int(np.argmin(dd[s:e])) for s, e in zip(starts, ends)])
+    depth = dd[troughs]
+    top = np.argsort(depth, kind="stable")[:max_episodes]
+    return np.unique(np.r_[np.maximum(starts[top] - 1, 0), troughs[top]])
+
+def downsample(df: pd.DataFrame, y: str, budget: int, keep=None) -> pd.DataFrame:
+    """Rows of `df` (already sorted and filtered to the visible range) for plotting `y`."""
+    d = df.dropna(subset=[y]).reset_index(drop=True)
+    return d.iloc[minmax_indices(d[y].to_numpy(dtype=np.float64), budget, keep)]
+
+def downsample_curve(df: pd.DataFrame, budget: int, equity: str = "equity", drawdown: str = "drawdown",
+                     max_episodes: int = 50, keep=None) -> pd.DataFrame:
+    """Equity/drawdown rows keeping every bucket's extremes plus exact peaks and troughs.
+
+    `keep` overrides the peak/trough positions (e.g. keypoints precomputed at train time).
+    Both series share one set of buckets, so the result has at most `budget` rows plus `keep`.
+    """
+    d = df.dropna(subset=[equity]).reset_index(drop=True)
+    eq = d[equity].to_numpy(dtype=np.float64)
+    if keep is None:
+        keep = drawdown_keypoints(eq, max_episodes=max_episodes)
+    cols = [equity] + ([drawdown] if drawdown in d.columns else [])
+    return d.iloc[minmax_indices(d[cols].to_numpy(dtype=np.float64), budget, keep)]
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.viz.downsample import downsample, downsample_curve, drawdown_keypoints
+
+def _curve(n=100_000, seed=0):
+    eq = np.cumprod(1 + np.random.default_rng(seed).normal(0.0002, 0.01, n))
+    return pd.DataFrame({"date": pd.date_range("2000-01-01", periods=n, freq="min"), "equity": eq,
+                         "drawdown": eq / np.maximum.accumulate(eq) - 1.0})
+
+@pytest.mark.parametrize("budget", [200, 1000, 1001])
+def test_curve_stays_within_budget_plus_keypoints(budget):
+    d = _curve()
+    keep = drawdown_keypoints(d["equity"].to_numpy())
+    out = downsample_curve(d, budget, keep=keep)
+    assert len(out) <= budget + len(keep)
+    rows = set(out.index)
+    assert set(keep) <= rows
+    for c in ("equity", "drawdown"):  # every series keeps its extremes and the endpoints
+        assert {d[c].idxmin(), d[c].idxmax(), 0, len(d) - 1} <= rows
+
+def test_single_series_budget():
+    d = _curve(50_000, seed=1)
+    assert len(downsample(d, "equity", 500)) <= 500
+    assert len(downsample(d.iloc[:300], "equity", 500)) == 300  # fits: every row
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from src.data.embedding_store import EmbeddingStore, save_calendar_embeddings, save_embeddings
+
+def _text_store(tmp_path):
+    days = pd.date_range("2021-01-01", periods=60, freq="D")  # calendar days, weekends included
+    keep = np.random.default_rng(0).random(len(days)) > 0.2
+    mat = np.random.default_rng(1).normal(size=(len(days), 8)).astype(np.float32)
+    save_embeddings(days[keep], mat[keep], prefix=str(tmp_path / "text"))
+    return EmbeddingStore(str(tmp_path / "text"))
+
+def test_daily_calendar_store_aligns_as_a_slice(tmp_path):
+    store = _text_store(tmp_path)
+    bdays = pd.bdate_range("2021-01-04", "2021-02-26")
+    save_calendar_embeddings(store, bdays, str(tmp_path / "cal"), chunk_rows=7)
+    cal = EmbeddingStore(str(tmp_path / "cal"))
+
+    rows = bdays[5:30]
+    got = cal.align(rows)
+    assert isinstance(got, np.memmap)  # a view of the store, no gather
+    np.testing.assert_array_equal(got, store.align(rows))
+
+def test_intraday_calendar_store_keeps_bar_timestamps(tmp_path):
+    store = _text_store(tmp_path)
+    bars = pd.DatetimeIndex([d + pd.Timedelta(hours=h) for d in pd.bdate_range("2021-01-04", periods=20)
+                             for h in (10, 12, 14)])
+    save_calendar_embeddings(store, bars, str(tmp_path / "cal"), before=True)
+    cal = EmbeddingStore(str(tmp_path / "cal"))
+    assert not cal.daily and len(cal.dates) == len(bars)
+
+    got = cal.align(bars[3:40], before=True)
+    assert isinstance(got, np.memmap)
+    np.testing.assert_array_equal(got, store.align(bars[3:40], before=True))
@@ -0,0 +1,128 @@
+import http.server
+import threading
+import time
+import pytest
+from scripts import fetch_official_text
+from scripts.fetch_official_text import Fetcher
+
+ETAG, LAST_MODIFIED = '"v1"', "Wed, 01 Jan 2025 00:00:00 GMT"
+
+class _Server:
+    """Local stand-in for the feed hosts: /flaky/<n> fails n times with 503, /slow/<ms>
+    answers after ms milliseconds, /feed/<x> carries ETag/Last-Modified and answers 304 to a
+    matching If-None-Match, /page/<x> is an article page (/page/empty has no paragraph);
+    otherwise the body is the request path."""
+
+    def __init__(self):
+        self.hits = {}
+        self.requests = []  # (path, request headers)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        lock = threading.Lock()
+        outer = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    outer.hits[self.path] = outer.hits.get(self.path, 0) + 1
+                    outer.in_flight += 1
+                    outer.max_in_flight = max(outer.max_in_flight, outer.in_flight)
+                    hit = outer.hits[self.path]
+                    outer.requests.append((self.path, dict(self.headers)))
+                try:
+                    kind, arg = self.path.strip("/").split("/")
+                    if kind == "feed" and self.headers.get("If-None-Match") == ETAG:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    if kind == "slow":
+                        time.sleep(int(arg) / 1000)
+                    if kind == "flaky" and hit <= int(arg):
+                        self.send_response(503)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    body = self.path.encode()
+                    if kind == "page":
+                        body = (b"<html><main></main></html>" if arg == "empty" else
+                                f"<html><main><p>Paragraph of {arg}.</p></main></html>".encode())
+                    self.send_response(200)
+                    if kind == "feed":
+                        self.send_header("ETag", ETAG)
+                        self.send_header("Last-Modified", LAST_MODIFIED)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with lock:
+                        outer.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+@pytest.fixture
+def server():
+    s = _Server()
+    yield s
+    s.httpd.shutdown()
+    s.httpd.server_close()
+
+def test_retries_with_backoff(server):
+    f = Fetcher(retries=3, backoff=0.05)
+    t0 = time.perf_counter()
+    assert f.get(f"{server.url}/flaky/2") == "/flaky/2"
+    assert server.hits["/flaky/2"] == 3
+    assert time.perf_counter() - t0 >= 0.05  # backed off before the second retry
+
+def test_gives_up_after_retries(server):
+    f = Fetcher(retries=2, backoff=0.0)
+    assert f.get(f"{server.url}/flaky/10") is None
+    assert server.hits["/flaky/10"] == 3  # first try + 2 retries
+    assert f.stats["downloaded"] == 0
+
+def test_per_host_concurrency_cap(server):
+    f = Fetcher(per_host=2)
+    urls = [f"{server.url}/slow/{100 + i}" for i in range(10)]
+    assert f.get_many(urls, max_workers=8) == [u[len(server.url):] for u in urls]
+    assert server.max_in_flight == 2
+    assert f.stats["downloaded"] == 10
+
+def test_results_keep_input_order(server):
+    f = Fetcher(per_host=8)
+    delays = [160, 10, 120, 40, 80, 0]  # later URLs finish first
+    urls = [f"{server.url}/slow/{d}" for d in delays]
+    assert f.get_many(urls, max_workers=6) == [f"/slow/{d}" for d in delays]
+
+def test_feeds_are_revalidated_and_304_reuses_the_cached_body(server, tmp_path):
+    f = Fetcher(cache_dir=str(tmp_path))
+    url = f"{server.url}/feed/fed"
+    assert f.get(url) == "/feed/fed"
+    assert "If-None-Match" not in server.requests[0][1]
+
+    again = Fetcher(cache_dir=str(tmp_path))  # a later run, same cache
+    assert again.get(url) == "/feed/fed"
+    _, headers = server.requests[1]
+    assert headers["If-None-Match"] == ETAG and headers["If-Modified-Since"] == LAST_MODIFIED
+    assert again.stats["not_modified"] == 1 and again.stats["downloaded"] == 0
+
+def test_paragraphs_are_parsed_once(server, tmp_path, monkeypatch):
+    parsed = []
+    extract = fetch_official_text._extract_first_paragraph
+    monkeypatch.setattr(fetch_official_text, "_extract_first_paragraph",
+                        lambda html: parsed.append(html) or extract(html))
+    urls = [f"{server.url}/page/a", f"{server.url}/page/empty"]
+
+    first = Fetcher(cache_dir=str(tmp_path))
+    assert first.first_paragraphs(urls) == ["Paragraph of a.", None]
+    assert len(parsed) == 2
+
+    second = Fetcher(cache_dir=str(tmp_path))
+    assert second.first_paragraphs(urls) == ["Paragraph of a.", None]  # a cached None is a result too
+    assert len(parsed) == 2 and second.stats["parse_skipped"] == 2
+    assert server.hits == {"/page/a": 1, "/page/empty": 1}
+    # only the paragraph is kept, not the page
+    assert first.cache.load(urls[0]).get("body") is None
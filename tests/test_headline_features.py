@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import torch
+from src.data.bars import session_stamps
+from src.data.build_dataset import build_fusion
+from src.nlp.finbert_features import FinbertFeaturizer, build_headline_features
+
+def _probs(text: str) -> np.ndarray:
+    """Deterministic [neg, neu, pos] from the text (stands in for FinBERT)."""
+    x = (sum(map(ord, text)) % 97) / 97.0
+    p = np.array([1.0 - x, 0.5, x + 0.1])
+    return (p / p.sum()).astype(np.float32)
+
+class _Scorer:
+    def __init__(self):
+        self.texts = []
+
+    def sa_probs_batch(self, texts, batch_size=64, max_length=64):
+        self.texts += texts
+        return np.stack([_probs(t) for t in texts]) if texts else np.zeros((0, 3), np.float32)
+
+def _headlines():
+    return pd.DataFrame({
+        "date": ["2024-03-01 08:00", "2024-03-01 17:45", "2024-03-01 12:00", "2024-03-01 09:00",
+                 "2024-03-04 10:00", "2024-03-04 11:00", "2024-03-05 07:00"],
+        "corpus_text": ["fed holds", "  cpi cools  ", "", "jobs beat", "oil slides", "yields jump", None],
+    })
+
+def test_daily_aggregates_match_per_headline_scores():
+    scorer = _Scorer()
+    out = build_headline_features(_headlines(), max_per_day=2, featurizer=scorer)
+
+    assert list(out["date"]) == [pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-04")]  # normalized, blanks dropped
+    assert list(out["finbert_count"]) == [2, 2]  # max_per_day: first two per day in input order
+    assert scorer.texts == ["fed holds", "cpi cools", "oil slides", "yields jump"]  # stripped
+
+    for day, texts in [(0, ["fed holds", "cpi cools"]), (1, ["oil slides", "yields jump"])]:
+        p = np.stack([_probs(t) for t in texts]).astype(np.float64)
+        row = out.iloc[day]
+        np.testing.assert_allclose(row[["finbert_neg", "finbert_neu", "finbert_pos"]].to_numpy(float),
+                                   p.mean(axis=0), rtol=1e-6)
+        assert row["finbert_pos_max"] == np.float32(p[:, 2].max())
+        assert row["finbert_neg_max"] == np.float32(p[:, 0].max())
+        assert row["finbert_disp"] == np.float32(np.std(p[:, 2] - p[:, 0], ddof=1))
+
+def test_batches_keep_input_order():
+    fe = FinbertFeaturizer.__new__(FinbertFeaturizer)
+    fe.device = "cpu"
+
+    class _Enc(dict):
+        def to(self, device):
+            return self
+
+    def tok(texts, **kw):
+        n = max(len(t) for t in texts)
+        ids = torch.tensor([[ord(c) for c in t.ljust(n)] for t in texts], dtype=torch.float32)
+        return _Enc(input_ids=ids)
+
+    fe.sa_tok = tok
+    fe.sa_model = lambda input_ids: SimpleNamespace(logits=torch.log(torch.tensor(
+        np.stack([_probs("".join(map(chr, r.int().tolist())).rstrip()) for r in input_ids]))))
+    texts = ["a", "much longer headline", "mid size", "z" * 30, "bb"]  # length-sorted batches reorder these
+    expected = np.stack([_probs(t) for t in texts])
+    for bs in (1, 2, 4, 64):
+        np.testing.assert_allclose(fe.sa_probs_batch(texts, batch_size=bs), expected, rtol=1e-5)
+
+def test_intraday_bars_use_the_previous_text_day():
+    days = pd.bdate_range("2024-03-01", "2024-03-15")
+    stamps = session_stamps(days, "1h")
+    market = pd.DataFrame({"date": stamps, "close": np.arange(len(stamps), dtype=float)})
+    text = build_headline_features(_headlines(), featurizer=_Scorer())
+    X = build_fusion(market, text, interval="1h").set_index("date")
+
+    fri, mon, tue, wed = (pd.Timestamp(d) for d in ["2024-03-01", "2024-03-04", "2024-03-05", "2024-03-06"])
+    at = lambda d: X.loc[X.index.normalize() == d]
+    assert (at(fri)["finbert_count"] == 0).all()  # same-day text is not known at the open
+    assert (at(mon)["finbert_count"] == 3).all()  # Friday's text over the weekend
+    assert (at(tue)["finbert_count"] == 2).all()
+    assert (at(wed)["finbert_count"] == 2).all()  # Monday's, still within INTRADAY_TEXT_MAX_AGE
+    late = X.loc[X.index.normalize() >= pd.Timestamp("2024-03-09")]
+    assert (late["finbert_count"] == 0).all() and (late["finbert_pos"] == 1/3).all()  # too old: neutral
@@ -0,0 +1,116 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from src.live.runner import LiveRunner
+from src.live.sources import Event, FileTailSource
+
+class _Model:
+    """Deterministic stand-in for the fused XGBoost model."""
+
+    def predict_proba(self, x):
+        p = 0.5 + 0.4 * np.tanh(x[:, 1] / 100.0 - 1.0)
+        return np.column_stack([1 - p, p])
+
+META = {"features": ["ret1", "close"], "sizing": "binary", "threshold": 0.5, "cost_bps": 1.0, "interval": "1d"}
+
+def _bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({"date": pd.bdate_range("2020-01-01", periods=n), "open": close, "high": close * 1.01,
+                         "low": close * 0.99, "close": close, "volume": 1e6, "vix": 20.0, "dgs10": 2.0,
+                         "dgs3mo": 1.0})
+
+def _runner(state_dir, history):
+    r = LiveRunner(_Model(), META, state_dir=state_dir, scorer=None, text=False)
+    r.warm_up(history)
+    return r
+
+def _run(runner, source, **kw):
+    asyncio.run(runner.run(source, **kw))
+
+@pytest.fixture
+def replay(tmp_path):
+    bars = _bars(120)
+    history, live = bars.iloc[:100], bars.iloc[100:]
+    path = tmp_path / "bars.csv"
+    live.to_csv(path, index=False)
+    return history, path
+
+def _source(path):
+    return FileTailSource(path, poll=0.01, stop_after_idle=0.05)
+
+def test_resume_after_crash_between_append_and_save(tmp_path, replay):
+    history, path = replay
+    ref = _runner(tmp_path / "ref", history)
+    _run(ref, _source(path))
+    expected = pd.read_csv(ref.curve_path)
+    assert len(expected) == 20
+
+    crashed = _runner(tmp_path / "live", history)
+    save, calls = crashed.save_state, []
+
+    def save_then_crash(source=None):
+        calls.append(1)
+        if len(calls) == 3:  # third curve row is on disk, its state is not
+            raise RuntimeError("crash")
+        save(source)
+
+    crashed.save_state = save_then_crash
+    with pytest.raises(RuntimeError):
+        _run(crashed, _source(path))  # the source has read all 20 bars ahead by now
+    assert len(pd.read_csv(crashed.curve_path)) == 3
+
+    resumed = LiveRunner(_Model(), META, state_dir=tmp_path / "live", scorer=None, text=False)
+    source = _source(path)
+    assert resumed.load_state(source)
+    assert len(pd.read_csv(resumed.curve_path)) == 2
+    _run(resumed, source)
+
+    got = pd.read_csv(resumed.curve_path)
+    assert got["date"].is_unique and len(got) == 20
+    pd.testing.assert_frame_equal(got, expected)
+
+def test_state_keeps_offset_of_last_processed_bar(tmp_path, replay):
+    history, path = replay
+    runner = _runner(tmp_path / "live", history)
+    seen = []
+
+    def stop_after_five(row):
+        seen.append(row)
+        if len(seen) == 5:
+            raise KeyboardInterrupt
+
+    source = _source(path)
+    with pytest.raises(KeyboardInterrupt):
+        _run(runner, source, on_signal=stop_after_five)
+    offset = runner.source_state["bars"][0]
+    lines = path.read_bytes().splitlines(keepends=True)
+    assert offset == sum(len(l) for l in lines[:6])  # header + 5 bars
+    assert source.bars.offset == path.stat().st_size
+
+def test_refuses_day_mode_text_model(tmp_path):
+    meta = {**META, "features": ["ret1", "finbert_pos"], "text_mode": "day"}
+    with pytest.raises(ValueError, match="day-mode"):
+        LiveRunner(_Model(), meta, state_dir=tmp_path, scorer=None, text=True)
+    LiveRunner(_Model(), meta, state_dir=tmp_path, scorer=None, text=False)
+    LiveRunner(_Model(), {**meta, "text_mode": "headline"}, state_dir=tmp_path, scorer=None, text=True)
+
+def test_engine_features_do_not_enable_the_registry_buffer(tmp_path):
+    meta = {**META, "features": ["ret1", "ret2", "vol2", "vol20", "close"]}
+    runner = LiveRunner(_Model(), meta, state_dir=tmp_path, scorer=None, text=False)
+    assert runner.registry == [] and runner.buffer is None
+    runner = LiveRunner(_Model(), {**meta, "features": ["vol2", "ewm_vol20"]}, state_dir=tmp_path, scorer=None,
+                        text=False)
+    assert runner.registry == ["ewm_vol20"]
+
+def test_undated_headlines_go_to_the_last_bar_day(tmp_path):
+    meta = {**META, "features": ["ret1", "finbert_count"], "text_mode": "headline"}
+    runner = LiveRunner(_Model(), meta, state_dir=tmp_path, text=True,
+                        scorer=lambda texts: np.tile([0.2, 0.3, 0.5], (len(texts), 1)))
+    assert runner.on_headlines([Event("headline", {"date": None, "headline": "before any bar"})]) == 0
+    runner.warm_up(_bars(100))
+    runner.on_headlines([Event("headline", {"date": "", "headline": "rates steady"}),
+                         Event("headline", {"date": None, "headline": "cpi cools"})])
+    assert list(runner.text.days) == [str(runner.last_date.date())]
+    assert runner.text.features(runner.last_date)["finbert_count"] == 2
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data import fetch_market
+from src.data.bars import intraday_start
+from src.data.market_store import MarketStore
+
+DATES = pd.bdate_range("2024-01-02", periods=200)
+
+def _spy():
+    close = 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, len(DATES)))
+    return pd.DataFrame({"date": DATES, "close": close})
+
+def _down(*a, **k):
+    raise ConnectionError("no data")
+
+@pytest.fixture
+def store(tmp_path):
+    s = MarketStore(str(tmp_path / "market"))
+    real = pd.DataFrame({"date": DATES[:130], "vix": np.linspace(15, 25, 130)})
+    s.upsert("vix", real)
+    return s, real
+
+def test_vix_proxy_never_overwrites_stored_history(store, monkeypatch):
+    s, real = store
+    monkeypatch.setattr(fetch_market, "_yf_hist", _down)
+    monkeypatch.setattr(fetch_market, "_fred_series", _down)
+
+    out = s.update("vix", lambda since: fetch_market.get_vix(since, _spy), start=str(DATES[0].date()))
+
+    stored = s.read("vix")
+    pd.testing.assert_frame_equal(stored, real)  # real VIX untouched, nothing proxy-valued persisted
+    assert s.meta("vix")["last_date"] == str(DATES[129].date())
+    # this run sees the stored rows plus the proxy for the dates the store lacks
+    assert len(out) == len(DATES) and out["date"].is_unique
+    pd.testing.assert_frame_equal(out.iloc[:130].reset_index(drop=True), real)
+    assert out["vix"].iloc[130:].notna().all()
+
+def test_rows_before_since_are_dropped(store):
+    s, real = store
+    more = pd.DataFrame({"date": DATES, "vix": 99.0})  # a source that ignores `since`
+    s.update("vix", lambda since: more, start=str(DATES[0].date()))
+    stored = s.read("vix")
+    since = DATES[129] - pd.Timedelta(days=s.overlap_days)
+    assert (stored.loc[stored["date"] < since, "vix"] == real.loc[real["date"] < since, "vix"]).all()
+    assert (stored.loc[stored["date"] >= since, "vix"] == 99.0).all()
+
+def test_intraday_start_is_clamped_to_the_lookback():
+    assert intraday_start("2010-01-01", "1h", today="2026-01-10") == "2024-01-12"
+    assert intraday_start("2025-12-01", "1h", today="2026-01-10") == "2025-12-01"
+    assert intraday_start("2010-01-01", "1d", today="2026-01-10") == "2010-01-01"
+
+def test_intraday_update_fetches_a_delta_after_the_first_run(tmp_path):
+    s = MarketStore(str(tmp_path / "market"))
+    calls = []
+
+    def fetch(since):
+        calls.append(since)
+        days = pd.bdate_range(since, "2026-01-09")
+        return pd.DataFrame({"date": days + pd.Timedelta(hours=10), "close": 1.0})
+
+    earliest = intraday_start("2010-01-01", "1h", today="2026-01-10")
+    s.update("SPY_1h", fetch, start="2010-01-01", earliest=earliest)
+    s.update("SPY_1h", fetch, start="2010-01-01", earliest=earliest)
+    assert calls == [earliest, str((pd.Timestamp("2026-01-09") - pd.Timedelta(days=s.overlap_days)).date())]
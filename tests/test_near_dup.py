@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.nlp.near_dup import _shingles, near_duplicate_mask, normalize_for_dedupe
+
+def _jaccard(a: str, b: str) -> float:
+    sa = set(_shingles(normalize_for_dedupe(a)).tolist())
+    sb = set(_shingles(normalize_for_dedupe(b)).tolist())
+    return len(sa & sb) / len(sa | sb) if sa | sb else 0.0
+
+def _brute_force(dates, texts, threshold, window_days):
+    day = pd.to_datetime(dates).to_numpy().astype("datetime64[D]").astype(np.int64)
+    keep = np.ones(len(texts), dtype=bool)
+    for i in range(len(texts)):
+        for j in range(i):
+            if keep[j] and abs(day[i] - day[j]) <= window_days and _jaccard(texts[i], texts[j]) >= threshold:
+                keep[i] = False
+                break
+    return keep
+
+def _corpus(seed=0, n_stories=40, days=30):
+    rng = np.random.default_rng(seed)
+    words = ["fed", "rates", "inflation", "stocks", "bonds", "oil", "jobs", "growth", "china", "tariffs",
+             "earnings", "dollar", "yields", "housing", "banks", "tech", "energy", "gold", "euro", "credit"]
+    rows = []
+    for s in range(n_stories):
+        story = " ".join(rng.choice(words, 8)) + f" story {s}"
+        d0 = pd.Timestamp("2024-01-01") + pd.Timedelta(days=int(rng.integers(days)))
+        rows.append((d0, story))
+        for _ in range(int(rng.integers(0, 4))):  # re-runs: wire tags, casing, a few days later
+            lag = int(rng.integers(0, 5))
+            variant = rng.choice([story.upper(), story + " - Reuters", story + " (AP)", "  " + story + "!"])
+            rows.append((d0 + pd.Timedelta(days=lag), variant))
+    df = pd.DataFrame(rows, columns=["date", "headline"]).sort_values("date", kind="stable")
+    return df.reset_index(drop=True)
+
+@pytest.mark.parametrize("window_days", [0, 1, 3])
+def test_matches_brute_force_jaccard(window_days):
+    df = _corpus()
+    # variants are exact duplicates after normalization and distinct stories share few 5-grams,
+    # so the MinHash estimate and the exact Jaccard agree on every pair at this threshold
+    got = near_duplicate_mask(df["date"], df["headline"], threshold=0.8, window_days=window_days)
+    want = _brute_force(df["date"], df["headline"].tolist(), 0.8, window_days)
+    assert (got == want).all()
+    assert (~got).sum() > 0
+
+def test_rows_outside_window_are_evicted():
+    dates = pd.Series(pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-05", "2024-01-06"]))
+    texts = pd.Series(["Fed holds rates steady"] * 4)
+    keep = near_duplicate_mask(dates, texts, window_days=1)
+    # 01-02 duplicates 01-01; 01-05 is beyond the window of every kept row; 01-06 duplicates 01-05
+    assert keep.tolist() == [True, False, True, False]
+
+def test_requires_date_order():
+    dates = pd.Series(pd.to_datetime(["2024-01-02", "2024-01-01"]))
+    with pytest.raises(ValueError):
+        near_duplicate_mask(dates, pd.Series(["a b c d e f", "g h i j k l"]))
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.backtest import pnl_curve
+from src.backtest.portfolio import constrain_weights, portfolio_backtest
+
+DATES = pd.bdate_range("2020-01-01", periods=400)
+
+def _prices(k=1, seed=0):
+    r = np.random.default_rng(seed).normal(0.0003, 0.01, (len(DATES), k))
+    return pd.DataFrame(100 * np.cumprod(1 + r, axis=0), index=DATES, columns=[f"A{i}" for i in range(k)])
+
+def test_single_asset_matches_pnl_curve():
+    px = _prices()
+    pos = (np.random.default_rng(1).random(len(DATES)) > 0.4).astype(float)
+    curve = pnl_curve(pd.DataFrame({"date": DATES, "pos": pos}),
+                      pd.DataFrame({"date": DATES, "close": px["A0"].to_numpy()}), cost_bps=2.0)
+    res = portfolio_backtest(pd.DataFrame({"A0": pos}, index=DATES), px.pct_change(), cost_bps=2.0)
+
+    np.testing.assert_allclose(res["curve"]["equity"].to_numpy(), curve["equity"].to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(res["curve"]["drawdown"].to_numpy(), curve["drawdown"].to_numpy(), atol=1e-12)
+    for k in ["Total Return (gross)", "Total Return (net)", "CAGR", "CAGR (gross)", "Sharpe (net)",
+              "Sharpe (gross)", "Max Drawdown", "Total Turnover", "Avg Turnover"]:
+        assert res["stats"][k] == pytest.approx(curve.attrs["stats"][k], rel=1e-9), k
+
+def test_leverage_and_weight_caps():
+    w = np.array([[0.8, 0.8, -0.5], [0.2, 0.1, 0.0], [3.0, -3.0, 0.0]])
+    long_only = constrain_weights(w, max_leverage=1.0)
+    assert (long_only >= 0).all()
+    np.testing.assert_allclose(np.abs(long_only).sum(axis=1), [1.0, 0.3, 1.0])
+    np.testing.assert_allclose(long_only[0], [0.5, 0.5, 0.0])
+
+    ls = constrain_weights(w, allow_short=True, max_weight=0.5, max_leverage=1.2)
+    assert np.abs(ls).max() <= 0.5 + 1e-12
+    assert (np.abs(ls).sum(axis=1) <= 1.2 + 1e-12).all()
+
+    px = _prices(3)
+    raw = pd.DataFrame(np.random.default_rng(2).uniform(0, 1, px.shape), index=DATES, columns=px.columns)
+    res = portfolio_backtest(raw, px.pct_change(), max_leverage=1.0)
+    assert res["curve"]["gross_exposure"].max() <= 1.0 + 1e-12
+    assert res["stats"]["Max Gross Exposure"] <= 1.0 + 1e-12
+
+def test_missing_asset_and_nan_prices():
+    px = _prices(2)
+    px.iloc[50:60, 1] = np.nan  # A1 halted for ten bars
+    weights = pd.DataFrame(0.5, index=DATES, columns=["A0", "A1", "GONE"])  # GONE has no prices at all
+    weights.iloc[5, 0] = np.nan
+    returns = px.pct_change(fill_method=None)  # NaN while halted
+    res = portfolio_backtest(weights, returns)
+
+    curve = res["curve"]
+    assert np.isfinite(curve[["equity", "ret_net", "cost"]].to_numpy()).all()
+    assert list(res["weights"].columns) == ["A0", "A1", "GONE"]
+    assert res["weights"].iloc[6, 0] == 0.0  # NaN target -> flat
+    # a halted or missing asset contributes nothing while it has no return
+    r = returns.fillna(0.0).to_numpy()
+    held = res["weights"].to_numpy()
+    np.testing.assert_allclose(curve["ret_gross"].to_numpy(), (held[:, :2] * r).sum(axis=1), atol=1e-15)
+    assert np.isfinite(res["stats"]["Sharpe (net)"])
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from src.data.fetch_market import UNIVERSE_FIELDS, get_universe
+
+DATES = pd.bdate_range("2024-01-02", periods=5)
+
+def _wide(tickers):
+    """yfinance group_by="column" layout: (field, ticker) columns."""
+    cols = pd.MultiIndex.from_product([["Open", "High", "Low", "Close", "Adj Close", "Volume"], tickers])
+    data = np.arange(len(DATES) * len(cols), dtype=np.float64).reshape(len(DATES), len(cols)) + 1.0
+    return pd.DataFrame(data, index=DATES, columns=cols)
+
+class FakeSource:
+    """Batches drop FLAKY and DEAD; FLAKY succeeds on its second single-symbol request,
+    DEAD never returns data."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tickers, start):
+        self.calls.append(list(tickers))
+        if len(tickers) > 1:
+            return _wide([t for t in tickers if t not in ("FLAKY", "DEAD")])
+        t = tickers[0]
+        if t == "DEAD" or (t == "FLAKY" and sum(c == ["FLAKY"] for c in self.calls) < 2):
+            raise ConnectionError("no data")
+        return _wide([t])
+
+def test_partial_batches_retry_missing_symbols():
+    src = FakeSource()
+    symbols = ["AAA", "FLAKY", "BBB", "CCC", "DEAD", "DDD"]
+    out = get_universe(symbols, batch_size=2, retries=3, source=src, backoff=0.0)
+
+    assert list(out.columns) == ["date", "symbol"] + UNIVERSE_FIELDS
+    assert all(out[c].dtype == np.float32 for c in UNIVERSE_FIELDS)
+    assert isinstance(out["symbol"].dtype, pd.CategoricalDtype)
+    assert list(out["symbol"].cat.categories) == symbols
+    assert set(out["symbol"].astype(str)) == {"AAA", "FLAKY", "BBB", "CCC", "DDD"}
+    assert (out.groupby("symbol", observed=True).size() == len(DATES)).all()
+    assert out[["date", "symbol"]].equals(out[["date", "symbol"]].sort_values(["date", "symbol"]))
+    assert out.attrs["failed"] == ["DEAD"]
+    # 3 batches, FLAKY twice (fails, then succeeds), DEAD `retries` times
+    assert src.calls.count(["FLAKY"]) == 2
+    assert src.calls.count(["DEAD"]) == 3
+    assert len(src.calls) == 3 + 2 + 3
+
+def test_no_sleep_after_final_attempt(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("src.data.fetch_market.time.sleep", sleeps.append)
+    get_universe(["DEAD"], retries=3, source=FakeSource(), backoff=1.0)
+    assert sleeps == [1.0, 2.0]  # between attempts only